@@ -0,0 +1,191 @@
+# agregados.py
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from auxiliares import ArquivoAuxiliar
+from models import Expense, em_centavos
+from storage import StorageBase
+
+
+@dataclass
+class Resumo:
+    """
+    Estatísticas de um conjunto de gastos. Valores em centavos (inteiros), para que
+    somas e subtrações incrementais não acumulem erro de ponto flutuante.
+    """
+    soma_centavos: int = 0
+    contagem: int = 0
+    minimo_centavos: Optional[int] = None
+    maximo_centavos: Optional[int] = None
+
+    @property
+    def total(self) -> float:
+        return self.soma_centavos / 100
+
+    @property
+    def minimo(self) -> Optional[float]:
+        return None if self.minimo_centavos is None else self.minimo_centavos / 100
+
+    @property
+    def maximo(self) -> Optional[float]:
+        return None if self.maximo_centavos is None else self.maximo_centavos / 100
+
+    @property
+    def media(self) -> float:
+        return self.soma_centavos / self.contagem / 100 if self.contagem else 0.0
+
+    def incluir(self, centavos: int):
+        self.soma_centavos += centavos
+        self.contagem += 1
+        if self.minimo_centavos is None or centavos < self.minimo_centavos:
+            self.minimo_centavos = centavos
+        if self.maximo_centavos is None or centavos > self.maximo_centavos:
+            self.maximo_centavos = centavos
+
+    def combinar(self, outro: "Resumo"):
+        """Soma outro resumo a este (ex.: juntar categorias de um mesmo mês)."""
+        self.soma_centavos += outro.soma_centavos
+        self.contagem += outro.contagem
+        if outro.minimo_centavos is not None and (self.minimo_centavos is None or outro.minimo_centavos < self.minimo_centavos):
+            self.minimo_centavos = outro.minimo_centavos
+        if outro.maximo_centavos is not None and (self.maximo_centavos is None or outro.maximo_centavos > self.maximo_centavos):
+            self.maximo_centavos = outro.maximo_centavos
+
+
+# Chave de um bucket: (categoria, "AAAA-MM") ou (categoria, "AAAA-MM-DD")
+Chave = Tuple[int, str]
+
+
+class AgregadorGastos(ArquivoAuxiliar):
+    """
+    Mantém totais, contagens, mínimo e máximo por (categoria, mês) e por (categoria, dia),
+    atualizados incrementalmente a cada append/delete do storage.
+    As consultas custam O(buckets), não O(gastos).
+
+    Os buckets são persistidos em <dados>.agregados.json (ver ArquivoAuxiliar).
+    """
+
+    FORMATO = 1
+    SUFIXO = ".agregados.json"
+    DESCRICAO = "agregados"
+
+    def __init__(self, storage: StorageBase, arquivo: Optional[Path] = None, salvar_a_cada: int = 500):
+        super().__init__(storage, arquivo, salvar_a_cada)
+        self._meses: Dict[Chave, Resumo] = {}
+        self._dias: Dict[Chave, Resumo] = {}
+        # Buckets cujo mínimo/máximo ficou desconhecido após uma remoção
+        self._sujos: set = set()
+        self._iniciar()
+
+    # --- Observador do storage ---
+    def gasto_adicionado(self, expense: Expense):
+        centavos = em_centavos(expense.valor)
+        for buckets, chave in self._chaves(expense):
+            buckets.setdefault(chave, Resumo()).incluir(centavos)
+        self._alterou()
+
+    def gasto_removido(self, expense: Expense):
+        centavos = em_centavos(expense.valor)
+        for buckets, chave in self._chaves(expense):
+            resumo = buckets.get(chave)
+            if resumo is None:
+                continue
+            resumo.soma_centavos -= centavos
+            resumo.contagem -= 1
+            if resumo.contagem <= 0:
+                del buckets[chave]
+                self._sujos.discard((buckets is self._dias, chave))
+            elif centavos in (resumo.minimo_centavos, resumo.maximo_centavos):
+                # Não dá para desfazer mínimo/máximo: recalcula o bucket quando for consultado
+                self._sujos.add((buckets is self._dias, chave))
+        self._alterou()
+
+    # --- Consultas ---
+    def total_geral(self) -> Resumo:
+        """Resumo de todos os gastos."""
+        self._limpar_sujos()
+        total = Resumo()
+        for resumo in self._meses.values():
+            total.combinar(resumo)
+        return total
+
+    def por_categoria(self) -> Dict[int, Resumo]:
+        """{categoria: resumo} de todos os gastos."""
+        self._limpar_sujos()
+        resultado: Dict[int, Resumo] = {}
+        for (categoria, _), resumo in self._meses.items():
+            resultado.setdefault(categoria, Resumo()).combinar(resumo)
+        return resultado
+
+    def por_mes(self, categoria: Optional[int] = None) -> Dict[str, Resumo]:
+        """{"AAAA-MM": resumo}, em ordem cronológica, opcionalmente de uma só categoria."""
+        self._limpar_sujos()
+        resultado: Dict[str, Resumo] = {}
+        for (cat, mes), resumo in sorted(self._meses.items(), key=lambda item: item[0][1]):
+            if categoria is None or cat == categoria:
+                resultado.setdefault(mes, Resumo()).combinar(resumo)
+        return resultado
+
+    def por_dia(self, inicio: date, fim: date, categoria: Optional[int] = None) -> Dict[str, Resumo]:
+        """{"AAAA-MM-DD": resumo} dos dias no intervalo [inicio, fim], em ordem cronológica."""
+        self._limpar_sujos()
+        de, ate = inicio.isoformat(), fim.isoformat()
+        resultado: Dict[str, Resumo] = {}
+        for (cat, dia), resumo in sorted(self._dias.items(), key=lambda item: item[0][1]):
+            if de <= dia <= ate and (categoria is None or cat == categoria):
+                resultado.setdefault(dia, Resumo()).combinar(resumo)
+        return resultado
+
+    # --- Manutenção dos buckets ---
+    def _chaves(self, expense: Expense):
+        yield self._meses, (expense.categoria, expense.data.strftime("%Y-%m"))
+        yield self._dias, (expense.categoria, expense.data.strftime("%Y-%m-%d"))
+
+    def _reconstruir(self, expenses: Iterable[Expense]):
+        self._meses.clear()
+        self._dias.clear()
+        self._sujos.clear()
+        for expense in expenses:
+            centavos = em_centavos(expense.valor)
+            for buckets, chave in self._chaves(expense):
+                buckets.setdefault(chave, Resumo()).incluir(centavos)
+        self.salvar()
+
+    def _limpar_sujos(self):
+        """Recalcula mínimo/máximo dos buckets afetados por remoções, lendo só o período deles."""
+        for eh_dia, (categoria, periodo) in list(self._sujos):
+            if eh_dia:
+                inicio = datetime.strptime(periodo, "%Y-%m-%d")
+                fim = inicio + timedelta(days=1)
+            else:
+                inicio = datetime.strptime(periodo, "%Y-%m")
+                fim = (inicio + timedelta(days=32)).replace(day=1)
+            resumo = Resumo()
+            for expense in self.storage.load_between(inicio, fim):
+                if expense.categoria == categoria:
+                    resumo.incluir(em_centavos(expense.valor))
+            buckets = self._dias if eh_dia else self._meses
+            if resumo.contagem:
+                buckets[(categoria, periodo)] = resumo
+            else:
+                buckets.pop((categoria, periodo), None)
+        self._sujos.clear()
+
+    # --- Persistência ---
+    def _serializar(self) -> dict:
+        self._limpar_sujos()
+
+        def serializar(buckets):
+            return [[cat, periodo, r.soma_centavos, r.contagem, r.minimo_centavos, r.maximo_centavos]
+                    for (cat, periodo), r in buckets.items()]
+
+        return {"meses": serializar(self._meses), "dias": serializar(self._dias)}
+
+    def _restaurar(self, conteudo: dict):
+        def desserializar(linhas):
+            return {(cat, periodo): Resumo(soma, contagem, minimo, maximo)
+                    for cat, periodo, soma, contagem, minimo, maximo in linhas}
+
+        self._meses = desserializar(conteudo.get("meses", []))
+        self._dias = desserializar(conteudo.get("dias", []))
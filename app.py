@@ -1,20 +1,52 @@
+import atexit
+import os
+import sys
 from pathlib import Path
-from storage import StorageManager
+from agregados import AgregadorGastos
+from backends import criar_storage
+from busca import IndiceTexto
+from consultas import IndiceGastos
 from pdf_exporter import PDFGenerator
 from validator import Validator
 from gui import AppGUI
-from report_manager import GeradorRelatoriosCategoria 
+from report_manager import GeradorRelatoriosCategoria
 
+# GASTOS_ESCRITA_ADIADA=1 grava as adições e remoções da GUI em lote (a cada 0,5s ou 50
+# operações) em vez de uma a uma; desligada, cada operação está no disco ao ser confirmada
+ESCRITA_ADIADA = os.environ.get("GASTOS_ESCRITA_ADIADA", "") not in ("", "0")
 
-def main():
-    """Função principal que inicializa o sistema."""
-    storage = StorageManager(Path("gastos.json"))
+
+def criar_app() -> AppGUI:
+    """
+    Monta os componentes e a janela. Nada aqui lê os gastos: os índices e agregados são
+    montados por `preparar`, na thread de I/O da GUI, depois que a janela já apareceu.
+    """
+    storage = criar_storage()
     pdf_exporter = PDFGenerator(Path("relatorio.pdf"))
     validator = Validator()
     report_manager = GeradorRelatoriosCategoria(storage)
-    app = AppGUI(storage, pdf_exporter, validator, report_manager)
-    app.run()
+
+    def preparar():
+        indice_texto = IndiceTexto(storage)
+        indice = IndiceGastos(storage, indice_texto)
+        report_manager.indice = indice
+        agregador = AgregadorGastos(storage)
+        atexit.register(agregador.salvar)
+        atexit.register(indice_texto.salvar)
+        return indice, agregador
+
+    return AppGUI(storage, pdf_exporter, validator, report_manager, preparar=preparar, escrita_adiada=ESCRITA_ADIADA)
+
+
+def main():
+    """Função principal que inicializa o sistema."""
+    criar_app().run()
 
 
 if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        # Necessário para o ProcessPoolExecutor dos relatórios no executável do PyInstaller
+        # (fora dele freeze_support não faz nada, e importar o multiprocessing custa ~30ms)
+        import multiprocessing
+        multiprocessing.freeze_support()
     main()
@@ -0,0 +1,94 @@
+# auxiliares.py
+import json
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
+from models import Expense
+from storage import StorageBase
+
+
+class ArquivoAuxiliar:
+    """
+    Base das estruturas derivadas dos gastos (agregados, índice de busca), mantidas
+    incrementalmente como observadoras do storage e persistidas num arquivo ao lado dos
+    dados junto com a versão deles (versao_dados); se a versão bater na abertura, não há
+    reconstrução.
+
+    A carga inicial do storage acontece antes do registro como observador, então a recarga
+    dela não chega aqui; toda notificação gastos_recarregados posterior (recarga do disco
+    ou delete_all, mesmo com a escrita adiada) reconstrói.
+
+    Subclasses definem FORMATO, SUFIXO e DESCRICAO, implementam _reconstruir(expenses),
+    _serializar() e _restaurar(conteudo), chamam _iniciar() no fim do __init__ e
+    _alterou() a cada gasto incluído ou removido.
+    """
+
+    FORMATO = 1
+    SUFIXO = ".auxiliar.json"  # acrescentado ao nome do arquivo de dados
+    DESCRICAO = "arquivo auxiliar"  # para mensagens de erro
+
+    def __init__(self, storage: StorageBase, arquivo: Optional[Path] = None, salvar_a_cada: int = 500):
+        self.storage = storage
+        self.arquivo = arquivo or storage.path.with_name(storage.path.name + self.SUFIXO)
+        self.salvar_a_cada = salvar_a_cada
+        self._alteracoes = 0
+
+    def _iniciar(self):
+        """Carrega do arquivo (ou reconstrói a partir dos gastos) e passa a observar o storage."""
+        expenses = self.storage.load_all()
+        if not self._carregar():
+            self._reconstruir(expenses)
+        self.storage.registrar_observador(self)
+
+    # --- Observador do storage ---
+    def gastos_recarregados(self, expenses: List[Expense]):
+        self._reconstruir(expenses)
+
+    def _alterou(self):
+        self._alteracoes += 1
+        if self._alteracoes >= self.salvar_a_cada:
+            self.salvar()
+
+    # --- Para as subclasses ---
+    def _reconstruir(self, expenses: Iterable[Expense]):
+        raise NotImplementedError
+
+    def _serializar(self) -> dict:
+        raise NotImplementedError
+
+    def _restaurar(self, conteudo: dict):
+        raise NotImplementedError
+
+    # --- Persistência ---
+    def salvar(self):
+        """
+        Grava o conteúdo e a versão dos dados no arquivo auxiliar (escrita atômica).
+        Com escritas adiadas ainda não gravadas, não grava nada: a versão do disco não
+        descreveria o conteúdo, e uma queda antes do flush deixaria no arquivo gastos que
+        não existem. A gravação fica para a próxima alteração ou para o encerramento,
+        que roda depois do flush final.
+        """
+        if self.storage.escritas_pendentes():
+            return
+        conteudo = {"formato": self.FORMATO, "versao_dados": self.storage.versao_dados()}
+        conteudo.update(self._serializar())
+        temporario = self.arquivo.with_name(self.arquivo.name + ".tmp")
+        try:
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(conteudo, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temporario, self.arquivo)
+        except Exception as e:
+            raise IOError(f"Erro ao salvar {self.DESCRICAO}: {e}")
+        self._alteracoes = 0
+
+    def _carregar(self) -> bool:
+        """Carrega o conteúdo salvo se ainda corresponde aos dados. Retorna True se carregou."""
+        try:
+            with open(self.arquivo, "r", encoding="utf-8") as f:
+                conteudo = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if conteudo.get("formato") != self.FORMATO or conteudo.get("versao_dados") != self.storage.versao_dados():
+            return False
+        self._restaurar(conteudo)
+        return True
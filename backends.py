@@ -0,0 +1,46 @@
+# backends.py
+import os
+from pathlib import Path
+from typing import Optional
+from storage import StorageBase, StorageManager
+from journal_storage import JournalStorageManager, migrar_json_para_journal
+from sqlite_storage import SQLiteStorageManager, importar_json_para_sqlite
+from mensal_storage import MensalStorageManager, migrar_json_para_mensal
+
+
+# Backend de armazenamento: "json" (padrão), "journal" (JSON Lines somente-anexação)
+# "sqlite" (banco indexado por categoria e data) ou "mensal" (um arquivo por mês)
+BACKEND_ARMAZENAMENTO = os.environ.get("GASTOS_BACKEND", "json")
+# Compressão dos meses fechados no backend "mensal": "gzip", "zstd" ou vazio (nenhuma)
+COMPRESSAO_MENSAL = os.environ.get("GASTOS_COMPRESSAO_MENSAL") or None
+
+ARQUIVO_JSON = Path("gastos.json")
+ARQUIVO_JOURNAL = Path("gastos.jsonl")
+ARQUIVO_SQLITE = Path("gastos.db")
+DIRETORIO_MENSAL = Path("gastos_mensal")
+
+
+def criar_storage(backend: Optional[str] = None) -> StorageBase:
+    """
+    Cria o StorageManager do backend informado (ou o configurado em GASTOS_BACKEND).
+    Na primeira vez que um backend alternativo é usado, o gastos.json existente é migrado.
+    """
+    backend = backend or BACKEND_ARMAZENAMENTO
+    if backend == "journal":
+        if not ARQUIVO_JOURNAL.exists() and ARQUIVO_JSON.exists():
+            # Migração única do formato antigo
+            migrar_json_para_journal(ARQUIVO_JSON, ARQUIVO_JOURNAL)
+        return JournalStorageManager(ARQUIVO_JOURNAL)
+    if backend == "sqlite":
+        if not ARQUIVO_SQLITE.exists() and ARQUIVO_JSON.exists():
+            # Importação única do formato antigo
+            importar_json_para_sqlite(ARQUIVO_JSON, ARQUIVO_SQLITE)
+        return SQLiteStorageManager(ARQUIVO_SQLITE)
+    if backend == "mensal":
+        if not DIRETORIO_MENSAL.exists() and ARQUIVO_JSON.exists():
+            # Migração única do formato antigo
+            migrar_json_para_mensal(ARQUIVO_JSON, DIRETORIO_MENSAL, COMPRESSAO_MENSAL)
+        return MensalStorageManager(DIRETORIO_MENSAL, COMPRESSAO_MENSAL)
+    if backend == "json":
+        return StorageManager(ARQUIVO_JSON)
+    raise ValueError(f"Backend de armazenamento desconhecido: {backend!r}. Use json, journal, sqlite ou mensal.")
@@ -0,0 +1,2 @@
+# Benchmarks do controle de gastos. Rode a partir da raiz do projeto, ex.:
+#   python -m benchmarks.bench_pdf
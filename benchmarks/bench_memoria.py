@@ -0,0 +1,50 @@
+# benchmarks/bench_memoria.py
+"""
+Compara a memória de List[Expense] com a de ExpenseTable.
+
+    python -m benchmarks.bench_memoria --linhas 10000 100000 1000000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from benchmarks.dados import gerar_gastos
+from expense_table import ExpenseTable
+
+
+def _medir(construir):
+    """Retorna (objeto, bytes alocados, segundos) para construir a coleção."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    colecao = construir()
+    duracao = time.perf_counter() - inicio
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return colecao, atual, duracao
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de memória das coleções de gastos.")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args(argv)
+
+    print(f"{'linhas':>10}{'List MB':>12}{'Tabela MB':>12}{'razão':>8}{'soma lista s':>14}{'soma tabela s':>15}")
+    for linhas in args.linhas:
+        lista, bytes_lista, _ = _medir(lambda: list(gerar_gastos(linhas)))
+        tabela, bytes_tabela, _ = _medir(lambda: ExpenseTable.from_expenses(gerar_gastos(linhas)))
+
+        inicio = time.perf_counter()
+        sum(g.valor for g in lista if g.categoria == 1)
+        t_lista = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        tabela.soma(categoria=1)
+        t_tabela = time.perf_counter() - inicio
+
+        print(f"{linhas:>10}{bytes_lista / 2**20:>12.1f}{bytes_tabela / 2**20:>12.1f}"
+              f"{bytes_lista / max(bytes_tabela, 1):>8.1f}{t_lista:>14.4f}{t_tabela:>15.4f}")
+        del lista, tabela
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# benchmarks/bench_pdf.py
+"""
+Compara PDFGenerator.generate_pdf (tabela única) com generate_pdf_stream (páginas sob demanda).
+Cada medição roda num subprocesso separado para que o pico de RSS seja só daquele modo.
+
+    python -m benchmarks.bench_pdf --linhas 1000 10000 100000
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _pico_rss_mb():
+    """Pico de memória residente do processo em MB (None fora de sistemas POSIX)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB; macOS em bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def _contar_paginas(caminho: Path) -> int:
+    return len(re.findall(rb"/Type /Page\b(?!s)", caminho.read_bytes()))
+
+
+def medir(modo: str, linhas: int) -> dict:
+    """Executa um modo no processo atual e retorna as métricas."""
+    from benchmarks.dados import gerar_gastos
+    from pdf_exporter import PDFGenerator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        destino = Path(tmp) / "relatorio.pdf"
+        gerador = PDFGenerator(str(destino))
+        inicio = time.perf_counter()
+        if modo == "lista":
+            gerador.generate_pdf(list(gerar_gastos(linhas)))
+        else:
+            gerador.generate_pdf_stream(gerar_gastos(linhas))
+        duracao = time.perf_counter() - inicio
+        paginas = _contar_paginas(destino)
+    return {
+        "modo": modo,
+        "linhas": linhas,
+        "segundos": round(duracao, 3),
+        "paginas": paginas,
+        "paginas_por_segundo": round(paginas / duracao, 1) if duracao else None,
+        "pico_rss_mb": _pico_rss_mb(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de geração de PDF.")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--modos", nargs="+", default=["lista", "stream"], choices=["lista", "stream"])
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.interno:
+        print(json.dumps(medir(args.modos[0], args.linhas[0])))
+        return 0
+
+    print(f"{'modo':<8}{'linhas':>10}{'seg':>10}{'páginas':>10}{'pág/s':>10}{'RSS MB':>10}")
+    for linhas in args.linhas:
+        for modo in args.modos:
+            saida = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_pdf", "--interno",
+                 "--modos", modo, "--linhas", str(linhas)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            r = json.loads(saida)
+            rss = f"{r['pico_rss_mb']:.1f}" if r["pico_rss_mb"] is not None else "-"
+            print(f"{r['modo']:<8}{r['linhas']:>10}{r['segundos']:>10}{r['paginas']:>10}"
+                  f"{r['paginas_por_segundo']:>10}{rss:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
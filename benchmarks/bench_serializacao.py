@@ -0,0 +1,83 @@
+# benchmarks/bench_serializacao.py
+"""
+Mede registros/s das etapas de (de)serialização de Expense:
+- load_validado: Expense.from_dict (caminho de arquivos antigos/externos);
+- load_confiavel: Expense.from_trusted_dict (arquivos com SCHEMA_VERSAO);
+- validar: Validator sobre valor, descrição e categoria;
+- serializar: Expense.to_dict + json.dumps do arquivo inteiro.
+
+    python -m benchmarks.bench_serializacao --linhas 10000 100000 1000000
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Callable, Dict, List
+from benchmarks.dados import gerar_gastos
+from models import Expense, SCHEMA_VERSAO
+from validator import Validator
+
+
+def cronometrar(funcao) -> float:
+    """Segundos de uma chamada de `funcao()` (usado também pela suíte)."""
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+# --- Etapas: cada uma devolve os segundos para processar `gastos` (a suíte usa as mesmas) ---
+def tempo_load_validado(gastos: List[Expense]) -> float:
+    registros = [e.to_dict() for e in gastos]
+    return cronometrar(lambda: [Expense.from_dict(d) for d in registros])
+
+
+def tempo_load_confiavel(gastos: List[Expense]) -> float:
+    registros = [e.to_dict() for e in gastos]
+    return cronometrar(lambda: [Expense.from_trusted_dict(d) for d in registros])
+
+
+def tempo_validar(gastos: List[Expense]) -> float:
+    def validar():
+        for e in gastos:
+            Validator.validate_valor(e.valor)
+            Validator.validate_descricao(e.descricao)
+            Validator.validate_categoria(e.categoria)
+
+    return cronometrar(validar)
+
+
+def tempo_serializar(gastos: List[Expense]) -> float:
+    def serializar():
+        json.dumps({"schema": SCHEMA_VERSAO, "gastos": [e.to_dict() for e in gastos]}, ensure_ascii=False)
+
+    return cronometrar(serializar)
+
+
+ETAPAS: Dict[str, Callable[[List[Expense]], float]] = {
+    "load_validado": tempo_load_validado,
+    "load_confiavel": tempo_load_confiavel,
+    "validar": tempo_validar,
+    "serializar": tempo_serializar,
+}
+
+
+def medir(linhas: int) -> dict:
+    gastos = list(gerar_gastos(linhas))
+    return {etapa: linhas / tempo(gastos) for etapa, tempo in ETAPAS.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de (de)serialização de Expense.")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args(argv)
+
+    etapas = list(ETAPAS)
+    print(f"{'linhas':>10}" + "".join(f"{etapa:>16}" for etapa in etapas) + "   (registros/s)")
+    for linhas in args.linhas:
+        taxas = medir(linhas)
+        print(f"{linhas:>10}" + "".join(f"{taxas[etapa]:>16,.0f}" for etapa in etapas))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# benchmarks/carga_servidor.py
+"""
+Teste de carga da API HTTP (servidor.py): vários clientes com conexões keep-alive
+fazem uma mistura de POST /gastos e GET /gastos; reporta requisições/s e latências
+(p50, p99, máxima) por rota.
+
+    python -m benchmarks.carga_servidor --clientes 32 --requisicoes 200
+    python -m benchmarks.carga_servidor --url 127.0.0.1:8080     # servidor já rodando
+
+Sem --url, sobe um servidor temporário (backend json, diretório temporário).
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+async def _requisicao(reader, writer, metodo: str, caminho: str, corpo: bytes = b"") -> int:
+    """Envia uma requisição HTTP/1.1 e lê a resposta inteira (Content-Length ou chunked)."""
+    writer.write(
+        f"{metodo} {caminho} HTTP/1.1\r\nHost: local\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(corpo)}\r\n\r\n".encode("latin-1") + corpo
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    cabecalhos = {}
+    while True:
+        linha = await reader.readline()
+        if linha in (b"\r\n", b""):
+            break
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+    if cabecalhos.get("transfer-encoding") == "chunked":
+        while True:
+            tamanho = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(tamanho + 2)
+            if tamanho == 0:
+                break
+    else:
+        await reader.readexactly(int(cabecalhos.get("content-length", "0")))
+    return status
+
+
+async def _cliente(host: str, porta: int, requisicoes: int, proporcao_escrita: float, latencias, erros):
+    reader, writer = await asyncio.open_connection(host, porta)
+    aleatorio = random.Random()
+    try:
+        for i in range(requisicoes):
+            if aleatorio.random() < proporcao_escrita:
+                rota, metodo, caminho = "POST /gastos", "POST", "/gastos"
+                corpo = json.dumps({
+                    "valor": round(aleatorio.uniform(1, 500), 2),
+                    "descricao": f"carga {i}",
+                    "categoria": aleatorio.randint(1, 5),
+                }).encode("utf-8")
+            else:
+                rota, metodo, caminho, corpo = "GET /gastos", "GET", "/gastos?limite=50", b""
+            inicio = time.perf_counter()
+            status = await _requisicao(reader, writer, metodo, caminho, corpo)
+            latencias.setdefault(rota, []).append(time.perf_counter() - inicio)
+            if status >= 400:
+                erros.append(f"{rota}: HTTP {status}")
+    finally:
+        writer.close()
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+async def _executar(host: str, porta: int, clientes: int, requisicoes: int, proporcao_escrita: float):
+    latencias: Dict[str, List[float]] = {}
+    erros: List[str] = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        _cliente(host, porta, requisicoes, proporcao_escrita, latencias, erros) for _ in range(clientes)
+    ))
+    return time.perf_counter() - inicio, latencias, erros
+
+
+def _subir_servidor(diretorio: str) -> Tuple[subprocess.Popen, int]:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        porta = s.getsockname()[1]
+    processo = subprocess.Popen(
+        [sys.executable, str(RAIZ / "servidor.py"), "--porta", str(porta), "--backend", "json"],
+        cwd=diretorio, stdout=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", porta), timeout=0.1).close()
+            return processo, porta
+        except OSError:
+            time.sleep(0.1)
+    processo.kill()
+    raise RuntimeError("O servidor não subiu a tempo.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga da API HTTP de gastos.")
+    parser.add_argument("--url", help="host:porta de um servidor já rodando")
+    parser.add_argument("--clientes", type=int, default=32, help="conexões simultâneas")
+    parser.add_argument("--requisicoes", type=int, default=200, help="requisições por cliente")
+    parser.add_argument("--escrita", type=float, default=0.5, help="proporção de POSTs (0 a 1)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        processo = None
+        if args.url:
+            host, _, porta = args.url.rpartition(":")
+            porta = int(porta)
+        else:
+            processo, porta = _subir_servidor(diretorio)
+            host = "127.0.0.1"
+        try:
+            duracao, latencias, erros = asyncio.run(
+                _executar(host, porta, args.clientes, args.requisicoes, args.escrita)
+            )
+        finally:
+            if processo is not None:
+                processo.terminate()
+                processo.wait()
+
+    total = sum(len(v) for v in latencias.values())
+    print(f"{args.clientes} clientes x {args.requisicoes} requisições: {total} em {duracao:.2f}s "
+          f"= {total / duracao:,.0f} req/s")
+    print(f"{'rota':<14}{'n':>8}{'p50 ms':>10}{'p99 ms':>10}{'máx ms':>10}")
+    for rota, valores in sorted(latencias.items()) + [("todas", [v for vs in latencias.values() for v in vs])]:
+        print(f"{rota:<14}{len(valores):>8}{_percentil(valores, 0.5) * 1000:>10.1f}"
+              f"{_percentil(valores, 0.99) * 1000:>10.1f}{max(valores) * 1000:>10.1f}")
+    if erros:
+        print(f"{len(erros)} respostas com erro, ex.: {erros[0]}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# benchmarks/dados.py
+"""
+Gastos sintéticos e reprodutíveis para os benchmarks, e arquivos de teste a partir deles.
+
+    python -m benchmarks.dados --linhas 100000 --saida gastos.json
+    python -m benchmarks.dados --linhas 1000000 --formato jsonl --saida gastos_importar.jsonl
+    python -m benchmarks.dados --linhas 50000 --formato journal --saida gastos.jsonl \\
+        --pesos 40,10,25,20,5 --inicio 2024-01-01 --dias 365 --datas recente
+
+Formatos: json (gastos.json do StorageManager), jsonl (um gasto por linha, para o
+importador) e journal (gastos.jsonl do JournalStorageManager, com cabeçalho).
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence
+from models import Expense, Category, SCHEMA_VERSAO
+
+
+DESCRICOES = [
+    "Supermercado", "Padaria", "Cinema", "Uber", "Ônibus", "Conta de luz",
+    "Internet", "Restaurante", "Farmácia", "Academia", "Combustível", "Streaming",
+]
+
+FORMATOS = ("json", "jsonl", "journal")
+DISTRIBUICOES_DATA = ("uniforme", "recente")
+
+
+def gerar_gastos(
+    quantidade: int,
+    semente: int = 42,
+    pesos_categoria: Optional[Sequence[float]] = None,
+    inicio: datetime = datetime(2020, 1, 1),
+    dias: int = 5 * 365,
+    datas: str = "uniforme",
+) -> Iterator[Expense]:
+    """
+    Gera `quantidade` gastos sintéticos e reprodutíveis, com IDs sequenciais.
+    - pesos_categoria: peso de cada Category, na ordem do enum (padrão: iguais);
+    - datas em [inicio, inicio + dias): "uniforme" ou "recente" (mais gastos perto do fim).
+    """
+    if datas not in DISTRIBUICOES_DATA:
+        raise ValueError(f"Distribuição de datas inválida: {datas!r}. Use {', '.join(DISTRIBUICOES_DATA)}.")
+    rnd = random.Random(semente)
+    categorias = [c.value for c in Category]
+    if pesos_categoria is not None and len(pesos_categoria) != len(categorias):
+        raise ValueError(f"Informe {len(categorias)} pesos de categoria, um por Category.")
+    segundos = dias * 24 * 3600
+    # Sorteios na mesma ordem de sempre: com os padrões, a mesma semente gera os mesmos gastos
+    for i in range(quantidade):
+        valor = round(rnd.uniform(1, 500), 2)
+        descricao = rnd.choice(DESCRICOES)
+        if pesos_categoria is None:
+            categoria = rnd.choice(categorias)
+        else:
+            categoria = rnd.choices(categorias, weights=pesos_categoria)[0]
+        if datas == "recente":
+            deslocamento = min(int(rnd.triangular(0, segundos, segundos)), segundos - 1)
+        else:
+            deslocamento = rnd.randrange(segundos)
+        yield Expense(
+            id=i + 1,
+            valor=valor,
+            descricao=descricao,
+            categoria=categoria,
+            data=inicio + timedelta(seconds=deslocamento),
+        )
+
+
+def escrever_arquivo(caminho: Path, gastos: Iterable[Expense], formato: str = "json") -> int:
+    """Grava os gastos no formato pedido, sem montar o arquivo inteiro na memória. Retorna quantos."""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato!r}. Use {', '.join(FORMATOS)}.")
+    quantidade = 0
+    with open(caminho, "w", encoding="utf-8") as f:
+        if formato == "json":
+            f.write(f'{{"schema": {SCHEMA_VERSAO}, "gastos": [')
+        elif formato == "journal":
+            f.write(json.dumps({"schema": SCHEMA_VERSAO}) + "\n")
+        for expense in gastos:
+            registro = json.dumps(expense.to_dict(), ensure_ascii=False)
+            if formato == "json":
+                f.write((", " if quantidade else "") + registro)
+            else:
+                f.write(registro + "\n")
+            quantidade += 1
+        if formato == "json":
+            f.write("]}")
+    return quantidade
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera arquivos de gastos sintéticos.")
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--saida", type=Path, required=True)
+    parser.add_argument("--formato", choices=FORMATOS, default="json")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--pesos", help=f"pesos das {len(Category)} categorias, separados por vírgula")
+    parser.add_argument("--inicio", type=datetime.fromisoformat, default=datetime(2020, 1, 1), help="AAAA-MM-DD")
+    parser.add_argument("--dias", type=int, default=5 * 365, help="extensão do período de datas")
+    parser.add_argument("--datas", choices=DISTRIBUICOES_DATA, default="uniforme")
+    args = parser.parse_args(argv)
+
+    pesos = [float(p) for p in args.pesos.split(",")] if args.pesos else None
+    try:
+        gastos = gerar_gastos(args.linhas, args.semente, pesos, args.inicio, args.dias, args.datas)
+        quantidade = escrever_arquivo(args.saida, gastos, args.formato)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{quantidade} gastos gravados em {args.saida} ({args.formato}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
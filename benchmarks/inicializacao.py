@@ -0,0 +1,150 @@
+# benchmarks/inicializacao.py
+"""
+Tempo de abertura do programa, medido num processo novo (como o usuário o abre):
+- importação: `python -X importtime -c "import app"`, com os módulos mais lentos;
+- primeira pintura: do início do processo até a janela estar visível;
+- dados na tela: até a lista e o total aparecerem (depende da quantidade de gastos).
+
+    python -m benchmarks.inicializacao --gastos 50000
+
+Falha (código 1) se a importação ou a primeira pintura passarem do ORCAMENTO, ou se
+o ReportLab for importado na abertura. Sem tela (DISPLAY), mede só a importação.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Tuple
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Limites em milissegundos; os dados na tela só são reportados
+ORCAMENTO = {"importacao_ms": 150, "primeira_pintura_ms": 500}
+
+# Roda no processo filho: abre a janela como o app.py e mede até os dados aparecerem
+_MEDIR_JANELA = """
+import json, time
+inicio = time.perf_counter()
+import tkinter
+import app
+importado = time.perf_counter()
+try:
+    janela = app.criar_app()
+except tkinter.TclError as e:
+    print(json.dumps({"sem_tela": str(e)}))
+    raise SystemExit(0)
+while not janela.root.winfo_viewable():
+    janela.root.update()
+pintura = time.perf_counter()
+limite = pintura + 120
+while janela.total_label.cget("text") == "Carregando gastos..." and time.perf_counter() < limite:
+    janela.root.update()
+    time.sleep(0.001)
+dados = time.perf_counter()
+janela._fechar()
+print(json.dumps({
+    "importacao_ms": (importado - inicio) * 1000,
+    "primeira_pintura_ms": (pintura - inicio) * 1000,
+    "dados_na_tela_ms": (dados - inicio) * 1000,
+}))
+"""
+
+
+def _gerar_gastos(diretorio: Path, quantidade: int):
+    aleatorio = random.Random(42)
+    inicio = datetime(2023, 1, 1)
+    gastos = [
+        {
+            "id": i,
+            "valor": round(aleatorio.uniform(1, 500), 2),
+            "descricao": f"gasto {i}",
+            "categoria": aleatorio.randint(1, 5),
+            "data": (inicio + timedelta(minutes=aleatorio.randint(0, 1_000_000))).isoformat(),
+        }
+        for i in range(1, quantidade + 1)
+    ]
+    (diretorio / "gastos.json").write_text(json.dumps(gastos), encoding="utf-8")
+
+
+def _ambiente() -> dict:
+    ambiente = dict(os.environ, GASTOS_BACKEND="json")
+    ambiente["PYTHONPATH"] = os.pathsep.join(filter(None, [str(RAIZ), ambiente.get("PYTHONPATH")]))
+    return ambiente
+
+
+def _medir_importacao(diretorio: Path) -> Tuple[float, List[Tuple[float, str]]]:
+    """Tempo total de `import app` (ms) e os módulos com maior tempo próprio."""
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=diretorio, env=_ambiente(), capture_output=True, text=True, check=True,
+    ).stderr
+    modulos = []
+    total = 0.0
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, acumulado, nome = (parte.strip() for parte in linha[len("import time:"):].split("|"))
+        modulos.append((int(proprio) / 1000, nome))
+        if nome == "app":
+            total = int(acumulado) / 1000
+    return total, modulos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de abertura do programa.")
+    parser.add_argument("--gastos", type=int, default=50_000, help="gastos no arquivo de teste")
+    parser.add_argument("--repeticoes", type=int, default=3, help="medições (vale a menor)")
+    args = parser.parse_args(argv)
+
+    falhas = []
+    with tempfile.TemporaryDirectory() as temporario:
+        diretorio = Path(temporario)
+        _gerar_gastos(diretorio, args.gastos)
+
+        medicoes = [_medir_importacao(diretorio) for _ in range(args.repeticoes)]
+        importacao, modulos = min(medicoes, key=lambda medicao: medicao[0])
+        print(f"import app: {importacao:.1f} ms (orçamento {ORCAMENTO['importacao_ms']} ms)")
+        print("módulos mais lentos (tempo próprio):")
+        for tempo, nome in sorted(modulos, reverse=True)[:8]:
+            print(f"  {tempo:7.1f} ms  {nome}")
+        if importacao > ORCAMENTO["importacao_ms"]:
+            falhas.append(f"importação levou {importacao:.1f} ms")
+        if any(nome.startswith("reportlab") for _, nome in modulos):
+            falhas.append("o ReportLab foi importado na abertura")
+
+        janelas = []
+        for _ in range(args.repeticoes):
+            # Cada abertura deixa os índices salvos: apaga para medir a abertura sem eles
+            for auxiliar in diretorio.glob("gastos.json.*"):
+                auxiliar.unlink()
+            saida = subprocess.run(
+                [sys.executable, "-c", _MEDIR_JANELA],
+                cwd=diretorio, env=_ambiente(), capture_output=True, text=True, check=True, timeout=300,
+            ).stdout
+            janelas.append(json.loads(saida.strip().splitlines()[-1]))
+
+    if "sem_tela" in janelas[0]:
+        print(f"janela não medida (sem tela: {janelas[0]['sem_tela']})")
+    else:
+        melhor = min(janelas, key=lambda medicao: medicao["primeira_pintura_ms"])
+        print(f"primeira pintura: {melhor['primeira_pintura_ms']:.1f} ms "
+              f"(orçamento {ORCAMENTO['primeira_pintura_ms']} ms)")
+        print(f"dados na tela ({args.gastos} gastos): {melhor['dados_na_tela_ms']:.1f} ms")
+        if melhor["primeira_pintura_ms"] > ORCAMENTO["primeira_pintura_ms"]:
+            falhas.append(f"primeira pintura levou {melhor['primeira_pintura_ms']:.1f} ms")
+
+    if falhas:
+        for falha in falhas:
+            print(f"FALHOU: {falha}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# benchmarks/stress_concorrencia.py
+"""
+Teste de estresse do gastos.json com vários processos ao mesmo tempo:
+escritores fazem append/delete_by_id em paralelo enquanto leitores chamam load_all.
+No final confere que nenhuma escrita se perdeu, que os IDs são únicos e que
+nenhum leitor viu erro ou um arquivo vazio/parcial.
+
+    python -m benchmarks.stress_concorrencia --processos 4 --operacoes 200
+"""
+import argparse
+import multiprocessing
+import queue
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from models import Expense
+from storage import StorageManager
+
+
+def _escritor(caminho: str, numero: int, operacoes: int, fila):
+    """Adiciona `operacoes` gastos e apaga um a cada cinco; reporta os IDs que sobraram."""
+    storage = StorageManager(Path(caminho))
+    vivos = []
+    for i in range(operacoes):
+        expense = Expense(id=None, valor=1.0 + i, descricao=f"p{numero}-{i}", categoria=1 + i % 5, data=datetime.now())
+        storage.append(expense)
+        vivos.append(expense.id)
+        if i % 5 == 4:
+            if not storage.delete_by_id(vivos.pop(0)):
+                fila.put(("erro", f"escritor {numero}: delete_by_id não achou o próprio gasto"))
+    fila.put(("vivos", vivos))
+
+
+def _leitor(caminho: str, parar, fila):
+    """Lê o arquivo sem parar; a contagem só pode ser 0 antes da primeira escrita."""
+    storage = StorageManager(Path(caminho))
+    leituras = 0
+    maximo = 0
+    while not parar.is_set():
+        try:
+            quantidade = len(storage.load_all())
+        except Exception as e:
+            fila.put(("erro", f"leitor: {e}"))
+            return
+        if maximo > 0 and quantidade == 0:
+            fila.put(("erro", "leitor: arquivo apareceu vazio no meio do teste"))
+            return
+        maximo = max(maximo, quantidade)
+        leituras += 1
+    fila.put(("leituras", leituras))
+
+
+def _esperar(processos, fila, mensagens):
+    """Espera os processos terminarem, esvaziando a fila (um processo com dados na fila não termina)."""
+    while any(p.is_alive() for p in processos) or not fila.empty():
+        try:
+            mensagens.append(fila.get(timeout=0.1))
+        except queue.Empty:
+            pass
+    for processo in processos:
+        processo.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estresse de acesso concorrente ao gastos.json.")
+    parser.add_argument("--processos", type=int, default=4, help="processos escritores")
+    parser.add_argument("--leitores", type=int, default=2)
+    parser.add_argument("--operacoes", type=int, default=200, help="appends por escritor")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = str(Path(diretorio) / "gastos.json")
+        StorageManager(Path(caminho))
+        fila = multiprocessing.Queue()
+        parar = multiprocessing.Event()
+
+        leitores = [multiprocessing.Process(target=_leitor, args=(caminho, parar, fila)) for _ in range(args.leitores)]
+        escritores = [
+            multiprocessing.Process(target=_escritor, args=(caminho, n, args.operacoes, fila))
+            for n in range(args.processos)
+        ]
+        inicio = time.perf_counter()
+        for processo in leitores + escritores:
+            processo.start()
+
+        mensagens = []
+        _esperar(escritores, fila, mensagens)
+        duracao = time.perf_counter() - inicio
+        parar.set()
+        _esperar(leitores, fila, mensagens)
+
+        erros = [texto for tipo, texto in mensagens if tipo == "erro"]
+        esperados = sorted(i for tipo, ids in mensagens if tipo == "vivos" for i in ids)
+        final = StorageManager(Path(caminho)).load_all()
+        ids_finais = sorted(e.id for e in final)
+        if len(set(esperados)) != len(esperados):
+            erros.append("IDs duplicados entre escritores")
+        if ids_finais != esperados:
+            erros.append(f"esperados {len(esperados)} gastos, o arquivo tem {len(ids_finais)}")
+
+        escritas = args.processos * (args.operacoes + args.operacoes // 5)
+        leituras = sum(n for tipo, n in mensagens if tipo == "leituras")
+        print(f"{args.processos} escritores, {args.leitores} leitores: {escritas} escritas em {duracao:.1f}s "
+              f"({escritas / duracao:,.0f}/s), {leituras} leituras, {len(final)} gastos no final")
+
+    if erros:
+        for erro in erros:
+            print(f"FALHOU: {erro}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
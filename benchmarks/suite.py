@@ -0,0 +1,283 @@
+# benchmarks/suite.py
+"""
+Suíte de benchmarks com resultados em JSON e comparação contra uma linha de base.
+
+    python -m benchmarks.suite rodar --linhas 1000 100000 --saida atual.json
+    python -m benchmarks.suite rodar --linhas 1000 100000 1000000 --casos storage serializacao
+    python -m benchmarks.suite comparar base.json atual.json --tolerancia 0.2
+    python -m benchmarks.suite rodar --saida atual.json --base base.json   # roda e compara
+
+Casos (cada um mede a menor de --repeticoes execuções):
+- storage.load_all: abrir o gastos.json e carregar todos os gastos (a frio);
+- storage.append / storage.append_lote / storage.delete_by_id: OPERACOES escritas num
+  arquivo com `linhas` gastos (uma gravação por operação, ou uma só com em_lote);
+- serializacao.from_dict / from_trusted_dict / to_json: (de)serialização de Expense;
+- pdf.generate_pdf / pdf.generate_pdf_stream: PDF de todos os gastos;
+- pdf.generate_dashboard: resumo de uma página (ExpenseTable.resumir + gráficos);
+- relatorios.gerar_todos: um PDF por categoria (GeradorRelatoriosCategoria, forcar=True).
+
+`comparar` sai com código 1 se algum caso ficou mais lento que a base além da tolerância.
+"""
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from benchmarks.bench_serializacao import cronometrar, tempo_load_confiavel, tempo_load_validado, tempo_serializar
+from benchmarks.dados import escrever_arquivo, gerar_gastos
+from models import Expense
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Escritas medidas por caso de storage: cada uma regrava o arquivo inteiro, então
+# um número fixo mantém o caso de 1M linhas num tempo razoável
+OPERACOES = 20
+
+
+@dataclass
+class Contexto:
+    diretorio: Path
+    linhas: int
+    gastos: List[Expense]
+    arquivo: Path  # gastos.json com os `linhas` gastos, que os casos não alteram
+
+
+def _storage_copia(ctx: Contexto):
+    """StorageManager sobre uma cópia do arquivo, já carregado (fora da medição)."""
+    from storage import StorageManager
+
+    copia = ctx.diretorio / "copia.json"
+    shutil.copyfile(ctx.arquivo, copia)
+    storage = StorageManager(copia)
+    storage.sincronizar_disco = False  # sem fsync: mede o código, não o disco
+    storage.load_all()
+    return storage
+
+
+def _novos_gastos() -> List[Expense]:
+    return [Expense(None, e.valor, e.descricao, e.categoria, e.data) for e in gerar_gastos(OPERACOES, semente=7)]
+
+
+# --- Casos: cada um devolve (segundos, unidades medidas) ---
+def caso_load_all(ctx: Contexto) -> Tuple[float, int]:
+    from storage import StorageManager
+
+    return cronometrar(lambda: StorageManager(ctx.arquivo).load_all()), ctx.linhas
+
+
+def caso_append(ctx: Contexto) -> Tuple[float, int]:
+    storage = _storage_copia(ctx)
+    novos = _novos_gastos()
+
+    def adicionar():
+        for expense in novos:
+            storage.append(expense)
+
+    return cronometrar(adicionar), OPERACOES
+
+
+def caso_append_lote(ctx: Contexto) -> Tuple[float, int]:
+    storage = _storage_copia(ctx)
+    novos = _novos_gastos()
+
+    def adicionar():
+        with storage.em_lote():
+            for expense in novos:
+                storage.append(expense)
+
+    return cronometrar(adicionar), OPERACOES
+
+
+def caso_delete_by_id(ctx: Contexto) -> Tuple[float, int]:
+    storage = _storage_copia(ctx)
+    ids = [e.id for e in ctx.gastos[::max(len(ctx.gastos) // OPERACOES, 1)][:OPERACOES]]
+
+    def apagar():
+        for id_ in ids:
+            storage.delete_by_id(id_)
+
+    return cronometrar(apagar), len(ids)
+
+
+def caso_from_dict(ctx: Contexto) -> Tuple[float, int]:
+    return tempo_load_validado(ctx.gastos), ctx.linhas
+
+
+def caso_from_trusted_dict(ctx: Contexto) -> Tuple[float, int]:
+    return tempo_load_confiavel(ctx.gastos), ctx.linhas
+
+
+def caso_to_json(ctx: Contexto) -> Tuple[float, int]:
+    return tempo_serializar(ctx.gastos), ctx.linhas
+
+
+def caso_generate_pdf(ctx: Contexto) -> Tuple[float, int]:
+    from pdf_exporter import PDFGenerator
+
+    gerador = PDFGenerator(str(ctx.diretorio / "relatorio.pdf"))
+    return cronometrar(lambda: gerador.generate_pdf(ctx.gastos)), ctx.linhas
+
+
+def caso_generate_pdf_stream(ctx: Contexto) -> Tuple[float, int]:
+    from pdf_exporter import PDFGenerator
+
+    gerador = PDFGenerator(str(ctx.diretorio / "relatorio.pdf"))
+    return cronometrar(lambda: gerador.generate_pdf_stream(iter(ctx.gastos))), ctx.linhas
+
+
+def caso_generate_dashboard(ctx: Contexto) -> Tuple[float, int]:
+    from expense_table import ExpenseTable
+    from pdf_exporter import PDFGenerator
+
+    tabela = ExpenseTable.from_expenses(ctx.gastos)
+    gerador = PDFGenerator(str(ctx.diretorio / "resumo.pdf"))
+    return cronometrar(lambda: gerador.generate_dashboard(tabela)), ctx.linhas
+
+
+def caso_relatorios(ctx: Contexto) -> Tuple[float, int]:
+    from report_manager import GeradorRelatoriosCategoria
+    from storage import StorageManager
+
+    gerador = GeradorRelatoriosCategoria(StorageManager(ctx.arquivo))
+    gerador.diretorio_relatorios = ctx.diretorio / "relatorios"
+    gerador.arquivo_manifesto = gerador.diretorio_relatorios / ".manifesto.json"
+    gerador.storage.load_all()
+    return cronometrar(lambda: gerador.gerar_todos_os_relatorios(forcar=True)), ctx.linhas
+
+
+CASOS: Dict[str, Callable[[Contexto], Tuple[float, int]]] = {
+    "storage.load_all": caso_load_all,
+    "storage.append": caso_append,
+    "storage.append_lote": caso_append_lote,
+    "storage.delete_by_id": caso_delete_by_id,
+    "serializacao.from_dict": caso_from_dict,
+    "serializacao.from_trusted_dict": caso_from_trusted_dict,
+    "serializacao.to_json": caso_to_json,
+    "pdf.generate_pdf": caso_generate_pdf,
+    "pdf.generate_pdf_stream": caso_generate_pdf_stream,
+    "pdf.generate_dashboard": caso_generate_dashboard,
+    "relatorios.gerar_todos": caso_relatorios,
+}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def rodar(linhas: List[int], casos: List[str], repeticoes: int) -> dict:
+    """Roda os casos em cada tamanho e devolve o documento de resultados."""
+    resultados = {}
+    for quantidade in linhas:
+        with tempfile.TemporaryDirectory() as temporario:
+            diretorio = Path(temporario)
+            gastos = list(gerar_gastos(quantidade))
+            arquivo = diretorio / "gastos.json"
+            escrever_arquivo(arquivo, gastos, "json")
+            ctx = Contexto(diretorio, quantidade, gastos, arquivo)
+            for nome in casos:
+                medicoes = [CASOS[nome](ctx) for _ in range(repeticoes)]
+                segundos, unidades = min(medicoes)
+                resultados[f"{nome}@{quantidade}"] = {
+                    "caso": nome,
+                    "linhas": quantidade,
+                    "segundos": segundos,
+                    "unidades": unidades,
+                    "por_segundo": unidades / segundos if segundos else None,
+                }
+                print(f"{nome:<32}{quantidade:>10}{segundos:>12.4f}s{unidades / segundos:>16,.0f}/s", flush=True)
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticoes": repeticoes,
+        "resultados": resultados,
+    }
+
+
+def comparar(base: dict, atual: dict, tolerancia: float) -> List[str]:
+    """Imprime a razão atual/base de cada caso; devolve os que ficaram mais lentos além da tolerância."""
+    regressoes = []
+    print(f"{'caso':<44}{'base s':>12}{'atual s':>12}{'razão':>8}")
+    for chave, resultado in sorted(atual["resultados"].items()):
+        anterior = base["resultados"].get(chave)
+        if anterior is None:
+            print(f"{chave:<44}{'-':>12}{resultado['segundos']:>12.4f}{'novo':>8}")
+            continue
+        razao = resultado["segundos"] / anterior["segundos"] if anterior["segundos"] else float("inf")
+        marca = ""
+        if razao > 1 + tolerancia:
+            marca = "  REGRESSÃO"
+            regressoes.append(f"{chave}: {razao:.2f}x mais lento")
+        elif razao < 1 - tolerancia:
+            marca = "  melhorou"
+        print(f"{chave:<44}{anterior['segundos']:>12.4f}{resultado['segundos']:>12.4f}{razao:>8.2f}{marca}")
+    for chave in sorted(set(base["resultados"]) - set(atual["resultados"])):
+        print(f"{chave:<44}{base['resultados'][chave]['segundos']:>12.4f}{'-':>12}{'ausente':>8}")
+    return regressoes
+
+
+def _ler(caminho: Path) -> dict:
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise SystemExit(f"Não foi possível ler {caminho}: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks do controle de gastos.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_rodar = comandos.add_parser("rodar", help="roda os benchmarks e grava os resultados em JSON")
+    p_rodar.add_argument("--linhas", type=int, nargs="+", default=[1000, 100_000])
+    p_rodar.add_argument("--casos", nargs="+", default=None,
+                         help="casos ou prefixos (ex.: storage pdf.generate_pdf_stream); padrão: todos")
+    p_rodar.add_argument("--repeticoes", type=int, default=3)
+    p_rodar.add_argument("--saida", type=Path, default=Path("resultados_bench.json"))
+    p_rodar.add_argument("--base", type=Path, help="compara com esta linha de base ao terminar")
+    p_rodar.add_argument("--tolerancia", type=float, default=0.2)
+
+    p_comparar = comandos.add_parser("comparar", help="compara dois arquivos de resultados")
+    p_comparar.add_argument("base", type=Path)
+    p_comparar.add_argument("atual", type=Path)
+    p_comparar.add_argument("--tolerancia", type=float, default=0.2, help="aumento de tempo tolerado (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.comando == "rodar":
+        casos = [nome for nome in CASOS
+                 if args.casos is None or any(nome == c or nome.startswith(c + ".") for c in args.casos)]
+        if not casos:
+            parser.error(f"Nenhum caso corresponde a {args.casos}. Casos: {', '.join(CASOS)}")
+        atual = rodar(args.linhas, casos, args.repeticoes)
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(atual, f, ensure_ascii=False, indent=2)
+        print(f"Resultados gravados em {args.saida}.")
+        if args.base is None:
+            return 0
+        base = _ler(args.base)
+    else:
+        base, atual = _ler(args.base), _ler(args.atual)
+
+    regressoes = comparar(base, atual, args.tolerancia)
+    if regressoes:
+        for regressao in regressoes:
+            print(f"REGRESSÃO: {regressao}")
+        return 1
+    print("Sem regressões.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# busca.py
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from auxiliares import ArquivoAuxiliar
+from models import Expense
+from storage import StorageBase
+
+
+_PALAVRA = re.compile(r"\w+")
+# Maior que qualquer caractere: termo + _FIM limita a faixa de um prefixo no vocabulário
+_FIM = "\U0010ffff"
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas e sem acentos ("Pão de Açúcar" → "pao de acucar")."""
+    decomposto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Palavras normalizadas de um texto, na ordem, sem repetição."""
+    return list(dict.fromkeys(_PALAVRA.findall(normalizar(texto))))
+
+
+def corresponde(termos: Iterable[str], descricao: str) -> bool:
+    """Se cada termo é início de alguma palavra da descrição (a mesma regra do índice)."""
+    termos = list(termos)
+    palavras = tokenizar(descricao)
+    return bool(termos) and all(any(p.startswith(t) for p in palavras) for t in termos)
+
+
+class IndiceTexto(ArquivoAuxiliar):
+    """
+    Índice invertido das descrições: palavra normalizada → IDs dos gastos que a contêm,
+    mais o vocabulário ordenado para buscar por prefixo com bisect ("super" acha
+    "supermercado"). Mantido incrementalmente como observador do StorageManager.
+
+    Persistido em <dados>.busca.json (ver ArquivoAuxiliar).
+    """
+
+    FORMATO = 1
+    SUFIXO = ".busca.json"
+    DESCRICAO = "índice de busca"
+
+    def __init__(self, storage: StorageBase, arquivo: Optional[Path] = None, salvar_a_cada: int = 500):
+        super().__init__(storage, arquivo, salvar_a_cada)
+        self._ids: Dict[str, Set[int]] = {}
+        self._termos: List[str] = []
+        # Última busca (os termos e o resultado); qualquer alteração a invalida
+        self._ultima: Optional[Tuple[Tuple[str, ...], FrozenSet[int]]] = None
+        self._iniciar()
+
+    # --- Observador do storage ---
+    def gasto_adicionado(self, expense: Expense):
+        for termo in tokenizar(expense.descricao):
+            ids = self._ids.get(termo)
+            if ids is None:
+                ids = self._ids[termo] = set()
+                insort(self._termos, termo)
+            ids.add(expense.id)
+        self._alterou()
+
+    def gasto_removido(self, expense: Expense):
+        for termo in tokenizar(expense.descricao):
+            ids = self._ids.get(termo)
+            if ids is None:
+                continue
+            ids.discard(expense.id)
+            if not ids:
+                del self._ids[termo]
+                del self._termos[bisect_left(self._termos, termo)]
+        self._alterou()
+
+    # --- Busca ---
+    def buscar(self, texto: str) -> FrozenSet[int]:
+        """
+        IDs dos gastos cuja descrição tem, para cada palavra de `texto`, uma palavra que
+        começa com ela (sem diferenciar maiúsculas nem acentos). Texto sem palavras → vazio.
+        """
+        termos = tuple(tokenizar(texto))
+        if self._ultima is not None and self._ultima[0] == termos:
+            return self._ultima[1]
+        resultado: Optional[Set[int]] = None
+        # Os prefixos mais longos costumam ser os mais seletivos: começa por eles
+        for termo in sorted(termos, key=len, reverse=True):
+            ids = self._com_prefixo(termo)
+            resultado = ids if resultado is None else resultado & ids
+            if not resultado:
+                break
+        encontrados = frozenset(resultado or ())
+        self._ultima = (termos, encontrados)
+        return encontrados
+
+    def _com_prefixo(self, prefixo: str) -> Set[int]:
+        inicio = bisect_left(self._termos, prefixo)
+        fim = bisect_left(self._termos, prefixo + _FIM, inicio)
+        if fim - inicio == 1:
+            return self._ids[self._termos[inicio]]
+        return set().union(*(self._ids[t] for t in self._termos[inicio:fim]))
+
+    # --- Manutenção ---
+    def _reconstruir(self, expenses: Iterable[Expense]):
+        self._ids = {}
+        for expense in expenses:
+            for termo in tokenizar(expense.descricao):
+                self._ids.setdefault(termo, set()).add(expense.id)
+        self._termos = sorted(self._ids)
+        self._ultima = None
+        self.salvar()
+
+    def _alterou(self):
+        self._ultima = None
+        super()._alterou()
+
+    # --- Persistência ---
+    def _serializar(self) -> dict:
+        return {"termos": {termo: sorted(self._ids[termo]) for termo in self._termos}}
+
+    def _restaurar(self, conteudo: dict):
+        self._ids = {termo: set(ids) for termo, ids in conteudo.get("termos", {}).items()}
+        self._termos = sorted(self._ids)
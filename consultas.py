@@ -0,0 +1,266 @@
+# consultas.py
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from busca import IndiceTexto, corresponde, tokenizar
+from models import Expense, em_centavos
+from storage import StorageBase
+
+
+ORDENACOES = ("id", "data", "valor")
+
+
+@dataclass
+class Consulta:
+    """
+    Filtros, ordenação e paginação de uma busca por gastos.
+    - inicio/fim: intervalo de datas [inicio, fim);
+    - valor_min/valor_max: intervalo de valores, inclusivo;
+    - texto: palavras que a descrição deve conter, ou o início delas (sem diferenciar
+      maiúsculas nem acentos; ver busca.py);
+    - ordenar_por: "id", "data" ou "valor"; decrescente inverte a ordem;
+    - limite/offset ou cursor (o proximo_cursor de um ResultadoConsulta anterior).
+    """
+    categoria: Optional[int] = None
+    inicio: Optional[datetime] = None
+    fim: Optional[datetime] = None
+    valor_min: Optional[float] = None
+    valor_max: Optional[float] = None
+    texto: Optional[str] = None
+    ordenar_por: str = "id"
+    decrescente: bool = False
+    limite: Optional[int] = None
+    offset: int = 0
+    cursor: Optional[str] = None
+
+
+@dataclass
+class ResultadoConsulta:
+    """Uma página de gastos; proximo_cursor é None quando não há mais páginas."""
+    gastos: List[Expense]
+    proximo_cursor: Optional[str] = None
+
+
+# Chave de ordenação de cada índice; o id desempata e torna as chaves únicas
+_CHAVES: Dict[str, Callable[[Expense], object]] = {
+    "id": lambda e: e.id,
+    "data": lambda e: e.data,
+    "valor": lambda e: em_centavos(e.valor),
+}
+
+
+def _codificar_cursor(chave, id_: int) -> str:
+    return f"{chave.isoformat() if isinstance(chave, datetime) else chave}|{id_}"
+
+
+def _decodificar_cursor(ordenar_por: str, cursor: str) -> Tuple[object, int]:
+    try:
+        chave, _, id_ = cursor.rpartition("|")
+        return (datetime.fromisoformat(chave) if ordenar_por == "data" else int(chave)), int(id_)
+    except ValueError:
+        raise ValueError(f"Cursor inválido: {cursor!r}")
+
+
+class IndiceGastos:
+    """
+    Índices ordenados dos gastos (por id, data e valor, e ids por categoria), mantidos
+    incrementalmente como observador do StorageManager, como o AgregadorGastos.
+
+    Uma consulta usa bisect no índice da ordenação pedida para achar a faixa de
+    datas/valores e só percorre essa faixa, parando ao completar a página. Se outro
+    filtro for bem mais seletivo (ex.: uma categoria pequena), parte dele e ordena só
+    os candidatos. Só os gastos da página são materializados na lista de resultado.
+    Com um IndiceTexto, o filtro de texto vem do índice invertido em vez de ler as descrições.
+    """
+
+    def __init__(self, storage: StorageBase, texto: Optional[IndiceTexto] = None):
+        self.storage = storage
+        self.texto = texto
+        self._gastos: Dict[int, Expense] = {}
+        self._ordens: Dict[str, List[Tuple[object, int]]] = {nome: [] for nome in ORDENACOES}
+        self._por_categoria: Dict[int, List[int]] = {}
+        self._reconstruir(storage.load_all())
+        storage.registrar_observador(self)
+
+    # --- Observador do StorageManager ---
+    def gasto_adicionado(self, expense: Expense):
+        if expense.id in self._gastos:
+            self.gasto_removido(self._gastos[expense.id])
+        self._gastos[expense.id] = expense
+        for nome, ordem in self._ordens.items():
+            insort(ordem, (_CHAVES[nome](expense), expense.id))
+        insort(self._por_categoria.setdefault(expense.categoria, []), expense.id)
+
+    def gasto_removido(self, expense: Expense):
+        atual = self._gastos.pop(expense.id, None)
+        if atual is None:
+            return
+        for nome, ordem in self._ordens.items():
+            chave = (_CHAVES[nome](atual), atual.id)
+            posicao = bisect_left(ordem, chave)
+            if posicao < len(ordem) and ordem[posicao] == chave:
+                del ordem[posicao]
+        ids = self._por_categoria.get(atual.categoria, [])
+        posicao = bisect_left(ids, atual.id)
+        if posicao < len(ids) and ids[posicao] == atual.id:
+            del ids[posicao]
+
+    def gastos_recarregados(self, expenses: List[Expense]):
+        self._reconstruir(expenses)
+
+    def _reconstruir(self, expenses: List[Expense]):
+        self._gastos = {e.id: e for e in expenses}
+        for nome in ORDENACOES:
+            chave = _CHAVES[nome]
+            self._ordens[nome] = sorted((chave(e), e.id) for e in expenses)
+        self._por_categoria = {}
+        for id_ in sorted(self._gastos):
+            self._por_categoria.setdefault(self._gastos[id_].categoria, []).append(id_)
+
+    # --- Planejamento ---
+    def _faixa(self, nome: str, consulta: Consulta) -> Tuple[int, int]:
+        """Posições [lo, hi) do índice `nome` que respeitam o filtro de intervalo dele."""
+        ordem = self._ordens[nome]
+        if nome == "data" and (consulta.inicio is not None or consulta.fim is not None):
+            lo = bisect_left(ordem, (consulta.inicio,)) if consulta.inicio is not None else 0
+            hi = bisect_left(ordem, (consulta.fim,)) if consulta.fim is not None else len(ordem)
+            return lo, max(lo, hi)
+        if nome == "valor" and (consulta.valor_min is not None or consulta.valor_max is not None):
+            lo = bisect_left(ordem, (em_centavos(consulta.valor_min),)) if consulta.valor_min is not None else 0
+            hi = (bisect_left(ordem, (em_centavos(consulta.valor_max) + 1,))
+                  if consulta.valor_max is not None else len(ordem))
+            return lo, max(lo, hi)
+        return 0, len(ordem)
+
+    def _candidatos(self, consulta: Consulta) -> Tuple[Optional[str], int]:
+        """O ponto de partida mais seletivo: ("categoria" | nome de índice | None, tamanho)."""
+        opcoes = []
+        if consulta.categoria is not None:
+            opcoes.append(("categoria", len(self._por_categoria.get(consulta.categoria, []))))
+        for nome in ("data", "valor"):
+            lo, hi = self._faixa(nome, consulta)
+            if hi - lo < len(self._gastos):
+                opcoes.append((nome, hi - lo))
+        if consulta.texto and self.texto is not None:
+            opcoes.append(("texto", len(self.texto.buscar(consulta.texto))))
+        return min(opcoes, key=lambda opcao: opcao[1]) if opcoes else (None, len(self._gastos))
+
+    def _ids_candidatos(self, origem: Optional[str], consulta: Consulta) -> Iterable[int]:
+        if origem == "categoria":
+            return self._por_categoria.get(consulta.categoria, [])
+        if origem == "texto":
+            return self.texto.buscar(consulta.texto)
+        nome = origem or "id"
+        lo, hi = self._faixa(nome, consulta)
+        return [id_ for _, id_ in self._ordens[nome][lo:hi]]
+
+    def _filtro(self, consulta: Consulta, ignorar: Tuple[str, ...] = ()) -> Optional[Callable[[Expense], bool]]:
+        """Predicado com os filtros que o índice usado não garante (None se não sobrar nenhum)."""
+        testes = []
+        if consulta.categoria is not None and "categoria" not in ignorar:
+            testes.append(lambda e: e.categoria == consulta.categoria)
+        if "data" not in ignorar:
+            if consulta.inicio is not None:
+                testes.append(lambda e: e.data >= consulta.inicio)
+            if consulta.fim is not None:
+                testes.append(lambda e: e.data < consulta.fim)
+        if "valor" not in ignorar:
+            if consulta.valor_min is not None:
+                minimo = em_centavos(consulta.valor_min)
+                testes.append(lambda e: em_centavos(e.valor) >= minimo)
+            if consulta.valor_max is not None:
+                maximo = em_centavos(consulta.valor_max)
+                testes.append(lambda e: em_centavos(e.valor) <= maximo)
+        if consulta.texto and "texto" not in ignorar:
+            if self.texto is not None:
+                encontrados = self.texto.buscar(consulta.texto)
+                testes.append(lambda e: e.id in encontrados)
+            else:
+                termos = tokenizar(consulta.texto)
+                testes.append(lambda e: corresponde(termos, e.descricao))
+        if not testes:
+            return None
+        return lambda e: all(teste(e) for teste in testes)
+
+    # --- Consultas ---
+    def contar(self, consulta: Consulta) -> int:
+        """Quantos gastos passam nos filtros (ignora ordenação e paginação)."""
+        origem, tamanho = self._candidatos(consulta)
+        filtro = self._filtro(consulta, ignorar=(origem,) if origem else ())
+        if filtro is None:
+            return tamanho
+        return sum(1 for id_ in self._ids_candidatos(origem, consulta) if filtro(self._gastos[id_]))
+
+    def consultar(self, consulta: Consulta) -> ResultadoConsulta:
+        """Uma página de gastos que passam nos filtros, na ordem pedida."""
+        if consulta.ordenar_por not in ORDENACOES:
+            raise ValueError(f"Ordenação inválida: {consulta.ordenar_por!r}. Use {', '.join(ORDENACOES)}.")
+        nome = consulta.ordenar_por
+        ordem = self._ordens[nome]
+        lo, hi = self._faixa(nome, consulta)
+        origem, tamanho = self._candidatos(consulta)
+
+        if origem is not None and origem != nome and tamanho * 8 < hi - lo:
+            # Outro filtro é bem mais seletivo: parte dele e ordena só os candidatos
+            filtro = self._filtro(consulta, ignorar=(origem,))
+            chave = _CHAVES[nome]
+            candidatos = sorted(
+                ((chave(e), e.id) for e in (self._gastos[i] for i in self._ids_candidatos(origem, consulta))
+                 if filtro is None or filtro(e)),
+                reverse=consulta.decrescente,
+            )
+            sequencia = iter(candidatos)
+            if consulta.cursor is not None:
+                marca = _decodificar_cursor(nome, consulta.cursor)
+                sequencia = (c for c in candidatos if (c < marca if consulta.decrescente else c > marca))
+            return self._paginar(sequencia, consulta, filtro=None, pular=consulta.offset)
+
+        filtro = self._filtro(consulta, ignorar=(nome,))
+        if consulta.cursor is not None:
+            marca = _decodificar_cursor(nome, consulta.cursor)
+            if consulta.decrescente:
+                hi = min(hi, bisect_left(ordem, marca))
+            else:
+                lo = max(lo, bisect_right(ordem, marca))
+        pular = consulta.offset
+        if filtro is None:
+            # Sem filtros restantes o offset é aritmética de posição, sem percorrer nada
+            if consulta.decrescente:
+                hi, pular = max(lo, hi - pular), 0
+            else:
+                lo, pular = min(hi, lo + pular), 0
+        posicoes = range(hi - 1, lo - 1, -1) if consulta.decrescente else range(lo, hi)
+        return self._paginar((ordem[p] for p in posicoes), consulta, filtro, pular)
+
+    def _paginar(self, chaves: Iterator[Tuple[object, int]], consulta: Consulta, filtro, pular: int) -> ResultadoConsulta:
+        """Consome as chaves em ordem até completar a página (uma a mais para saber se há próxima)."""
+        gastos: List[Expense] = []
+        ultima = None
+        for chave in chaves:
+            expense = self._gastos[chave[1]]
+            if filtro is not None and not filtro(expense):
+                continue
+            if pular:
+                pular -= 1
+                continue
+            if consulta.limite is not None and len(gastos) == consulta.limite:
+                return ResultadoConsulta(gastos, _codificar_cursor(*ultima))
+            gastos.append(expense)
+            ultima = chave
+        return ResultadoConsulta(gastos, None)
+
+    def iterar(self, consulta: Consulta, tamanho_pagina: int = 500, executar: Optional[Callable] = None) -> Iterator[Expense]:
+        """
+        Percorre todo o resultado página a página, por cursor (a consulta pode ser
+        intercalada com alterações). `executar(funcao)` roda cada busca de página em
+        outra thread, se os dados pertencem a ela (ex.: TrabalhadorIO.executar da GUI).
+        """
+        pagina = replace(consulta, limite=tamanho_pagina)
+        while True:
+            atual = pagina
+            resultado = executar(lambda: self.consultar(atual)) if executar else self.consultar(atual)
+            yield from resultado.gastos
+            if resultado.proximo_cursor is None:
+                return
+            pagina = replace(pagina, offset=0, cursor=resultado.proximo_cursor)
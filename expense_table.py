@@ -0,0 +1,218 @@
+# expense_table.py
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from heapq import heappush, heapreplace
+from itertools import compress
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from models import Expense, em_centavos
+
+
+_EPOCA = datetime(1970, 1, 1)
+_SEGUNDOS_DIA = 86400
+
+
+def _para_epoca(data: datetime) -> int:
+    """Segundos desde 1970-01-01 (datas ingênuas, sem fuso, como no restante do sistema)."""
+    delta = data - _EPOCA
+    return delta.days * _SEGUNDOS_DIA + delta.seconds
+
+
+@dataclass
+class ResumoTabela:
+    """Agregados de uma ExpenseTable para o painel de resumo (valores em reais)."""
+    contagem: int = 0
+    total: float = 0.0
+    inicio: Optional[datetime] = None
+    fim: Optional[datetime] = None
+    por_categoria: Dict[int, Tuple[float, int]] = field(default_factory=dict)
+    por_mes: Dict[str, Tuple[float, int]] = field(default_factory=dict)
+    maiores: "ExpenseTable" = None  # os N maiores gastos, do maior para o menor
+
+
+class ExpenseTable:
+    """
+    Coleção colunar e compacta de gastos.
+    - ids e valores (em centavos) em array('q'), categorias em array('B'),
+      datas como segundos desde a época em array('q');
+    - descrições num pool de strings internadas (cada texto distinto guardado uma vez),
+      referenciado por índices em array('I').
+    Filtros, somas e agrupamentos percorrem as colunas diretamente; objetos Expense
+    só são criados quando uma linha é acessada (tabela[i] ou iteração).
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.centavos = array("q")
+        self.categorias = array("B")
+        self.timestamps = array("q")
+        self.descricoes = array("I")
+        self._textos: List[str] = []
+        self._indice_textos: Dict[str, int] = {}
+
+    @classmethod
+    def from_expenses(cls, expenses: Iterable[Expense]) -> "ExpenseTable":
+        tabela = cls()
+        for expense in expenses:
+            tabela.append(expense)
+        return tabela
+
+    def append(self, expense: Expense):
+        """Adiciona um gasto (o id deve já ter sido atribuído pelo StorageManager)."""
+        if expense.id is None:
+            raise ValueError("ExpenseTable exige gastos com id atribuído.")
+        self.ids.append(expense.id)
+        self.centavos.append(em_centavos(expense.valor))
+        self.categorias.append(expense.categoria)
+        self.timestamps.append(_para_epoca(expense.data))
+        self.descricoes.append(self._internar(expense.descricao))
+
+    def _internar(self, texto: str) -> int:
+        indice = self._indice_textos.get(texto)
+        if indice is None:
+            indice = len(self._textos)
+            self._textos.append(texto)
+            self._indice_textos[texto] = indice
+        return indice
+
+    # --- Acesso às linhas (materialização sob demanda) ---
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> Expense:
+        return Expense(
+            id=self.ids[i],
+            valor=self.centavos[i] / 100,
+            descricao=self._textos[self.descricoes[i]],
+            categoria=self.categorias[i],
+            data=_EPOCA + timedelta(seconds=self.timestamps[i]),
+        )
+
+    def __iter__(self) -> Iterator[Expense]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def selecionar(self, indices: Iterable[int]) -> "ExpenseTable":
+        """Nova tabela só com as linhas indicadas (compartilha o pool de descrições)."""
+        nova = ExpenseTable()
+        nova._textos = self._textos
+        nova._indice_textos = self._indice_textos
+        indices = list(indices)
+        nova.ids = array("q", (self.ids[i] for i in indices))
+        nova.centavos = array("q", (self.centavos[i] for i in indices))
+        nova.categorias = array("B", (self.categorias[i] for i in indices))
+        nova.timestamps = array("q", (self.timestamps[i] for i in indices))
+        nova.descricoes = array("I", (self.descricoes[i] for i in indices))
+        return nova
+
+    # --- Operações sobre as colunas ---
+    def mascara(
+        self,
+        categoria: Optional[int] = None,
+        inicio: Optional[datetime] = None,
+        fim: Optional[datetime] = None,
+        valor_min: Optional[float] = None,
+        valor_max: Optional[float] = None,
+    ) -> bytes:
+        """
+        Máscara (um byte 0/1 por linha) das linhas que passam nos filtros (datas em [inicio, fim)).
+        - categoria: bytes.translate sobre a coluna de uint8, sem laço em Python;
+        - datas/valores: uma comparação por linha;
+        - os filtros são combinados com um AND sobre a máscara inteira vista como inteiro.
+        """
+        n = len(self)
+        mascaras = []
+        if categoria is not None:
+            tabela = bytearray(256)
+            tabela[int(categoria)] = 1
+            mascaras.append(self.categorias.tobytes().translate(tabela))
+        if inicio is not None:
+            ts = _para_epoca(inicio)
+            mascaras.append(bytes([t >= ts for t in self.timestamps]))
+        if fim is not None:
+            ts = _para_epoca(fim)
+            mascaras.append(bytes([t < ts for t in self.timestamps]))
+        if valor_min is not None:
+            minimo = em_centavos(valor_min)
+            mascaras.append(bytes([v >= minimo for v in self.centavos]))
+        if valor_max is not None:
+            maximo = em_centavos(valor_max)
+            mascaras.append(bytes([v <= maximo for v in self.centavos]))
+        if not mascaras:
+            return b"\x01" * n
+        combinada = int.from_bytes(mascaras[0], "little")
+        for mascara in mascaras[1:]:
+            combinada &= int.from_bytes(mascara, "little")
+        return combinada.to_bytes(n, "little")
+
+    def filtrar(self, **filtros) -> "ExpenseTable":
+        """Nova tabela com as linhas que passam nos filtros de `mascara`."""
+        return self.selecionar(compress(range(len(self)), self.mascara(**filtros)))
+
+    def soma(self, **filtros) -> float:
+        """Soma dos valores (em reais), opcionalmente filtrada."""
+        if not filtros:
+            return sum(self.centavos) / 100
+        return sum(compress(self.centavos, self.mascara(**filtros))) / 100
+
+    def agrupar_por_categoria(self) -> Dict[int, Tuple[float, int]]:
+        """{categoria: (total, contagem)} numa única passada pelas colunas."""
+        somas: Dict[int, int] = {}
+        contagens: Dict[int, int] = {}
+        for categoria, centavos in zip(self.categorias, self.centavos):
+            somas[categoria] = somas.get(categoria, 0) + centavos
+            contagens[categoria] = contagens.get(categoria, 0) + 1
+        return {c: (somas[c] / 100, contagens[c]) for c in sorted(somas)}
+
+    def agrupar_por_mes(self) -> Dict[str, Tuple[float, int]]:
+        """{"AAAA-MM": (total, contagem)} em ordem cronológica, numa única passada."""
+        mes_do_dia: Dict[int, str] = {}  # converte cada dia distinto uma única vez
+        somas: Dict[str, int] = {}
+        contagens: Dict[str, int] = {}
+        for ts, centavos in zip(self.timestamps, self.centavos):
+            dia = ts // _SEGUNDOS_DIA
+            mes = mes_do_dia.get(dia)
+            if mes is None:
+                mes = (_EPOCA + timedelta(days=dia)).strftime("%Y-%m")
+                mes_do_dia[dia] = mes
+            somas[mes] = somas.get(mes, 0) + centavos
+            contagens[mes] = contagens.get(mes, 0) + 1
+        return {m: (somas[m] / 100, contagens[m]) for m in sorted(somas)}
+
+    def resumir(self, maiores: int = 10) -> ResumoTabela:
+        """
+        Totais por categoria e por mês e os `maiores` gastos numa única passada pelas colunas.
+        Total, contagem e período saem de sum/min/max sobre os arrays, sem laço em Python.
+        """
+        resumo = ResumoTabela(contagem=len(self), total=sum(self.centavos) / 100)
+        if not len(self):
+            resumo.maiores = self.selecionar([])
+            return resumo
+        somas_categoria = [0] * 256  # categorias são uint8: listas indexadas em vez de dicts
+        contagens_categoria = [0] * 256
+        mes_do_dia: Dict[int, str] = {}
+        somas_mes: Dict[str, int] = {}
+        contagens_mes: Dict[str, int] = {}
+        topo: List[Tuple[int, int]] = []  # heap mínimo de (centavos, -linha): empates ficam com a primeira linha
+        for i, (categoria, ts, centavos) in enumerate(zip(self.categorias, self.timestamps, self.centavos)):
+            somas_categoria[categoria] += centavos
+            contagens_categoria[categoria] += 1
+            dia = ts // _SEGUNDOS_DIA
+            mes = mes_do_dia.get(dia)
+            if mes is None:
+                mes = (_EPOCA + timedelta(days=dia)).strftime("%Y-%m")
+                mes_do_dia[dia] = mes
+            somas_mes[mes] = somas_mes.get(mes, 0) + centavos
+            contagens_mes[mes] = contagens_mes.get(mes, 0) + 1
+            if len(topo) < maiores:
+                heappush(topo, (centavos, -i))
+            elif topo and centavos > topo[0][0]:
+                heapreplace(topo, (centavos, -i))
+        resumo.inicio = _EPOCA + timedelta(seconds=min(self.timestamps))
+        resumo.fim = _EPOCA + timedelta(seconds=max(self.timestamps))
+        resumo.por_categoria = {
+            c: (somas_categoria[c] / 100, contagens_categoria[c]) for c in range(256) if contagens_categoria[c]
+        }
+        resumo.por_mes = {m: (somas_mes[m] / 100, contagens_mes[m]) for m in sorted(somas_mes)}
+        resumo.maiores = self.selecionar(-linha for _, linha in sorted(topo, reverse=True))
+        return resumo
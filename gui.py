@@ -1,22 +1,119 @@
 # gui.py
+import queue
+import threading
 import tkinter as tk
-from tkinter import messagebox
+from concurrent.futures import Future
+from dataclasses import replace
+from tkinter import messagebox, ttk
 from datetime import datetime
-from storage import StorageManager
+from typing import Callable, List, Optional, Tuple
+from storage import StorageBase
 from validator import Validator
 from pdf_exporter import PDFGenerator
 from models import Expense, Category
 from report_manager import GeradorRelatoriosCategoria
+from agregados import AgregadorGastos
+from consultas import Consulta, IndiceGastos
+from expense_table import ExpenseTable
+from tarefas import FilaTarefas, TarefaCancelada
+
+
+NOMES_CATEGORIA = {c.value: c.name for c in Category}
+LINHAS_VISIVEIS = 20  # linhas que existem de fato no Treeview
+ARQUIVO_RESUMO = "resumo.pdf"
+
+
+class TrabalhadorIO:
+    """
+    Executa as operações de storage numa thread própria, uma de cada vez e na ordem
+    em que foram pedidas, e entrega os resultados à thread do Tk por root.after
+    (widgets do Tk só podem ser tocados pela thread principal).
+    """
+
+    def __init__(self, root: tk.Tk, intervalo_ms: int = 50):
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self._tarefas = queue.Queue()
+        self._resultados = queue.Queue()
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+        self.root.after(self.intervalo_ms, self._entregar)
+
+    def submeter(self, funcao, ao_concluir=None, ao_falhar=None):
+        """Agenda `funcao()`; ao_concluir(resultado) ou ao_falhar(erro) rodam na thread do Tk."""
+        self._tarefas.put((funcao, ao_concluir, ao_falhar, None, None))
+
+    def executar(self, funcao):
+        """
+        Roda `funcao()` na thread de I/O e espera o resultado. Para threads que não são a
+        do Tk (ex.: a fila de tarefas), que assim não disputam o storage com a de I/O.
+        """
+        futuro = Future()
+
+        def concluir(resultado):
+            futuro.set_result(resultado)
+
+        def falhar(erro):
+            futuro.set_exception(erro)
+
+        self._tarefas.put((funcao, None, None, concluir, falhar))
+        return futuro.result()
+
+    def encerrar(self, timeout: float = 30.0):
+        """Espera as tarefas pendentes terminarem (ex.: uma escrita em andamento) e para a thread."""
+        self._tarefas.put(None)
+        self._thread.join(timeout)
+
+    def _executar(self):
+        while True:
+            tarefa = self._tarefas.get()
+            if tarefa is None:
+                return
+            funcao, ao_concluir, ao_falhar, concluir_aqui, falhar_aqui = tarefa
+            try:
+                resultado = funcao()
+            except Exception as e:
+                if falhar_aqui is not None:
+                    falhar_aqui(e)
+                else:
+                    self._resultados.put((ao_falhar, e))
+            else:
+                if concluir_aqui is not None:
+                    concluir_aqui(resultado)
+                else:
+                    self._resultados.put((ao_concluir, resultado))
+
+    def _entregar(self):
+        """Roda na thread do Tk: repassa os resultados prontos aos callbacks."""
+        try:
+            while True:
+                callback, valor = self._resultados.get_nowait()
+                if callback is not None:
+                    callback(valor)
+        except queue.Empty:
+            pass
+        finally:
+            self.root.after(self.intervalo_ms, self._entregar)
 
 
 class AppGUI:
     """Interface gráfica principal do sistema de gastos."""
 
-    def __init__(self, storage: StorageManager, pdf_generator: PDFGenerator, validator: Validator, report_manager: GeradorRelatoriosCategoria) :
+    def __init__(self, storage: StorageBase, pdf_generator: PDFGenerator, validator: Validator, report_manager: GeradorRelatoriosCategoria, agregador: AgregadorGastos = None, indice: IndiceGastos = None,
+                 preparar: Optional[Callable[[], Tuple[IndiceGastos, Optional[AgregadorGastos]]]] = None,
+                 escrita_adiada: bool = False) :
         self.storage = storage
         self.pdf_generator = pdf_generator
         self.validator = validator
         self.report_manager = report_manager    
+        self.agregador = agregador
+        # Índices ordenados: a lista busca só a janela visível. Eles leem todos os gastos,
+        # então são montados na thread de I/O depois que a janela aparece (ver _preparar_dados);
+        # `preparar()`, se informado, monta e retorna (indice, agregador)
+        self.indice = indice
+        self._preparar = preparar
+        # Escrita adiada (opcional): adições e remoções valem na hora e são gravadas em lote
+        self.escrita_adiada = escrita_adiada
 
         self.root = tk.Tk()
         self.root.title("Controle de Gastos Mensais")
@@ -44,28 +141,251 @@ class AppGUI:
         self.id_delete_entry = tk.Entry(self.root)
         self.id_delete_entry.grid(row=4, column=1)
 
-        # Botões
-        tk.Button(self.root, text="Adicionar Gasto", command=self.add_expense).grid(row=5, column=0, pady=5)
-        tk.Button(self.root, text="Deletar por ID", command=self.delete_by_id).grid(row=5, column=1, pady=5)
-        tk.Button(self.root, text="Deletar Todos", command=self.delete_all).grid(row=6, column=0, pady=5)
-        tk.Button(self.root, text="Gerar PDF", command=self.generate_pdf).grid(row=6, column=1, pady=5)
+        # Botões; os que dependem do índice só são habilitados depois que ele é montado
+        self._acoes_com_indice = []
+        for texto, comando, linha, coluna in (("Adicionar Gasto", self.add_expense, 5, 0),
+                                              ("Deletar por ID", self.delete_by_id, 5, 1),
+                                              ("Deletar Todos", self.delete_all, 6, 0),
+                                              ("Gerar PDF", self.generate_pdf, 6, 1)):
+            botao = tk.Button(self.root, text=texto, command=comando, state=tk.DISABLED)
+            botao.grid(row=linha, column=coluna, pady=5)
+            self._acoes_com_indice.append(botao)
+        tk.Button(self.root, text="Relatórios por Categoria", command=self.gerar_relatorios_categoria).grid(row=7, column=0, pady=5)
+        tk.Button(self.root, text="Resumo PDF", command=self.gerar_resumo).grid(row=7, column=1, pady=5)
+
+        # Lista de gastos (virtualizada: o Treeview só contém as linhas visíveis,
+        # consultadas no índice conforme a posição da barra de rolagem)
+        quadro_lista = tk.Frame(self.root)
+        quadro_lista.grid(row=8, column=0, columnspan=2, pady=10)
+        # Busca na descrição (índice invertido; refeita pouco depois da última tecla)
+        quadro_busca = tk.Frame(quadro_lista)
+        quadro_busca.grid(row=0, column=0, columnspan=2, sticky="we", pady=(0, 5))
+        tk.Label(quadro_busca, text="Buscar:").grid(row=0, column=0, sticky="w")
+        self.busca_entry = tk.Entry(quadro_busca, width=40, state=tk.DISABLED)
+        self.busca_entry.grid(row=0, column=1, sticky="w")
+        self._acoes_com_indice.append(self.busca_entry)
+        self.busca_entry.bind("<KeyRelease>", self._busca_alterada)
+        self.busca_label = tk.Label(quadro_busca, text="")
+        self.busca_label.grid(row=0, column=2, sticky="w", padx=5)
+        self.gastos_tree = ttk.Treeview(
+            quadro_lista, columns=("id", "descricao", "valor", "categoria"),
+            show="headings", height=LINHAS_VISIVEIS, selectmode="browse"
+        )
+        for coluna, titulo, largura in (("id", "ID", 60), ("descricao", "Descrição", 280),
+                                        ("valor", "Valor", 100), ("categoria", "Categoria", 120)):
+            self.gastos_tree.heading(coluna, text=titulo)
+            self.gastos_tree.column(coluna, width=largura, anchor="w")
+        self.gastos_tree.grid(row=1, column=0)
+        self.scrollbar = ttk.Scrollbar(quadro_lista, orient="vertical", command=self._rolar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        self.gastos_tree.bind("<MouseWheel>", self._rolar_roda)
+        self.gastos_tree.bind("<Button-4>", lambda event: self._rolar("scroll", -3, "units"))
+        self.gastos_tree.bind("<Button-5>", lambda event: self._rolar("scroll", 3, "units"))
+
+        # Total geral (vem dos agregados, sem percorrer os gastos)
+        self.total_label = tk.Label(self.root, text="")
+        self.total_label.grid(row=9, column=0, columnspan=2, sticky="w")
+
+        # Progresso das tarefas demoradas (PDF, relatórios por categoria)
+        quadro_tarefa = tk.Frame(self.root)
+        quadro_tarefa.grid(row=10, column=0, columnspan=2, sticky="we", pady=5)
+        self.progresso_bar = ttk.Progressbar(quadro_tarefa, orient="horizontal", length=300, mode="determinate")
+        self.progresso_bar.grid(row=0, column=0, padx=5)
+        self.progresso_label = tk.Label(quadro_tarefa, text="")
+        self.progresso_label.grid(row=0, column=1, sticky="w")
+        self.cancelar_button = tk.Button(quadro_tarefa, text="Cancelar", command=self.cancelar_tarefas, state=tk.DISABLED)
+        self.cancelar_button.grid(row=0, column=2, padx=5)
 
-        # Lista de gastos
-        self.gastos_listbox = tk.Listbox(self.root, width=80)
-        self.gastos_listbox.grid(row=7, column=0, columnspan=2, pady=10)
+        # Consulta exibida na lista, quantos gastos ela retorna, a posição da primeira
+        # linha visível e os gastos dessa janela
+        self._consulta = Consulta(ordenar_por="id")
+        self._total = 0
+        self._inicio = 0
+        self._janela: List[Expense] = []
+        self._pedido_janela = 0  # descarta respostas de buscas já superadas
+        self._busca_agendada = None
 
+        # Acesso ao storage fora da thread do Tk
+        self.io = TrabalhadorIO(self.root)
+        # Exportações e relatórios numa fila própria, para não atrasar adições e remoções
+        self.tarefas = FilaTarefas()
+        self.root.after(50, self._processar_tarefas)
+        self.root.protocol("WM_DELETE_WINDOW", self._fechar)
+
+        # A janela é desenhada já; a leitura dos gastos e a montagem dos índices vêm depois
+        self.total_label.config(text="Carregando gastos...")
+        self.io.submeter(self._preparar_dados, self._dados_prontos, self._dados_falharam)
+
+    def _preparar_dados(self):
+        """Roda na thread de I/O, antes de qualquer outra tarefa dela: monta índices e agregados."""
+        if self._preparar is not None:
+            self.indice, self.agregador = self._preparar()
+        elif self.indice is None:
+            self.indice = IndiceGastos(self.storage)
+        if self.escrita_adiada:
+            # Rajadas de adições/remoções viram uma escrita a cada 0,5s. O flush por tempo
+            # roda aqui na thread de I/O: se outro processo alterou o arquivo, a recarga
+            # reconstrói índice e agregados, que só esta thread consulta. O flush final
+            # (atexit) é registrado depois do salvar dos agregados e do índice, então
+            # roda antes deles (atexit é LIFO)
+            self.storage.adiar_escritas(
+                max_pendentes=50, intervalo=0.5,
+                executar_flush=lambda flush: self._em_segundo_plano(flush, None, "Erro ao gravar gastos"),
+            )
+
+    def _dados_prontos(self, _):
+        for acao in self._acoes_com_indice:
+            acao.config(state=tk.NORMAL)
         self.refresh_listbox()
 
+    def _dados_falharam(self, erro):
+        """Sem o índice, adicionar, deletar, buscar e exportar o PDF continuam desabilitados."""
+        self.total_label.config(text="Gastos não carregados: corrija o erro e abra o programa de novo.")
+        messagebox.showerror("Erro ao carregar gastos", str(erro))
+
+    # --- Lista virtualizada ---
+    def _renderizar(self):
+        """Preenche o Treeview só com a janela de linhas visíveis."""
+        self.gastos_tree.delete(*self.gastos_tree.get_children())
+        for e in self._janela:
+            self.gastos_tree.insert("", tk.END, values=(
+                e.id, e.descricao, f"R$ {e.valor:.2f}", NOMES_CATEGORIA.get(e.categoria, "Desconhecida")
+            ))
+        if self._total:
+            self.scrollbar.set(self._inicio / self._total, (self._inicio + len(self._janela)) / self._total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _rolar(self, acao, quantidade, unidade=None):
+        """Comando da barra de rolagem: ("moveto", fração) ou ("scroll", n, "units"|"pages")."""
+        if acao == "moveto":
+            novo = int(float(quantidade) * self._total)
+        elif acao == "scroll":
+            passo = int(quantidade) * (LINHAS_VISIVEIS if unidade == "pages" else 1)
+            novo = self._inicio + passo
+        else:
+            return
+        novo = min(max(novo, 0), max(self._total - LINHAS_VISIVEIS, 0))
+        if novo != self._inicio:
+            self._inicio = novo
+            self._atualizar_lista()
+
+    def _rolar_roda(self, event):
+        self._rolar("scroll", -3 if event.delta > 0 else 3, "units")
+        return "break"
+
+    def _buscar_janela(self, consulta: Consulta, inicio: int):
+        """Roda na thread de I/O: total da consulta e os gastos da janela a partir de `inicio`."""
+        total = self.indice.contar(consulta)
+        inicio = min(inicio, max(total - LINHAS_VISIVEIS, 0))
+        janela = self.indice.consultar(replace(consulta, offset=inicio, limite=LINHAS_VISIVEIS)).gastos
+        return total, inicio, janela
+
+    def _atualizar_lista(self, operacao=None, ao_concluir=None):
+        """
+        Roda `operacao()` (se houver) na thread de I/O e, na mesma tarefa, busca de novo
+        a janela visível e o total; ao_concluir(resultado da operação) roda na thread do Tk.
+        """
+        self._pedido_janela += 1
+        pedido, consulta, inicio = self._pedido_janela, self._consulta, self._inicio
+
+        def executar():
+            resultado = operacao() if operacao is not None else None
+            return resultado, self._calcular_total(), self._buscar_janela(consulta, inicio)
+
+        def concluido(retorno):
+            resultado, total, janela = retorno
+            self._mostrar_total(total)
+            if pedido == self._pedido_janela:
+                self._total, self._inicio, self._janela = janela
+                self._renderizar()
+                self.busca_label.config(text=f"{self._total} encontrado(s)" if consulta.texto else "")
+            if ao_concluir is not None:
+                ao_concluir(resultado)
+
+        self._em_segundo_plano(executar, concluido)
+
+    def _busca_alterada(self, event=None):
+        """Agenda a busca para 200 ms depois da última tecla, em vez de buscar a cada tecla."""
+        if self._busca_agendada is not None:
+            self.root.after_cancel(self._busca_agendada)
+        self._busca_agendada = self.root.after(200, self._buscar)
+
+    def _buscar(self):
+        self._busca_agendada = None
+        texto = self.busca_entry.get().strip()
+        if texto == (self._consulta.texto or ""):
+            return
+        self._consulta = replace(self._consulta, texto=texto or None)
+        self._inicio = 0
+        self._atualizar_lista()
+
+    # --- Execução em segundo plano ---
+    def _em_segundo_plano(self, funcao, ao_concluir, titulo_erro: str = "Erro"):
+        """Roda `funcao` na thread de I/O; ao_concluir recebe o resultado na thread do Tk."""
+        self.io.submeter(funcao, ao_concluir, lambda erro: messagebox.showerror(titulo_erro, str(erro)))
+
+    def _calcular_total(self):
+        """Total geral pelos agregados (chamado na thread de I/O, junto da operação)."""
+        return self.agregador.total_geral() if self.agregador is not None else None
+
+    def _mostrar_total(self, total):
+        if total is not None:
+            self.total_label.config(text=f"Total registrado: R$ {total.total:.2f} ({total.contagem} gastos)")
+
+    def _fechar(self):
+        """Cancela as tarefas em andamento e espera escritas pendentes antes de fechar a janela."""
+        self.tarefas.encerrar()
+        self.io.encerrar()
+        self.root.destroy()
+
+    # --- Tarefas demoradas ---
+    def _processar_tarefas(self):
+        """Repassa progresso e resultados das tarefas à thread do Tk."""
+        try:
+            self.tarefas.processar_eventos()
+        finally:
+            self.root.after(50, self._processar_tarefas)
+
+    def _iniciar_tarefa(self, nome: str, titulo: str, funcao, ao_concluir, titulo_erro: str = "Erro"):
+        """
+        Enfileira uma tarefa demorada. Cliques repetidos enquanto uma tarefa de mesmo
+        nome ainda espera na fila não criam outra.
+        """
+        def progresso(feito, total, texto):
+            self.progresso_bar.config(maximum=max(total, 1), value=feito)
+            self.progresso_label.config(text=f"{titulo}: {feito}/{total} {texto}")
+
+        def concluida(resultado):
+            self._tarefa_terminou()
+            ao_concluir(resultado)
+
+        def falhou(erro):
+            self._tarefa_terminou()
+            if isinstance(erro, TarefaCancelada):
+                self.progresso_label.config(text=f"{titulo}: cancelado.")
+            else:
+                messagebox.showerror(titulo_erro, str(erro))
+
+        self.tarefas.submeter(nome, funcao, concluida, falhou, progresso)
+        self.progresso_label.config(text=f"{titulo}: aguardando...")
+        self.cancelar_button.config(state=tk.NORMAL)
+
+    def _tarefa_terminou(self):
+        self.progresso_bar.config(value=0)
+        if not self.tarefas.ocupada():
+            self.progresso_label.config(text="")
+            self.cancelar_button.config(state=tk.DISABLED)
+
+    def cancelar_tarefas(self):
+        """Cancela a tarefa em execução e as que aguardam na fila."""
+        self.tarefas.cancelar()
+
     # --- Funções principais ---
     def refresh_listbox(self):
-        """Atualiza a Listbox com os gastos atuais."""
-        self.gastos_listbox.delete(0, tk.END)
-        for e in self.storage.load_all():
-            categoria_nome = Category(e.categoria).name if e.categoria in [c.value for c in Category] else "Desconhecida"
-            self.gastos_listbox.insert(
-                tk.END,
-                f"ID={e.id} | {e.descricao} | R$ {e.valor:.2f} | {categoria_nome}"
-            )
+        """Recarrega a lista de gastos em segundo plano; a janela continua respondendo."""
+        self.total_label.config(text="Carregando gastos...")
+        self._atualizar_lista()
 
     def add_expense(self):
         """Adiciona um novo gasto."""
@@ -87,13 +407,14 @@ class AppGUI:
                 categoria=categoria,
                 data=datetime.now()
             )
+        except Exception as e:
+            messagebox.showerror("Erro", str(e))
+            return
 
-            self.storage.append(expense)
-            self.refresh_listbox()
+        def salvo(_):
             messagebox.showinfo("Sucesso", f"Gasto adicionado com ID {expense.id}!")
 
-        except Exception as e:
-            messagebox.showerror("Erro", str(e))
+        self._atualizar_lista(lambda: self.storage.append(expense), salvo)
 
     def delete_by_id(self):
         """Deleta o gasto pelo ID informado pelo usuário."""
@@ -102,47 +423,83 @@ class AppGUI:
             if not id_str.strip():
                 raise ValueError("Informe um ID para deletar.")
             id_int = int(id_str)
-            removed = self.storage.delete_by_id(id_int)
+        except Exception as e:
+            messagebox.showerror("Erro", str(e))
+            return
+
+        def deletado(removed):
             if removed:
                 messagebox.showinfo("Sucesso", f"Gasto ID {id_int} removido.")
             else:
                 messagebox.showwarning("Aviso", f"ID {id_int} não encontrado.")
-            self.refresh_listbox()
-        except Exception as e:
-            messagebox.showerror("Erro", str(e))
+
+        self._atualizar_lista(lambda: self.storage.delete_by_id(id_int), deletado)
 
     def delete_all(self):
         """Deleta todos os gastos."""
-        count = self.storage.delete_all()
-        messagebox.showinfo("Sucesso", f"{count} registros removidos.")
-        self.refresh_listbox()
+        self._inicio = 0
+        self._atualizar_lista(
+            self.storage.delete_all, lambda count: messagebox.showinfo("Sucesso", f"{count} registros removidos.")
+        )
 
     def generate_pdf(self):
         """Gera o PDF do relatório de gastos."""
-        gastos = self.storage.load_all()
-        self.pdf_generator.generate_pdf(gastos)
-        messagebox.showinfo("PDF Gerado", "Relatório gerado com sucesso!")
+        def exportar(tarefa):
+            # Os gastos vêm do índice em páginas, buscadas pela thread de I/O conforme o PDF avança
+            consulta = Consulta(ordenar_por="id")
+            total = self.io.executar(lambda: self.indice.contar(consulta))
+            tarefa.informar(0, total, "linhas")
+            return self.pdf_generator.generate_pdf_stream(
+                self.indice.iterar(consulta, executar=self.io.executar), progresso=lambda linhas, paginas: tarefa.informar(linhas, total, f"linhas ({paginas} páginas)")
+            )
 
-        def gerar_relatorios_categoria(self):
-         """Chama o gerenciador para criar relatórios por categoria."""
-        try:
-            # Chama a lógica que já foi testada!
-            count = self.report_manager.gerar_todos_os_relatorios()
-            
-            if count > 0:
+        def concluido(paginas):
+            messagebox.showinfo("PDF Gerado", f"Relatório gerado com sucesso! ({paginas} páginas)")
+
+        self._iniciar_tarefa("pdf", "PDF", exportar, concluido)
+
+    def gerar_resumo(self):
+        """Gera o resumo de uma página (totais, evolução mensal e maiores gastos) com gráficos."""
+        def gerar(tarefa):
+            gastos = self.io.executar(self.storage.load_all)
+            tarefa.informar(0, 1, "resumo")
+            return PDFGenerator(ARQUIVO_RESUMO).generate_dashboard(ExpenseTable.from_expenses(gastos))
+
+        def concluido(resumo):
+            messagebox.showinfo("PDF Gerado", f"Resumo de {resumo.contagem} gastos gerado em {ARQUIVO_RESUMO}.")
+
+        self._iniciar_tarefa("resumo", "Resumo", gerar, concluido)
+
+    def gerar_relatorios_categoria(self):
+        """Chama o gerenciador para criar relatórios por categoria."""
+        def concluido(resumo):
+            if resumo.erros:
+                falhas = "\n".join(f"{arquivo}: {erro}" for arquivo, erro in resumo.erros.items())
+                messagebox.showwarning(
+                    "Relatórios com Erros",
+                    f"{resumo.gerados} relatórios gerados, {len(resumo.erros)} falharam:\n{falhas}"
+                )
+            elif resumo.gerados > 0 or resumo.pulados > 0:
                 # Pega o nome do diretório da instância do manager
                 diretorio = self.report_manager.diretorio_relatorios
                 messagebox.showinfo(
                     "Sucesso",
-                    f"{count} relatórios gerados com sucesso!\n"
-                    f"Salvos na pasta: {diretorio}"
+                    f"{resumo.gerados} relatórios gerados com sucesso em {resumo.duracao:.1f}s!\n"
+                    f"{resumo.pulados} relatórios sem alterações foram mantidos.\n"
+                    + (f"{resumo.removidos} relatórios de categorias sem gastos foram apagados.\n" if resumo.removidos else "")
+                    + f"Salvos na pasta: {diretorio}"
                 )
             else:
                 messagebox.showinfo("Aviso", "Não há gastos registrados para gerar relatórios por categoria.")
 
-        except Exception as e:
-            # Captura erros de permissão de pasta ou outros
-            messagebox.showerror("Erro ao Gerar Relatórios", str(e))
+        def gerar(tarefa):
+            grupos = self.io.executar(self.report_manager.agrupar_por_categoria)
+            return self.report_manager.gerar_todos_os_relatorios(
+                progresso=lambda feitos, total: tarefa.informar(feitos, total, "relatórios"), grupos=grupos
+            )
+
+        # Erros de permissão de pasta ou outros aparecem como "Erro ao Gerar Relatórios"
+        self._iniciar_tarefa("relatorios", "Relatórios", gerar, concluido, "Erro ao Gerar Relatórios")
 
     def run(self):
         """Inicia o loop principal da GUI."""
@@ -0,0 +1,140 @@
+# importador.py
+"""
+Importa gastos em lote a partir de CSV ou JSON Lines.
+
+Uso:
+    python importador.py extrato.csv [--backend json|journal|sqlite|mensal]
+    python importador.py gastos.jsonl --backend sqlite
+
+CSV: cabeçalho com as colunas valor, descricao, categoria e (opcional) data,
+separadas por "," ou ";". Valores no formato brasileiro ("1.234,56") são aceitos;
+datas podem estar em ISO (AAAA-MM-DDTHH:MM:SS) ou DD/MM/AAAA.
+JSONL: um objeto por linha, no mesmo formato de Expense.to_dict().
+
+Linhas inválidas são rejeitadas e listadas no final, sem abortar o lote.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from backends import criar_storage
+from models import Expense, ISO_FMT
+
+
+MAX_REJEITADOS_EXIBIDOS = 20
+
+
+def _normalizar_valor(valor: str) -> str:
+    """Converte "1.234,56" em "1234.56"; valores já com ponto decimal passam intactos."""
+    valor = valor.strip().replace("R$", "").strip()
+    if "," in valor:
+        valor = valor.replace(".", "").replace(",", ".")
+    return valor
+
+
+def _normalizar_data(data: str):
+    data = data.strip()
+    if not data:
+        return datetime.now()
+    try:
+        return datetime.strptime(data, "%d/%m/%Y")
+    except ValueError:
+        return datetime.strptime(data, ISO_FMT)
+
+
+class LeitorGastos:
+    """
+    Lê um arquivo CSV/JSONL produzindo um Expense por linha válida.
+    `linha_atual` acompanha a linha sendo consumida, para que os erros de validação
+    reportados pelo StorageManager.extend apontem a linha do arquivo.
+    """
+
+    def __init__(self, caminho: Path):
+        self.caminho = caminho
+        self.linha_atual = 0
+        self.rejeitados: List[Tuple[int, str]] = []
+
+    def rejeitar(self, motivo: str):
+        self.rejeitados.append((self.linha_atual, motivo))
+
+    def __iter__(self) -> Iterator[Expense]:
+        if self.caminho.suffix.lower() in (".jsonl", ".ndjson"):
+            return self._ler_jsonl()
+        return self._ler_csv()
+
+    def _ler_jsonl(self) -> Iterator[Expense]:
+        with open(self.caminho, "r", encoding="utf-8") as f:
+            for numero, linha in enumerate(f, start=1):
+                self.linha_atual = numero
+                if not linha.strip():
+                    continue
+                try:
+                    registro = json.loads(linha)
+                    registro["id"] = None  # IDs são sempre atribuídos pelo StorageManager
+                    yield Expense.from_dict(registro)
+                except (ValueError, TypeError) as e:
+                    self.rejeitar(str(e))
+
+    def _ler_csv(self) -> Iterator[Expense]:
+        with open(self.caminho, "r", encoding="utf-8-sig", newline="") as f:
+            amostra = f.read(4096)
+            f.seek(0)
+            try:
+                dialeto = csv.Sniffer().sniff(amostra, delimiters=",;")
+            except csv.Error:
+                dialeto = csv.excel
+            leitor = csv.DictReader(f, dialect=dialeto)
+            for registro in leitor:
+                self.linha_atual = leitor.line_num
+                try:
+                    yield Expense(
+                        id=None,
+                        valor=_normalizar_valor(registro.get("valor") or ""),
+                        descricao=registro.get("descricao") or "",
+                        categoria=(registro.get("categoria") or "").strip(),
+                        data=_normalizar_data(registro.get("data") or ""),
+                    )
+                except (ValueError, TypeError) as e:
+                    self.rejeitar(str(e))
+
+
+def importar(caminho: Path, backend: Optional[str] = None) -> Tuple[int, List[Tuple[int, str]], float]:
+    """Importa o arquivo num único lote. Retorna (importados, rejeitados, segundos)."""
+    storage = criar_storage(backend)
+    leitor = LeitorGastos(caminho)
+    inicio = time.perf_counter()
+    importados = storage.extend(leitor, on_error=lambda expense, erro: leitor.rejeitar(str(erro)))
+    duracao = time.perf_counter() - inicio
+    return importados, sorted(leitor.rejeitados), duracao
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa gastos em lote a partir de CSV ou JSONL.")
+    parser.add_argument("arquivo", type=Path, help="arquivo .csv ou .jsonl")
+    parser.add_argument("--backend", choices=["json", "journal", "sqlite", "mensal"], default=None,
+                        help="backend de armazenamento (padrão: GASTOS_BACKEND ou json)")
+    args = parser.parse_args(argv)
+
+    try:
+        importados, rejeitados, duracao = importar(args.arquivo, args.backend)
+    except (IOError, OSError, ValueError) as e:
+        print(f"Erro na importação: {e}", file=sys.stderr)
+        return 1
+
+    total = importados + len(rejeitados)
+    taxa = total / duracao if duracao > 0 else float("inf")
+    print(f"{importados} gastos importados, {len(rejeitados)} rejeitados "
+          f"em {duracao:.2f}s ({taxa:,.0f} linhas/s).")
+    for linha, motivo in rejeitados[:MAX_REJEITADOS_EXIBIDOS]:
+        print(f"  linha {linha}: {motivo}", file=sys.stderr)
+    if len(rejeitados) > MAX_REJEITADOS_EXIBIDOS:
+        print(f"  ... e mais {len(rejeitados) - MAX_REJEITADOS_EXIBIDOS} linhas rejeitadas.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+# journal_storage.py
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from metricas import medido
+from models import Expense, SCHEMA_VERSAO
+from storage import StorageComCache, TravaArquivo, carregar_json
+
+# Primeira linha dos journals gravados pelo sistema: habilita o carregamento sem revalidação
+_CABECALHO = json.dumps({"schema": SCHEMA_VERSAO}) + "\n"
+
+
+class JournalStorageManager(StorageComCache):
+    """
+    Gerencia a persistência dos gastos em um journal JSON Lines somente-anexação.
+    - A primeira linha é o cabeçalho {"schema": N}; as demais são gastos
+      (Expense.to_dict()) ou lápides {"id": X, "deletado": true}.
+    - append e delete_by_id escrevem uma única linha; o índice em memória herdado do
+      StorageComCache evita reler o arquivo.
+    - A compactação (reescrita só com os registros vivos) roda em segundo plano quando
+      as linhas mortas passam de `limite_compactacao` e superam as vivas.
+    - Vários processos podem usar o mesmo journal (ex.: a GUI e o importador): as escritas
+      e a troca do arquivo na compactação acontecem sob o lock exclusivo <path>.lock
+      (TravaArquivo, o mesmo do StorageManager), depois de recarregar o que os outros
+      gravaram, então os IDs não se repetem e nenhuma linha anexada se perde.
+    """
+
+    def __init__(self, path: Path, limite_compactacao: int = 1000):
+        self.limite_compactacao = limite_compactacao
+        self._lock = threading.RLock()
+        self._trava_arquivo = TravaArquivo(path.with_name(path.name + ".lock"))
+        self._compactacao: Optional[threading.Thread] = None
+        self._linhas_mortas = 0
+        self._geracao = 0  # muda sempre que o journal é substituído por inteiro
+        super().__init__(path)
+        try:
+            # Criação exclusiva: se outro processo criou o journal antes, mantém o dele
+            with open(self.path, "x", encoding="utf-8") as f:
+                f.write(_CABECALHO)
+        except FileExistsError:
+            pass
+        except OSError as e:
+            raise IOError(f"Erro ao criar journal {self.path}: {e}")
+
+    # --- Leitura do journal ---
+    @staticmethod
+    def _reaplicar(linhas) -> Tuple[Dict[int, dict], Optional[int]]:
+        """
+        Reaplica as linhas do journal. Retorna {id: registro} só com os vivos, na ordem
+        de inserção, e a versão do cabeçalho {"schema": N} (None se não houver).
+        """
+        registros: Dict[int, dict] = {}
+        schema = None
+        for linha in linhas:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                # Linha parcial (queda no meio de uma escrita) → ignora
+                continue
+            if "schema" in registro:
+                schema = registro["schema"]
+            elif registro.get("deletado"):
+                registros.pop(registro.get("id"), None)
+            else:
+                registros[registro.get("id")] = registro
+        return registros, schema
+
+    @medido("storage.carregar_do_disco")
+    def _carregar_do_disco(self) -> List[Expense]:
+        """Reaplica o journal inteiro e conta as linhas mortas (só quando o arquivo mudou)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                linhas = f.readlines()
+        except Exception as e:
+            raise IOError(f"Erro ao carregar journal: {e}")
+        registros, schema = self._reaplicar(linhas)
+        nao_vazias = sum(1 for linha in linhas if linha.strip())
+        self._linhas_mortas = nao_vazias - len(registros) - (schema is not None)
+        converter = Expense.from_trusted_dict if schema == SCHEMA_VERSAO else Expense.from_dict
+        return [converter(d) for d in registros.values()]
+
+    def load_all(self) -> List[Expense]:
+        """Retorna todos os gastos vivos do journal como objetos Expense."""
+        with self._lock:
+            return super().load_all()
+
+    # --- Escrita ---
+    def _anexar_linha(self, registro: dict):
+        """Anexa um registro ao final do journal."""
+        self._anexar_linhas([registro])
+
+    def _anexar_linhas(self, registros: List[dict]):
+        """Anexa os registros ao final do journal numa única escrita."""
+        bloco = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in registros)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(bloco)
+        except Exception as e:
+            self._assinatura = None
+            raise IOError(f"Erro ao gravar no journal: {e}")
+        self._assinatura = self._assinatura_arquivo()
+
+    @medido("storage.save_all")
+    def _save_all(self, data: List[dict]):
+        """Substitui o journal pelos registros informados (escrita atômica via arquivo temporário)."""
+        temporario = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(temporario, "w", encoding="utf-8") as f:
+                f.write(_CABECALHO)
+                for registro in data:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            os.replace(temporario, self.path)
+        except Exception as e:
+            self._assinatura = None
+            raise IOError(f"Erro ao salvar journal: {e}")
+        self._geracao += 1
+        self._linhas_mortas = 0
+        self._assinatura = self._assinatura_arquivo()
+
+    def append(self, expense: Expense):
+        """Adiciona um novo gasto com uma única linha no journal."""
+        with self._lock, self._trava_arquivo:
+            gastos = self._sincronizar()
+            if expense.id is None:
+                expense.id = self._get_next_id()
+            self._anexar_linha(expense.to_dict())
+            gastos[expense.id] = expense
+            self._registrar_id(expense.id)
+            self._notificar("gasto_adicionado", expense)
+
+    def extend(self, expenses: Iterable[Expense], on_error=None) -> int:
+        """Adiciona vários gastos com uma única escrita no final do journal."""
+        novos = self._validar_lote(expenses, on_error)
+        if not novos:
+            return 0
+        with self._lock, self._trava_arquivo:
+            gastos = self._sincronizar()
+            self._atribuir_ids(novos)
+            self._anexar_linhas([e.to_dict() for e in novos])
+            for expense in novos:
+                gastos[expense.id] = expense
+                self._registrar_id(expense.id)
+                self._notificar("gasto_adicionado", expense)
+        return len(novos)
+
+    def delete_by_id(self, id: int) -> bool:
+        """Deleta um gasto pelo ID gravando uma lápide. Retorna True se algo foi removido."""
+        with self._lock, self._trava_arquivo:
+            gastos = self._sincronizar()
+            if id not in gastos:
+                return False
+            self._anexar_linha({"id": id, "deletado": True})
+            self._notificar("gasto_removido", gastos.pop(id))
+            # O registro original e a lápide passam a ser linhas mortas
+            self._linhas_mortas += 2
+            if self._precisa_compactar():
+                self._agendar_compactacao()
+        return True
+
+    def delete_all(self) -> int:
+        """Deleta todos os gastos. Retorna o número de registros removidos."""
+        with self._lock, self._trava_arquivo:
+            gastos = self._sincronizar()
+            count = len(gastos)
+            self._save_all([])
+            gastos.clear()
+        self._notificar("gastos_recarregados", [])
+        return count
+
+    # --- Compactação ---
+    def _precisa_compactar(self) -> bool:
+        return (
+            self._linhas_mortas >= self.limite_compactacao
+            and self._linhas_mortas > len(self._gastos)
+        )
+
+    def _agendar_compactacao(self):
+        """Dispara a compactação numa thread de fundo, se nenhuma estiver em andamento."""
+        if self._compactacao is not None and self._compactacao.is_alive():
+            return
+        self._compactacao = threading.Thread(target=self.compactar, daemon=True)
+        self._compactacao.start()
+
+    def compactar(self):
+        """
+        Reescreve o journal só com os registros vivos.
+        O grosso do trabalho é feito fora dos locks; as linhas anexadas enquanto isso
+        (por este ou por outro processo) são copiadas para o final do novo arquivo antes
+        da troca atômica, feita sob o lock entre processos.
+        """
+        with self._lock, self._trava_arquivo:
+            estado = self.path.stat()
+            offset, inode = estado.st_size, estado.st_ino
+            mortas_no_inicio = self._linhas_mortas
+            geracao = self._geracao
+        with open(self.path, "rb") as f:
+            conteudo = f.read(offset).decode("utf-8")
+        registros, _ = self._reaplicar(conteudo.splitlines())
+
+        # Temporário exclusivo: outra compactação (deste ou de outro processo) pode estar em andamento
+        fd, nome = tempfile.mkstemp(prefix=self.path.name + ".compactando.", dir=self.path.parent)
+        temporario = Path(nome)
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write(_CABECALHO)
+            for registro in registros.values():
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+        with self._lock, self._trava_arquivo:
+            estado = self.path.stat()
+            if geracao != self._geracao or estado.st_ino != inode or estado.st_size < offset:
+                # O journal foi substituído (delete_all ou compactação, aqui ou em outro
+                # processo) enquanto compactávamos
+                os.remove(temporario)
+                return
+            atualizado = self._assinatura_arquivo() == self._assinatura
+            # Copia o que foi anexado durante a compactação
+            with open(self.path, "rb") as origem:
+                origem.seek(offset)
+                cauda = origem.read()
+            with open(temporario, "ab") as destino:
+                destino.write(cauda)
+            os.replace(temporario, self.path)
+            self._linhas_mortas = max(self._linhas_mortas - mortas_no_inicio, 0)
+            # Se a cauda tem linhas de outro processo que o cache ainda não viu, a
+            # próxima leitura relê o journal
+            self._assinatura = self._assinatura_arquivo() if atualizado else None
+
+
+def migrar_json_para_journal(origem: Path, destino: Path) -> int:
+    """
+    Migração única do gastos.json (array JSON) para o formato de journal JSON Lines.
+    Cada registro é convertido via Expense (validado, se vier do formato antigo). Retorna o total migrado.
+    """
+    registros = [e.to_dict() for e in carregar_json(origem)]
+    temporario = destino.with_name(destino.name + ".tmp")
+    try:
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(_CABECALHO)
+            for registro in registros:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        os.replace(temporario, destino)
+    except Exception as e:
+        raise IOError(f"Erro ao gravar journal {destino}: {e}")
+    return len(registros)
@@ -0,0 +1,457 @@
+# mensal_storage.py
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from metricas import medido
+from models import Expense, SCHEMA_VERSAO, em_centavos
+from storage import ConflitoDeVersao, StorageManager, carregar_json, escrever_atomico, expenses_de_json
+
+try:
+    import zstandard
+except ImportError:  # opcional: só necessário com compressao="zstd"
+    zstandard = None
+
+COMPRESSOES = (None, "gzip", "zstd")
+_EXTENSOES = {None: ".json", "gzip": ".json.gz", "zstd": ".json.zst"}
+FORMATO_MANIFESTO = 1
+# Arquivos de meses substituídos só são apagados depois disso (leitores com o manifesto
+# anterior em mãos ainda podem estar abrindo-os)
+SEGUNDOS_ANTES_DE_APAGAR = 60
+
+
+def _mes(data: datetime) -> str:
+    return f"{data.year:04d}-{data.month:02d}"
+
+
+def _manifesto_vazio() -> dict:
+    return {"formato": FORMATO_MANIFESTO, "schema": SCHEMA_VERSAO, "geracao": 0, "proximo_id": 1, "meses": {}}
+
+
+class _Mes:
+    """Os gastos de um mês carregados na memória, com a versão (geração) lida do disco."""
+
+    __slots__ = ("gastos", "versao", "sujo")
+
+    def __init__(self, gastos: Dict[int, Expense], versao: int, sujo: bool = False):
+        self.gastos = gastos
+        self.versao = versao
+        self.sujo = sujo
+
+
+class _GastosMensais:
+    """
+    A coleção id → Expense que as operações do StorageManager alteram, com os meses
+    abertos sob demanda: incluir um gasto abre só o mês dele e remover abre só os meses
+    cujo intervalo de IDs (no manifesto) contém o ID.
+    """
+
+    def __init__(self, storage: "MensalStorageManager"):
+        self._storage = storage
+
+    def __setitem__(self, id_: int, expense: Expense):
+        storage = self._storage
+        mes = _mes(expense.data)
+        for outro in storage._meses_com_id(id_):
+            if outro != mes:  # o gasto mudou de mês: sai do anterior
+                anterior = storage._abrir(outro)
+                anterior.gastos.pop(id_, None)
+                anterior.sujo = True
+        atual = storage._abrir(mes)
+        atual.gastos[id_] = expense
+        atual.sujo = True
+
+    def pop(self, id_: int, padrao=None):
+        storage = self._storage
+        for mes in storage._meses_com_id(id_):
+            shard = storage._abrir(mes)
+            if id_ in shard.gastos:
+                shard.sujo = True
+                return shard.gastos.pop(id_)
+        return padrao
+
+    def clear(self):
+        storage = self._storage
+        for mes in storage._todos_os_meses():
+            versao = storage._manifesto["meses"].get(mes, {}).get("versao", 0)
+            storage._carregados[mes] = _Mes({}, versao, sujo=True)
+
+    def __len__(self) -> int:
+        storage = self._storage
+        return sum(
+            len(storage._carregados[mes].gastos) if mes in storage._carregados
+            else storage._manifesto["meses"][mes]["contagem"]
+            for mes in storage._todos_os_meses()
+        )
+
+    def values(self) -> List[Expense]:
+        """Todos os gastos em ordem de ID (abre todos os meses)."""
+        storage = self._storage
+        gastos = [e for mes in storage._todos_os_meses() for e in storage._abrir(mes).gastos.values()]
+        gastos.sort(key=lambda e: e.id)
+        return gastos
+
+
+class MensalStorageManager(StorageManager):
+    """
+    Gerencia a persistência dos gastos num diretório com um arquivo por mês (AAAA-MM)
+    e um manifesto com, por mês, o arquivo atual, contagem, soma, intervalo de IDs e
+    totais por categoria.
+    - Uma alteração regrava só os meses afetados (um append, só o mês do gasto) e o
+      manifesto, que é o ponto de confirmação: os arquivos de mês são novos a cada
+      gravação (AAAA-MM.v<geração>.json) e só passam a valer quando o manifesto os cita.
+    - Consultas por período (load_between) abrem só os meses do intervalo; por categoria,
+      só os meses que têm a categoria segundo o manifesto. Os meses lidos ficam em memória.
+    - Meses fechados (anteriores ao atual) podem ser gravados comprimidos (gzip, ou zstd
+      se o pacote zstandard estiver instalado).
+    - load_all e load_by_categoria devolvem os gastos em ordem de ID, como os outros
+      backends, e não mês a mês.
+    Locks entre processos, conflito de versão (pela assinatura do manifesto) e escrita
+    adiada seguem o StorageManager.
+    """
+
+    def __init__(self, path: Path, compressao: Optional[str] = None):
+        if compressao not in COMPRESSOES:
+            raise ValueError(f"Compressão inválida: {compressao!r}. Use gzip, zstd ou nenhuma.")
+        if compressao == "zstd" and zstandard is None:
+            raise ValueError("Compressão zstd requer o pacote zstandard (pip install zstandard).")
+        self.compressao = compressao
+        self.arquivo_manifesto = path / "manifesto.json"
+        self._manifesto = _manifesto_vazio()
+        self._carregados: Dict[str, _Mes] = {}
+        self._colecao = _GastosMensais(self)
+        self._substituidos: List[Tuple[float, str]] = []  # (quando, arquivo) a apagar depois
+        super().__init__(path)
+        if not self.arquivo_manifesto.exists():
+            with self._bloqueio():
+                if not self.arquivo_manifesto.exists():
+                    self._save_all([])
+        self.limpar_arquivos_antigos()
+
+    # --- Manifesto e meses ---
+    def _assinatura_arquivo(self) -> Optional[Tuple[int, int, int]]:
+        """A versão dos dados é a do manifesto, regravado a cada alteração."""
+        try:
+            st = self.arquivo_manifesto.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _ler_manifesto(self) -> dict:
+        try:
+            with open(self.arquivo_manifesto, "r", encoding="utf-8") as f:
+                manifesto = json.load(f)
+        except FileNotFoundError:
+            return _manifesto_vazio()
+        except Exception as e:
+            raise IOError(f"Erro ao ler o manifesto {self.arquivo_manifesto}: {e}")
+        if manifesto.get("formato") != FORMATO_MANIFESTO:
+            raise IOError(f"Formato de manifesto desconhecido em {self.arquivo_manifesto}.")
+        return manifesto
+
+    def _todos_os_meses(self) -> Set[str]:
+        return set(self._manifesto["meses"]) | set(self._carregados)
+
+    def _meses_com_id(self, id_: int) -> List[str]:
+        """Meses que podem conter o ID: os carregados que o têm e os outros pelo intervalo do manifesto."""
+        meses = []
+        for mes in self._todos_os_meses():
+            carregado = self._carregados.get(mes)
+            if carregado is not None:
+                if id_ in carregado.gastos:
+                    meses.append(mes)
+            elif self._manifesto["meses"][mes]["id_min"] <= id_ <= self._manifesto["meses"][mes]["id_max"]:
+                meses.append(mes)
+        return meses
+
+    def _abrir(self, mes: str) -> _Mes:
+        """Os gastos do mês, lidos do disco na primeira vez."""
+        carregado = self._carregados.get(mes)
+        if carregado is None:
+            entrada = self._manifesto["meses"].get(mes)
+            if entrada is None:
+                carregado = _Mes({}, 0)
+            else:
+                carregado = _Mes({e.id: e for e in self._ler_mes(mes, entrada)}, entrada["versao"])
+            self._carregados[mes] = carregado
+        return carregado
+
+    @medido("storage.ler_mes")
+    def _ler_mes(self, mes: str, entrada: dict) -> List[Expense]:
+        caminho = self.path / entrada["arquivo"]
+        try:
+            if caminho.name.endswith(_EXTENSOES["gzip"]):
+                texto = gzip.decompress(caminho.read_bytes()).decode("utf-8")
+            elif caminho.name.endswith(_EXTENSOES["zstd"]):
+                if zstandard is None:
+                    raise IOError("o mês está comprimido com zstd e o pacote zstandard não está instalado")
+                texto = zstandard.ZstdDecompressor().decompress(caminho.read_bytes()).decode("utf-8")
+            else:
+                texto = caminho.read_text(encoding="utf-8")
+            return expenses_de_json(json.loads(texto))
+        except FileNotFoundError:
+            raise  # substituído por outro processo: quem chamou relê o manifesto
+        except Exception as e:
+            raise IOError(f"Erro ao ler o mês {mes} ({caminho}): {e}")
+
+    def _gravar_mes(self, mes: str, registros: List[dict], geracao: int, fechado: bool) -> dict:
+        """Grava o arquivo do mês e devolve a entrada dele no manifesto."""
+        compressao = self.compressao if fechado else None
+        nome = f"{mes}.v{geracao}{_EXTENSOES[compressao]}"
+        conteudo = json.dumps({"schema": SCHEMA_VERSAO, "gastos": registros}, ensure_ascii=False)
+        if compressao == "gzip":
+            dados = gzip.compress(conteudo.encode("utf-8"), compresslevel=6)
+        elif compressao == "zstd":
+            dados = zstandard.ZstdCompressor(level=10).compress(conteudo.encode("utf-8"))
+        else:
+            dados = conteudo
+        escrever_atomico(self.path / nome, dados, fsync=self.sincronizar_disco)
+
+        por_categoria: Dict[str, List[int]] = {}
+        for registro in registros:
+            totais = por_categoria.setdefault(str(registro["categoria"]), [0, 0])
+            totais[0] += 1
+            totais[1] += em_centavos(registro["valor"])
+        return {
+            "arquivo": nome,
+            "versao": geracao,
+            "contagem": len(registros),
+            "soma_centavos": sum(totais[1] for totais in por_categoria.values()),
+            "id_min": min(r["id"] for r in registros),
+            "id_max": max(r["id"] for r in registros),
+            "por_categoria": por_categoria,
+        }
+
+    def _apagar_substituidos(self, todos: bool = False):
+        """Apaga os arquivos de meses substituídos há mais de SEGUNDOS_ANTES_DE_APAGAR."""
+        limite = time.time() - SEGUNDOS_ANTES_DE_APAGAR
+        restantes = []
+        for quando, arquivo in self._substituidos:
+            if todos or quando < limite:
+                try:
+                    os.unlink(self.path / arquivo)
+                except OSError:
+                    pass
+            else:
+                restantes.append((quando, arquivo))
+        self._substituidos = restantes
+
+    # --- Cache em memória ---
+    def _sincronizar(self) -> _GastosMensais:
+        """
+        Relê o manifesto se ele mudou e descarta da memória os meses regravados por outro
+        processo. Meses com alterações ainda não gravadas também são descartados: as
+        operações pendentes (escrita adiada) são reaplicadas sobre os dados do disco.
+        """
+        with self._trava_threads:
+            assinatura = self._assinatura_arquivo()
+            if assinatura is not None and assinatura == self._assinatura:
+                return self._colecao
+            manifesto = self._ler_manifesto()
+            self._assinatura = assinatura
+            for mes, carregado in list(self._carregados.items()):
+                entrada = manifesto["meses"].get(mes)
+                if carregado.sujo or entrada is None or entrada["versao"] != carregado.versao:
+                    del self._carregados[mes]
+            self._manifesto = manifesto
+            self._proximo_id = manifesto["proximo_id"]
+            for operacao in self._pendentes:
+                operacao(self._colecao)
+            if self._observadores:
+                self._notificar("gastos_recarregados", self._colecao.values())
+            return self._colecao
+
+    def _lendo(self, leitura: Callable):
+        """Roda uma leitura; se um mês sumiu (regravado por outro processo), relê o manifesto e repete."""
+        try:
+            return leitura()
+        except FileNotFoundError:
+            with self._trava_threads:
+                self._assinatura = None
+                return leitura()
+
+    # --- Acesso ao disco ---
+    @medido("storage.save_all")
+    def _persistir(self):
+        """
+        Grava os meses alterados (e comprime os meses fechados ainda sem compressão, se
+        configurado) e depois o manifesto, que confirma a gravação.
+        Levanta ConflitoDeVersao se o manifesto mudou desde a última leitura/escrita.
+        """
+        if self._assinatura_arquivo() != self._assinatura:
+            raise ConflitoDeVersao(f"{self.arquivo_manifesto} foi alterado por outro processo.")
+        mes_atual = _mes(datetime.now())
+        if self.compressao is not None:
+            extensao = _EXTENSOES[self.compressao]
+            for mes, entrada in self._manifesto["meses"].items():
+                if mes < mes_atual and not entrada["arquivo"].endswith(extensao):
+                    self._abrir(mes).sujo = True
+
+        manifesto = dict(self._manifesto, meses=dict(self._manifesto["meses"]))
+        geracao = manifesto["geracao"] + 1
+        substituidos = []
+        try:
+            for mes, carregado in sorted(self._carregados.items()):
+                if not carregado.sujo:
+                    continue
+                anterior = manifesto["meses"].pop(mes, None)
+                if anterior is not None:
+                    substituidos.append(anterior["arquivo"])
+                if carregado.gastos:
+                    registros = [e.to_dict() for e in carregado.gastos.values()]
+                    manifesto["meses"][mes] = self._gravar_mes(mes, registros, geracao, fechado=mes < mes_atual)
+            manifesto["geracao"] = geracao
+            manifesto["proximo_id"] = max(manifesto["proximo_id"], self._proximo_id)
+            escrever_atomico(self.arquivo_manifesto, json.dumps(manifesto, ensure_ascii=False),
+                             fsync=self.sincronizar_disco)
+        except Exception as e:
+            self._assinatura = None  # força recarga: o disco pode não refletir o cache
+            raise IOError(f"Erro ao salvar gastos mensais: {e}")
+
+        self._manifesto = manifesto
+        self._assinatura = self._assinatura_arquivo()
+        for mes, carregado in list(self._carregados.items()):
+            if carregado.sujo:
+                if carregado.gastos:
+                    carregado.versao = geracao
+                    carregado.sujo = False
+                else:
+                    del self._carregados[mes]
+        agora = time.time()
+        self._substituidos.extend((agora, arquivo) for arquivo in substituidos)
+        self._apagar_substituidos()
+
+    @medido("storage.save_all")
+    def _save_all(self, data: List[dict]):
+        """Substitui todos os meses pelos registros informados (criação do diretório e migração)."""
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            anterior = self._ler_manifesto()
+            geracao = anterior["geracao"] + 1
+            por_mes: Dict[str, List[dict]] = {}
+            for registro in data:
+                por_mes.setdefault(registro["data"][:7], []).append(registro)  # "AAAA-MM" do ISO
+            mes_atual = _mes(datetime.now())
+            manifesto = dict(
+                _manifesto_vazio(),
+                geracao=geracao,
+                proximo_id=max((r["id"] for r in data), default=0) + 1,
+                meses={mes: self._gravar_mes(mes, registros, geracao, fechado=mes < mes_atual)
+                       for mes, registros in sorted(por_mes.items())},
+            )
+            escrever_atomico(self.arquivo_manifesto, json.dumps(manifesto, ensure_ascii=False),
+                             fsync=self.sincronizar_disco)
+        except Exception as e:
+            self._assinatura = None
+            raise IOError(f"Erro ao salvar gastos mensais: {e}")
+        agora = time.time()
+        self._substituidos.extend((agora, entrada["arquivo"]) for entrada in anterior["meses"].values())
+        self._carregados.clear()
+        self._manifesto = manifesto
+        self._proximo_id = manifesto["proximo_id"]
+        self._assinatura = self._assinatura_arquivo()
+
+    # --- API pública ---
+    @medido("storage.load_all")
+    def load_all(self) -> List[Expense]:
+        """Retorna todos os gastos em ordem de ID (abre todos os meses)."""
+        return self._lendo(lambda: self._sincronizar().values())
+
+    def load_by_categoria(self, categoria: int) -> List[Expense]:
+        """Retorna os gastos de uma categoria, abrindo só os meses que a têm."""
+        chave = str(categoria)
+
+        def ler():
+            with self._trava_threads:
+                self._sincronizar()
+                gastos = [
+                    e for mes in self._todos_os_meses()
+                    if mes in self._carregados or chave in self._manifesto["meses"][mes]["por_categoria"]
+                    for e in self._abrir(mes).gastos.values() if e.categoria == categoria
+                ]
+            gastos.sort(key=lambda e: e.id)
+            return gastos
+
+        return self._lendo(ler)
+
+    def load_between(self, inicio: datetime, fim: datetime) -> List[Expense]:
+        """Retorna os gastos com data no intervalo [inicio, fim), abrindo só os meses do intervalo."""
+        de, ate = _mes(inicio), _mes(fim)
+
+        def ler():
+            with self._trava_threads:
+                self._sincronizar()
+                gastos = [
+                    e for mes in sorted(self._todos_os_meses()) if de <= mes <= ate
+                    for e in self._abrir(mes).gastos.values() if inicio <= e.data < fim
+                ]
+            gastos.sort(key=lambda e: e.data)
+            return gastos
+
+        return self._lendo(ler)
+
+    def totais_por_mes(self) -> Dict[str, Tuple[int, float]]:
+        """{"AAAA-MM": (contagem, total)} a partir do manifesto, sem abrir os meses já gravados."""
+        with self._trava_threads:
+            self._sincronizar()
+            totais = {}
+            for mes in sorted(self._todos_os_meses()):
+                carregado = self._carregados.get(mes)
+                if carregado is not None and carregado.sujo:
+                    totais[mes] = (len(carregado.gastos), sum(em_centavos(e.valor) for e in carregado.gastos.values()) / 100)
+                elif mes in self._manifesto["meses"]:
+                    entrada = self._manifesto["meses"][mes]
+                    totais[mes] = (entrada["contagem"], entrada["soma_centavos"] / 100)
+            return {mes: total for mes, total in totais.items() if total[0]}
+
+    def limpar_arquivos_antigos(self):
+        """
+        Apaga arquivos de meses que o manifesto não cita: substituídos em sessões anteriores
+        ou sobras de gravações interrompidas. Roda ao abrir o diretório.
+        """
+        with self._bloqueio():
+            self._sincronizar()
+            citados = {entrada["arquivo"] for entrada in self._manifesto["meses"].values()}
+            limite = time.time() - SEGUNDOS_ANTES_DE_APAGAR
+            for caminho in self.path.glob("*.v*.json*"):
+                if caminho.name not in citados and caminho.stat().st_mtime < limite:
+                    try:
+                        caminho.unlink()
+                    except OSError:
+                        pass
+
+
+def migrar_json_para_mensal(origem: Path, destino: Path, compressao: Optional[str] = None) -> int:
+    """
+    Migração única do gastos.json para o diretório com um arquivo por mês.
+    Cada registro é convertido via Expense (validado, se vier do formato antigo). Retorna o total migrado.
+    A migração é feita num diretório temporário, que só vira `destino` depois de
+    completa: uma falha no meio não deixa um `destino` parcial que pareça já migrado.
+    """
+    registros = [e.to_dict() for e in carregar_json(origem)]
+    temporario = Path(tempfile.mkdtemp(prefix=destino.name + ".migrando.", dir=destino.parent))
+    try:
+        storage = MensalStorageManager(temporario, compressao)
+        with storage._bloqueio():
+            storage._save_all(registros)
+        try:
+            os.replace(temporario, destino)
+        except OSError:
+            if not (destino / "manifesto.json").exists():
+                raise
+            # Outro processo concluiu a migração antes: fica a dele
+            shutil.rmtree(temporario, ignore_errors=True)
+    except Exception as e:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise IOError(f"Erro ao migrar para {destino}: {e}")
+    finally:
+        try:
+            os.unlink(temporario.with_name(temporario.name + ".lock"))  # o lock do StorageManager
+        except OSError:
+            pass
+    return len(registros)
@@ -0,0 +1,218 @@
+# metricas.py
+"""
+Métricas leves dos caminhos críticos (storage, validação, exportação):
+contadores, temporizadores e histogramas, exportáveis em JSON.
+
+Variáveis de ambiente:
+- GASTOS_METRICAS=1: liga a coleta (desligada, cada função medida custa só um teste de flag);
+- GASTOS_METRICAS_ARQUIVO=caminho.json: exporta as métricas nesse arquivo ao sair do processo;
+- GASTOS_PERFIL=nome (ex.: storage.load_all): a primeira chamada dessa operação roda sob o
+  cProfile, e o resultado vai para perfil-<nome>.prof e perfil-<nome>.txt (mais lentas primeiro).
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+_ativo = os.environ.get("GASTOS_METRICAS", "") not in ("", "0")
+_perfil_pendente: Optional[str] = os.environ.get("GASTOS_PERFIL") or None
+_trava = threading.Lock()
+
+
+class Histograma:
+    """
+    Contagem, soma, mínimo, máximo e distribuição em faixas de potências de 2.
+    `escala` converte o valor num inteiro antes de escolher a faixa (1e6: segundos → µs),
+    então os percentis são aproximados (limite superior da faixa).
+    """
+
+    __slots__ = ("escala", "contagem", "soma", "minimo", "maximo", "faixas")
+
+    def __init__(self, escala: float = 1.0):
+        self.escala = escala
+        self.contagem = 0
+        self.soma = 0.0
+        self.minimo: Optional[float] = None
+        self.maximo: Optional[float] = None
+        self.faixas: List[int] = []
+
+    def registrar(self, valor: float):
+        self.contagem += 1
+        self.soma += valor
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+        faixa = int(max(valor, 0) * self.escala).bit_length()
+        if faixa >= len(self.faixas):
+            self.faixas.extend([0] * (faixa + 1 - len(self.faixas)))
+        self.faixas[faixa] += 1
+
+    def percentil(self, p: float) -> Optional[float]:
+        """Limite superior da faixa que contém o percentil p (0 a 1), sem passar do máximo."""
+        if not self.contagem:
+            return None
+        alvo = p * self.contagem
+        acumulado = 0
+        for faixa, quantidade in enumerate(self.faixas):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                return min((1 << faixa) / self.escala, self.maximo)
+        return self.maximo
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "contagem": self.contagem,
+            "soma": self.soma,
+            "media": self.soma / self.contagem if self.contagem else None,
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+            "p50": self.percentil(0.5),
+            "p90": self.percentil(0.9),
+            "p99": self.percentil(0.99),
+        }
+
+
+_contadores: Dict[str, int] = {}
+_tempos: Dict[str, Histograma] = {}
+_histogramas: Dict[str, Histograma] = {}
+
+
+def ativo() -> bool:
+    return _ativo
+
+
+def ativar(ligado: bool = True):
+    """Liga ou desliga a coleta em tempo de execução (ex.: num benchmark)."""
+    global _ativo
+    _ativo = ligado
+
+
+def zerar():
+    with _trava:
+        _contadores.clear()
+        _tempos.clear()
+        _histogramas.clear()
+
+
+def contar(nome: str, quantidade: int = 1):
+    if not _ativo:
+        return
+    with _trava:
+        _contadores[nome] = _contadores.get(nome, 0) + quantidade
+
+
+def observar(nome: str, valor: float):
+    """Registra um valor (ex.: bytes gravados, gastos num lote) no histograma `nome`."""
+    if not _ativo:
+        return
+    with _trava:
+        histograma = _histogramas.get(nome)
+        if histograma is None:
+            histograma = _histogramas[nome] = Histograma()
+        histograma.registrar(valor)
+
+
+def registrar_tempo(nome: str, segundos: float):
+    if not _ativo:
+        return
+    with _trava:
+        histograma = _tempos.get(nome)
+        if histograma is None:
+            histograma = _tempos[nome] = Histograma(escala=1e6)
+        histograma.registrar(segundos)
+
+
+@contextmanager
+def cronometrar(nome: str):
+    """`with cronometrar("x"):` registra a duração do bloco no temporizador `nome`."""
+    if not _ativo:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_tempo(nome, time.perf_counter() - inicio)
+
+
+def medido(nome: str) -> Callable:
+    """
+    Decorador: conta e cronometra as chamadas da função no temporizador `nome` e, se
+    GASTOS_PERFIL=nome, roda a primeira chamada sob o cProfile.
+    """
+
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if _perfil_pendente is not None and _perfil_pendente == nome:
+                return _perfilar(nome, funcao, args, kwargs)
+            if not _ativo:
+                return funcao(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registrar_tempo(nome, time.perf_counter() - inicio)
+
+        return medida
+
+    return decorar
+
+
+def _perfilar(nome: str, funcao, args, kwargs):
+    """Roda uma chamada sob o cProfile e grava o perfil (.prof para pstats/snakeviz e .txt)."""
+    global _perfil_pendente
+    import cProfile
+    import io
+    import pstats
+
+    with _trava:
+        if _perfil_pendente != nome:  # outra thread já pegou esta captura
+            return funcao(*args, **kwargs)
+        _perfil_pendente = None
+    perfil = cProfile.Profile()
+    inicio = time.perf_counter()
+    try:
+        return perfil.runcall(funcao, *args, **kwargs)
+    finally:
+        registrar_tempo(nome, time.perf_counter() - inicio)
+        base = Path(f"perfil-{nome}")
+        perfil.dump_stats(str(base.with_name(base.name + ".prof")))
+        texto = io.StringIO()
+        pstats.Stats(perfil, stream=texto).sort_stats("cumulative").print_stats(40)
+        base.with_name(base.name + ".txt").write_text(texto.getvalue(), encoding="utf-8")
+
+
+def instantaneo() -> Dict[str, Any]:
+    """Cópia das métricas coletadas até agora, no formato exportado."""
+    with _trava:
+        return {
+            "gerado_em": datetime.now().isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            "contadores": dict(sorted(_contadores.items())),
+            "tempos_s": {nome: h.to_dict() for nome, h in sorted(_tempos.items())},
+            "histogramas": {nome: h.to_dict() for nome, h in sorted(_histogramas.items())},
+        }
+
+
+def exportar(caminho: Union[str, Path]):
+    """Grava instantaneo() em JSON (escrita atômica)."""
+    caminho = Path(caminho)
+    temporario = caminho.with_name(caminho.name + ".tmp")
+    try:
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(instantaneo(), f, ensure_ascii=False, indent=2)
+        os.replace(temporario, caminho)
+    except Exception as e:
+        raise IOError(f"Erro ao exportar métricas: {e}")
+
+
+if _ativo and os.environ.get("GASTOS_METRICAS_ARQUIVO"):
+    atexit.register(exportar, os.environ["GASTOS_METRICAS_ARQUIVO"])
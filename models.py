@@ -1,15 +1,26 @@
 # models.py
+import math
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, Optional
+from metricas import medido
 
 
 ISO_FMT = "%Y-%m-%dT%H:%M:%S"  # padrão para serializar datas
 
+# Versão do formato gravado pelo próprio sistema. Arquivos marcados com ela foram
+# escritos por Expense.to_dict e podem ser carregados sem revalidação (from_trusted_dict).
+SCHEMA_VERSAO = 2
 
-@dataclass
+
+def em_centavos(valor: float) -> int:
+    """Valor em reais como centavos inteiros: somas e comparações exatas entre valores."""
+    return int(round(valor * 100))
+
+
+@dataclass(slots=True)
 class Expense:
     """
     Representa um gasto individual.
@@ -18,6 +29,7 @@ class Expense:
     - descricao: string não-vazia.
     - categoria: int (deve corresponder a Category).
     - data: datetime (momento do registro).
+    Usa __slots__ (sem __dict__ por instância) para reduzir a memória em listas grandes.
     """
     id: Optional[int]
     valor: float
@@ -38,6 +50,8 @@ class Expense:
             self.valor = float(self.valor)
         except Exception as exc:
             raise ValueError(f"Valor inválido para 'valor': {self.valor!r}. Deve ser numérico.") from exc
+        if not math.isfinite(self.valor):
+            raise ValueError(f"Valor inválido para 'valor': {self.valor!r}. Deve ser um número finito.")
         if self.valor < 0:
             raise ValueError("Valor do gasto não pode ser negativo.")
 
@@ -62,10 +76,11 @@ class Expense:
             "valor": round(float(self.valor), 2),
             "descricao": self.descricao.strip(),
             "categoria": int(self.categoria),
-            "data": self.data.strftime(ISO_FMT),
+            "data": self.data.isoformat(timespec="seconds"),  # mesmo formato de ISO_FMT
         }
 
     @classmethod
+    @medido("models.from_dict")
     def from_dict(cls, data: Dict[str, Any]) -> "Expense":
         """
         Cria um Expense a partir de um dicionário (por exemplo, carregado do JSON).
@@ -89,6 +104,26 @@ class Expense:
 
         return cls(id=id_, valor=valor, descricao=descricao, categoria=categoria, data=data_field)
 
+    @classmethod
+    def from_trusted_dict(cls, data: Dict[str, Any]) -> "Expense":
+        """
+        Caminho rápido de from_dict para registros gravados pelo próprio sistema
+        (arquivos marcados com SCHEMA_VERSAO): não revalida nem converte tipos.
+        Não use com dados externos — para esses, use from_dict.
+        """
+        return cls.from_trusted_fields(data["id"], data["valor"], data["descricao"], data["categoria"], data["data"])
+
+    @classmethod
+    def from_trusted_fields(cls, id_: int, valor: float, descricao: str, categoria: int, data: str) -> "Expense":
+        """Monta um Expense a partir de campos já validados, sem passar por __post_init__."""
+        expense = object.__new__(cls)
+        expense.id = id_
+        expense.valor = valor
+        expense.descricao = descricao
+        expense.categoria = categoria
+        expense.data = datetime.fromisoformat(data)
+        return expense
+
 
 class Category(Enum):
     """Enumeração simples de categorias com helpers para exibição e listagem."""
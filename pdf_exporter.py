@@ -1,22 +1,81 @@
 # pdf_generator.py
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from typing import List
+# O ReportLab (~0,2s de importação) só é importado dentro dos métodos, na primeira
+# exportação, para não atrasar a abertura do programa.
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from expense_table import ExpenseTable, ResumoTabela
+from metricas import medido
 from models import Expense, Category
 
+
+# Altura fixa das linhas das tabelas do relatório em páginas: permite calcular quantas
+# cabem no quadro da página (descrições não quebram linha)
+ALTURA_LINHA = 18
+
+# Maiores gastos no resumo de uma página junto com as 5 categorias e o gráfico mensal.
+# Medido no A4: 13 cabem e 14 já abrem a segunda página; o limite fica uma linha abaixo
+# de propósito, como folga para fontes e rótulos que ocupem um pouco mais
+MAIORES_NO_RESUMO = 12
+
+
+def _gastos_que_cabem(altura: float, com_transporte: bool) -> int:
+    """Gastos que cabem numa tabela de `altura` pontos, além do cabeçalho, do rodapé e do transporte."""
+    return int((altura - 1) // ALTURA_LINHA) - 2 - com_transporte  # 1pt de folga para as bordas
+
+
+class _FlowablesSobDemanda(list):
+    """
+    Lista de flowables que se reabastece a partir de um gerador conforme o ReportLab
+    consome o início dela (doc.build faz `del flowables[0]` a cada flowable tratado).
+    Assim só alguns flowables existem em memória ao mesmo tempo.
+    """
+
+    def __init__(self, fonte: Iterator, minimo: int = 2):
+        super().__init__()
+        self._fonte = fonte
+        self._minimo = minimo
+        self._abastecer()
+
+    def _abastecer(self):
+        while self._fonte is not None and super().__len__() < self._minimo:
+            try:
+                self.append(next(self._fonte))
+            except StopIteration:
+                self._fonte = None
+
+    def __delitem__(self, indice):
+        super().__delitem__(indice)
+        self._abastecer()
+
+
+def _ultimos_meses(por_mes: Dict[str, Tuple[float, int]], meses: int) -> List[Tuple[str, float]]:
+    """Os `meses` meses até o último com gastos, incluindo os meses sem gastos (total 0)."""
+    ultimo = max(por_mes)
+    ano, mes = int(ultimo[:4]), int(ultimo[5:7])
+    serie = []
+    for _ in range(meses):
+        chave = f"{ano:04d}-{mes:02d}"
+        serie.append((chave, por_mes.get(chave, (0.0, 0))[0]))
+        ano, mes = (ano, mes - 1) if mes > 1 else (ano - 1, 12)
+    return serie[::-1]
+
+
 class PDFGenerator:
     """Classe responsável por gerar PDF a partir de uma lista de gastos usando ReportLab."""
 
     def __init__(self, filename: str = "relatorio.pdf"):
         self.filename = filename
 
+    @medido("pdf.generate_pdf")
     def generate_pdf(self, expenses: List[Expense]) -> None:
         """
         Gera um PDF com os gastos informados.
         - expenses: lista de objetos Expense
         """
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
         doc = SimpleDocTemplate(str(self.filename), pagesize=A4)
         elements = []
         styles = getSampleStyleSheet()
@@ -60,4 +119,236 @@ class PDFGenerator:
         # Salva PDF
         doc.build(elements)
 
+    @medido("pdf.generate_pdf_stream")
+    def generate_pdf_stream(
+        self,
+        expenses: Iterable[Expense],
+        linhas_por_pagina: Optional[int] = None,
+        progresso: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Gera o mesmo relatório consumindo `expenses` sob demanda (ex.: um gerador sobre o storage).
+        - Cada página recebe uma tabela própria, com cabeçalho repetido, a linha
+          "Transportado" (subtotal das páginas anteriores) e "A transportar" no rodapé.
+        - linhas_por_pagina: gastos por página; padrão (None) é o máximo que cabe no quadro
+          da página, calculado pela altura fixa das linhas. Valores que não cabem levantam
+          ValueError (a tabela seria quebrada pelo ReportLab e os subtotais ficariam errados).
+        - Só a página em construção fica em memória, então o pico de memória
+          não depende da quantidade de gastos.
+        - progresso(linhas, paginas) é chamado a cada página montada; uma exceção levantada
+          nele (ex.: cancelamento) interrompe a geração.
+        Retorna o número de páginas geradas.
+        """
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+        doc = SimpleDocTemplate(str(self.filename), pagesize=A4)
+        titulo = Paragraph("Relatório de Gastos Mensais", getSampleStyleSheet()['Title'])
+        # O quadro do SimpleDocTemplate tem 6pt de respiro em cada borda
+        largura, altura = doc.width - 12, doc.height - 12
+        altura_titulo = titulo.wrap(largura, altura)[1] + titulo.getSpaceBefore() + titulo.getSpaceAfter() + 12
+        maximo = _gastos_que_cabem(altura, com_transporte=True)
+        if linhas_por_pagina is None:
+            linhas_por_pagina = maximo
+        elif not 1 <= linhas_por_pagina <= maximo:
+            raise ValueError(f"linhas_por_pagina deve estar entre 1 e {maximo} (o que cabe numa página).")
+        primeira = min(linhas_por_pagina, _gastos_que_cabem(altura - altura_titulo, com_transporte=False))
+
+        paginas = []
+        flowables = self._paginas_em_blocos(iter(expenses), titulo, primeira, linhas_por_pagina, paginas, progresso)
+        doc.build(_FlowablesSobDemanda(flowables))
+        return len(paginas)
+
+    def _paginas_em_blocos(self, expenses: Iterator[Expense], titulo, primeira: int, linhas_por_pagina: int,
+                           paginas: list, progresso=None):
+        """Gera os flowables página a página; `paginas` recebe uma entrada por página emitida."""
+        from reportlab.platypus import PageBreak, Spacer
+
+        yield titulo
+        yield Spacer(1, 12)
+
+        # A primeira página perde espaço para o título
+        limite = primeira
+        transportado = 0.0
+        bloco: List[Expense] = []
+        for e in expenses:
+            if len(bloco) == limite:
+                yield self._tabela_da_pagina(bloco, transportado, len(paginas) > 0, final=False)
+                yield PageBreak()
+                paginas.append(len(bloco))
+                if progresso is not None:
+                    progresso(sum(paginas), len(paginas))
+                transportado += sum(g.valor for g in bloco)
+                bloco = []
+                limite = linhas_por_pagina
+            bloco.append(e)
+        yield self._tabela_da_pagina(bloco, transportado, len(paginas) > 0, final=True)
+        paginas.append(len(bloco))
+        if progresso is not None:
+            progresso(sum(paginas), len(paginas))
+
+    @staticmethod
+    def _tabela_da_pagina(bloco: List[Expense], transportado: float, com_transporte: bool, final: bool):
+        from reportlab.lib import colors
+        from reportlab.platypus import Table, TableStyle
+
+        data = [["ID", "Data", "Descrição", "Categoria", "Valor (R$)"]]
+        if com_transporte:
+            data.append(["", "", "", "Transportado", f"{transportado:.2f}"])
+        subtotal = transportado
+        for e in bloco:
+            data.append([
+                str(e.id),
+                e.data.strftime("%d/%m/%Y"),
+                " ".join(e.descricao.split()),  # quebras de linha mudariam a altura das linhas
+                Category(e.categoria).name,
+                f"{e.valor:.2f}"
+            ])
+            subtotal += e.valor
+        data.append(["", "", "", "Total Geral" if final else "A transportar", f"{subtotal:.2f}"])
+
+        table = Table(data, colWidths=[30, 70, 200, 100, 60], rowHeights=[ALTURA_LINHA] * len(data), repeatRows=1)
+        style = TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.gray),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+            ('ALIGN', (2,1), (2,-2), 'LEFT'),
+            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0,0), (-1,0), 8),
+            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+            ('BACKGROUND', (0,-1), (-1,-1), colors.lightgrey)
+        ])
+        if com_transporte:
+            style.add('BACKGROUND', (0,1), (-1,1), colors.lightgrey)
+        table.setStyle(style)
+        return table
+
+
+    @medido("pdf.generate_dashboard")
+    def generate_dashboard(self, tabela: ExpenseTable, maiores: int = 10, meses: int = 12) -> ResumoTabela:
+        """
+        Gera um resumo de uma página: totais por categoria (gráfico de barras e tabela),
+        evolução dos últimos `meses` meses (gráfico de linha) e os `maiores` gastos
+        (até MAIORES_NO_RESUMO; ValueError acima disso, que não cabe na página).
+        Os agregados vêm de uma única passada pelas colunas (ExpenseTable.resumir); a
+        renderização só depende do número de categorias, meses e `maiores`, não de quantos
+        gastos existem. Retorna o resumo usado.
+        """
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+        if not 0 <= maiores <= MAIORES_NO_RESUMO:
+            raise ValueError(f"O resumo mostra de 0 a {MAIORES_NO_RESUMO} maiores gastos (recebido: {maiores}).")
+        resumo = tabela.resumir(maiores)
+        doc = SimpleDocTemplate(str(self.filename), pagesize=A4, topMargin=40, bottomMargin=40)
+        styles = getSampleStyleSheet()
+        elements = [Paragraph("Resumo de Gastos", styles['Title'])]
+        if not resumo.contagem:
+            elements.append(Paragraph("Não há gastos registrados.", styles['Normal']))
+            doc.build(elements)
+            return resumo
+
+        elements.append(Paragraph(
+            f"Período: {resumo.inicio.strftime('%d/%m/%Y')} a {resumo.fim.strftime('%d/%m/%Y')} — "
+            f"{resumo.contagem} gastos — Total: R$ {resumo.total:.2f}", styles['Normal']
+        ))
+        estilo_tabela = TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.gray),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0,0), (-1,-1), 9),
+            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+        ])
+
+        # Por categoria: gráfico ao lado da tabela
+        elements.append(Spacer(1, 10))
+        elements.append(Paragraph("Total por categoria", styles['Heading2']))
+        dados = [["Categoria", "Qtd.", "Total (R$)", "%"]]
+        for categoria, (total, contagem) in resumo.por_categoria.items():
+            percentual = 100 * total / resumo.total if resumo.total else 0.0
+            dados.append([Category(categoria).name, str(contagem), f"{total:.2f}", f"{percentual:.1f}"])
+        tabela_categorias = Table(dados, colWidths=[80, 40, 70, 40])
+        tabela_categorias.setStyle(estilo_tabela)
+        grafico_categorias = self._grafico_barras(
+            [Category(c).name for c in resumo.por_categoria],
+            [total for total, _ in resumo.por_categoria.values()],
+        )
+        lado_a_lado = Table([[grafico_categorias, tabela_categorias]], colWidths=[240, 240])
+        lado_a_lado.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'MIDDLE')]))
+        elements.append(lado_a_lado)
+
+        # Evolução mensal
+        serie = _ultimos_meses(resumo.por_mes, meses)
+        variacao = ""
+        if len(serie) > 1 and serie[-2][1]:
+            variacao = f" ({100 * (serie[-1][1] / serie[-2][1] - 1):+.1f}% em relação ao mês anterior)"
+        elements.append(Spacer(1, 10))
+        elements.append(Paragraph(f"Evolução mensal (últimos {len(serie)} meses)", styles['Heading2']))
+        elements.append(Paragraph(
+            f"{serie[-1][0][5:7]}/{serie[-1][0][:4]}: R$ {serie[-1][1]:.2f}{variacao}", styles['Normal']
+        ))
+        elements.append(self._grafico_linha([f"{m[5:7]}/{m[2:4]}" for m, _ in serie], [total for _, total in serie]))
+
+        # Maiores gastos
+        elements.append(Spacer(1, 10))
+        elements.append(Paragraph(f"{len(resumo.maiores)} maiores gastos", styles['Heading2']))
+        dados = [["ID", "Data", "Descrição", "Categoria", "Valor (R$)"]]
+        for e in resumo.maiores:
+            dados.append([
+                str(e.id),
+                e.data.strftime("%d/%m/%Y"),
+                " ".join(e.descricao.split())[:45],
+                Category(e.categoria).name,
+                f"{e.valor:.2f}"
+            ])
+        tabela_maiores = Table(dados, colWidths=[40, 70, 200, 100, 70])
+        estilo_maiores = TableStyle(estilo_tabela.getCommands())
+        estilo_maiores.add('ALIGN', (2,1), (2,-1), 'LEFT')
+        tabela_maiores.setStyle(estilo_maiores)
+        elements.append(tabela_maiores)
+
+        doc.build(elements)
+        return resumo
+
+    @staticmethod
+    def _grafico_barras(rotulos: List[str], valores: List[float]):
+        from reportlab.graphics.charts.barcharts import VerticalBarChart
+        from reportlab.graphics.shapes import Drawing
+        from reportlab.lib import colors
+
+        desenho = Drawing(240, 150)
+        grafico = VerticalBarChart()
+        grafico.x, grafico.y, grafico.width, grafico.height = 40, 30, 190, 110
+        grafico.data = [valores]
+        grafico.categoryAxis.categoryNames = rotulos
+        grafico.categoryAxis.labels.fontSize = 7
+        grafico.categoryAxis.labels.angle = 20
+        grafico.categoryAxis.labels.boxAnchor = 'ne'
+        grafico.valueAxis.valueMin = 0
+        grafico.valueAxis.labels.fontSize = 7
+        grafico.bars[0].fillColor = colors.steelblue
+        desenho.add(grafico)
+        return desenho
+
+    @staticmethod
+    def _grafico_linha(rotulos: List[str], valores: List[float]):
+        from reportlab.graphics.charts.linecharts import HorizontalLineChart
+        from reportlab.graphics.shapes import Drawing
+        from reportlab.lib import colors
 
+        desenho = Drawing(480, 150)
+        grafico = HorizontalLineChart()
+        grafico.x, grafico.y, grafico.width, grafico.height = 45, 20, 420, 120
+        grafico.data = [valores]
+        grafico.categoryAxis.categoryNames = rotulos
+        grafico.categoryAxis.labels.fontSize = 7
+        grafico.valueAxis.valueMin = 0
+        grafico.valueAxis.labels.fontSize = 7
+        grafico.lines[0].strokeColor = colors.steelblue
+        grafico.lines[0].strokeWidth = 2
+        desenho.add(grafico)
+        return desenho
@@ -1,14 +1,69 @@
 # Em um novo arquivo, ex: report_manager.py
-from pathlib import Path 
-from storage import StorageManager
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from storage import StorageBase
 from pdf_exporter import PDFGenerator
-from models import Category
+from metricas import contar, medido
+from models import Category, Expense
+from consultas import Consulta, IndiceGastos
+
+
+@dataclass
+class ResumoRelatorios:
+    """
+    Resultado de uma geração de relatórios por categoria.
+    - gerados: quantidade de PDFs gerados com sucesso.
+    - pulados: quantidade de PDFs mantidos por não haver mudança nos gastos da categoria.
+    - removidos: quantidade de PDFs apagados porque a categoria ficou sem gastos.
+    - tempos: segundos gastos em cada arquivo gerado.
+    - erros: mensagem de erro por arquivo que falhou.
+    - duracao: tempo total da geração, em segundos.
+    """
+    gerados: int = 0
+    pulados: int = 0
+    removidos: int = 0
+    tempos: Dict[str, float] = field(default_factory=dict)
+    erros: Dict[str, str] = field(default_factory=dict)
+    duracao: float = 0.0
+
+
+# Entra no hash de cada categoria: mudar o layout dos PDFs invalida os relatórios já gerados
+VERSAO_LAYOUT = 1
+
+
+def _hash_gastos(gastos: List[Expense]) -> str:
+    """Hash do conteúdo de um conjunto de gastos, independente da ordem de carregamento."""
+    h = hashlib.sha256(f"layout={VERSAO_LAYOUT}\n".encode("utf-8"))
+    for gasto in sorted(gastos, key=lambda g: (g.id is None, g.id or 0)):
+        h.update(json.dumps(gasto.to_dict(), sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def _renderizar_relatorio(caminho: str, gastos: List[Expense]) -> float:
+    """Gera o PDF de uma categoria e retorna o tempo gasto (roda nos processos do pool)."""
+    inicio = time.perf_counter()
+    PDFGenerator(filename=caminho).generate_pdf(gastos)
+    return time.perf_counter() - inicio
+
 
 class GeradorRelatoriosCategoria:
-    def __init__(self, storage: StorageManager):
+    def __init__(self, storage: StorageBase, max_workers: Optional[int] = None, indice: Optional[IndiceGastos] = None):
         self.storage = storage
+        # Com o índice, cada categoria é consultada direto, sem percorrer todos os gastos
+        self.indice = indice
         # 1. Definir o nome do diretório
         self.diretorio_relatorios = Path("relatorios_por_categoria")
+        # Processos usados na renderização (None = número de CPUs; 1 = sem pool)
+        self.max_workers = max_workers
+        # Manifesto com o hash dos gastos de cada relatório já gerado
+        self.arquivo_manifesto = self.diretorio_relatorios / ".manifesto.json"
 
     def _preparar_diretorio(self):
         """Cria o diretório de relatórios se ele não existir."""
@@ -18,32 +73,134 @@ class GeradorRelatoriosCategoria:
             # Lida com um possível erro de permissão
             raise IOError(f"Não foi possível criar o diretório {self.diretorio_relatorios}: {e}")
 
-    def gerar_todos_os_relatorios(self) -> int:
+    def _carregar_manifesto(self) -> Dict[str, str]:
+        """Lê {arquivo: hash} do manifesto; manifesto ausente ou corrompido vale como vazio."""
+        try:
+            with open(self.arquivo_manifesto, "r", encoding="utf-8") as f:
+                manifesto = json.load(f)
+            return manifesto if isinstance(manifesto, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _salvar_manifesto(self, manifesto: Dict[str, str]):
+        """Grava o manifesto de forma atômica (arquivo temporário + rename)."""
+        temporario = self.arquivo_manifesto.with_name(self.arquivo_manifesto.name + ".tmp")
+        try:
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(manifesto, f, indent=2, sort_keys=True)
+            os.replace(temporario, self.arquivo_manifesto)
+        except Exception as e:
+            raise IOError(f"Erro ao salvar manifesto {self.arquivo_manifesto}: {e}")
+
+    def agrupar_por_categoria(self) -> Dict[Category, List[Expense]]:
+        """Separa os gastos por categoria (pelo índice, se houver; senão numa única passada)."""
+        if self.indice is not None:
+            grupos = {c: self.indice.consultar(Consulta(categoria=c.value)).gastos for c in Category}
+            return {c: gastos for c, gastos in grupos.items() if gastos}
+        ids_validos = {c.value: c for c in Category}
+        grupos: Dict[Category, List[Expense]] = {}
+        for gasto in self.storage.load_all():
+            categoria = ids_validos.get(gasto.categoria)
+            if categoria is not None:
+                grupos.setdefault(categoria, []).append(gasto)
+        return grupos
+
+    @medido("relatorios.gerar_todos")
+    def gerar_todos_os_relatorios(
+        self,
+        forcar: bool = False,
+        progresso: Optional[Callable[[int, int], None]] = None,
+        grupos: Optional[Dict[Category, List[Expense]]] = None,
+    ) -> ResumoRelatorios:
+        """
+        Gera um PDF por categoria com gastos, em paralelo num ProcessPoolExecutor
+        (a renderização do ReportLab é limitada por CPU e pelo GIL).
+        Categorias cujo hash de gastos bate com o manifesto (e cujo PDF ainda existe)
+        são puladas, a menos que `forcar` seja True. O PDF de uma categoria que ficou
+        sem gastos é apagado (e sai do manifesto), para não parecer atual.
+        Falhas de um relatório não interrompem os demais; ficam em `erros` no resumo.
+        - progresso(feitos, total) é chamado a cada relatório terminado; uma exceção
+          levantada nele (ex.: cancelamento) descarta os relatórios ainda não iniciados.
+        - grupos: gastos já separados por categoria (agrupar_por_categoria); se None, são consultados.
+        """
+        inicio = time.perf_counter()
         # 2. Garante que o diretório exista antes de começar
         self._preparar_diretorio()
-        
-        todos_os_gastos = self.storage.load_all() #
-        contador_relatorios = 0
-
-        for categoria in Category: #
-            gastos_da_categoria = [
-                gasto for gasto in todos_os_gastos 
-                if gasto.categoria == categoria.value
-            ]
-
-            if gastos_da_categoria:
-                # 3. Usa o operador / do pathlib para montar o caminho
-                nome_arquivo = f"relatorio_{categoria.name.lower()}.pdf"
-                caminho_completo = self.diretorio_relatorios / nome_arquivo
-                
-                # 4. Passa o caminho completo para o gerador
-                # É importante converter para string, pois o PDFGenerator espera uma string
-                gerador_pdf_especifico = PDFGenerator(filename=str(caminho_completo)) 
-                
-                try:
-                    gerador_pdf_especifico.generate_pdf(gastos_da_categoria) #
-                    contador_relatorios += 1
-                except Exception as e:
-                    print(f"Erro ao gerar {caminho_completo}: {e}")
-        
-        return contador_relatorios
\ No newline at end of file
+
+        # 3. Usa o operador / do pathlib para montar o caminho de cada relatório
+        if grupos is None:
+            grupos = self.agrupar_por_categoria()
+        manifesto_anterior = self._carregar_manifesto()
+        manifesto: Dict[str, str] = {}
+        resumo = ResumoRelatorios()
+        tarefas: Dict[str, List[Expense]] = {}
+        sem_gastos: List[str] = []
+        for categoria in Category:
+            nome_arquivo = f"relatorio_{categoria.name.lower()}.pdf"
+            caminho = str(self.diretorio_relatorios / nome_arquivo)
+            if categoria not in grupos:
+                sem_gastos.append(caminho)
+                continue
+            manifesto[nome_arquivo] = _hash_gastos(grupos[categoria])
+            if (not forcar and manifesto_anterior.get(nome_arquivo) == manifesto[nome_arquivo]
+                    and Path(caminho).exists()):
+                resumo.pulados += 1
+            else:
+                tarefas[caminho] = grupos[categoria]
+
+        try:
+            if self.max_workers == 1 or len(tarefas) <= 1:
+                for caminho, gastos_categoria in tarefas.items():
+                    try:
+                        resumo.tempos[caminho] = _renderizar_relatorio(caminho, gastos_categoria)
+                    except Exception as e:
+                        resumo.erros[caminho] = str(e)
+                    if progresso is not None:
+                        progresso(len(resumo.tempos) + len(resumo.erros), len(tarefas))
+            else:
+                # Importado aqui: o pool traz o multiprocessing, que não é preciso na abertura
+                from concurrent.futures import ProcessPoolExecutor
+
+                with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                    futuros = {
+                        pool.submit(_renderizar_relatorio, caminho, gastos_categoria): caminho
+                        for caminho, gastos_categoria in tarefas.items()
+                    }
+                    try:
+                        for futuro in as_completed(futuros):
+                            caminho = futuros[futuro]
+                            try:
+                                resumo.tempos[caminho] = futuro.result()
+                            except Exception as e:
+                                resumo.erros[caminho] = str(e)
+                            if progresso is not None:
+                                progresso(len(resumo.tempos) + len(resumo.erros), len(tarefas))
+                    except BaseException:
+                        # Interrompido: os relatórios que ainda não começaram não são renderizados
+                        for futuro in futuros:
+                            futuro.cancel()
+                        raise
+        finally:
+            # Relatórios que falharam (ou não chegaram a ser gerados) saem do manifesto
+            # para serem refeitos na próxima execução
+            for caminho in tarefas:
+                if caminho not in resumo.tempos:
+                    manifesto.pop(Path(caminho).name, None)
+            self._salvar_manifesto(manifesto)
+
+        # O PDF de uma categoria sem gastos (já fora do manifesto) mostraria gastos que não existem mais
+        for caminho in sem_gastos:
+            try:
+                os.remove(caminho)
+                resumo.removidos += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                resumo.erros[caminho] = f"Não foi possível apagar o relatório sem gastos: {e}"
+        resumo.gerados = len(resumo.tempos)
+        resumo.duracao = time.perf_counter() - inicio
+        contar("relatorios.gerados", resumo.gerados)
+        contar("relatorios.pulados", resumo.pulados)
+        contar("relatorios.removidos", resumo.removidos)
+        contar("relatorios.erros", len(resumo.erros))
+        return resumo
@@ -0,0 +1,475 @@
+# servidor.py
+"""
+API HTTP/JSON local para registrar e consultar gastos sem passar pela GUI.
+
+Uso:
+    python servidor.py [--host 127.0.0.1] [--porta 8080] [--backend json|journal|sqlite|mensal]
+
+Rotas:
+    POST   /gastos              {"valor", "descricao", "categoria", "data"?} → 201 + gasto
+    POST   /gastos/lote         [{...}, ...] → {"importados", "rejeitados": [{"indice", "erro"}]}
+    DELETE /gastos/<id>         → 200 ou 404
+    GET    /gastos?limite=100&offset=0   (limite=0 → todos; resposta em streaming)
+           filtros: categoria=N, de=AAAA-MM-DD, ate=AAAA-MM-DD (exclusivo), valor_min, valor_max,
+           texto (palavras ou inícios de palavras); ordem=id|data|valor, desc=1; cursor=<proximo_cursor da página anterior>
+    GET    /agregados           → total, por categoria e por mês
+    GET    /relatorio.pdf       → PDF de todos os gastos (PDFGenerator)
+    GET    /resumo.pdf?maiores=10&meses=12 → resumo de uma página com gráficos (generate_dashboard)
+
+Todas as chamadas ao storage rodam numa única thread; as alterações passam por uma
+fila consumida por uma só tarefa escritora, que aplica as que chegaram juntas numa
+única gravação (StorageManager.em_lote).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from agregados import AgregadorGastos, Resumo
+from backends import criar_storage
+from busca import IndiceTexto
+from consultas import Consulta, IndiceGastos
+from expense_table import ExpenseTable
+from models import Expense, ISO_FMT
+from pdf_exporter import MAIORES_NO_RESUMO, PDFGenerator
+from storage import StorageBase
+from validator import Validator
+
+
+TAMANHO_MAXIMO_CORPO = 16 * 2**20  # 16 MB
+LIMITE_PADRAO = 100
+GASTOS_POR_BLOCO = 500  # gastos por pedaço da resposta em streaming
+LOTE_MAXIMO_ESCRITA = 256  # alterações aplicadas numa mesma gravação
+
+
+class ErroRequisicao(Exception):
+    """Erro que vira uma resposta HTTP com o status informado."""
+
+    def __init__(self, status: HTTPStatus, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _expense_do_json(registro: Any) -> Expense:
+    """Valida um gasto recebido pela API (o ID é sempre atribuído pelo storage)."""
+    if not isinstance(registro, dict):
+        raise ValueError("Cada gasto deve ser um objeto JSON.")
+    data = registro.get("data")
+    if data is None:
+        data = datetime.now()
+    else:
+        try:
+            data = datetime.strptime(data, ISO_FMT)
+        except (TypeError, ValueError):
+            raise ValueError(f"Formato de data inválido: {data!r}. Deve ser ISO '{ISO_FMT}'.")
+    return Expense(
+        id=None,
+        valor=Validator.validate_valor(registro.get("valor")),
+        descricao=Validator.validate_descricao(registro.get("descricao")),
+        categoria=Validator.validate_categoria(registro.get("categoria")),
+        data=data,
+    )
+
+
+def _resumo_json(resumo: Resumo) -> Dict[str, Any]:
+    return {
+        "total": resumo.total,
+        "contagem": resumo.contagem,
+        "minimo": resumo.minimo,
+        "maximo": resumo.maximo,
+        "media": round(resumo.media, 2),
+    }
+
+
+def _inteiro(parametros: Dict[str, List[str]], nome: str, padrao: Optional[int]) -> Optional[int]:
+    valores = parametros.get(nome)
+    if not valores:
+        return padrao
+    try:
+        valor = int(valores[0])
+    except ValueError:
+        raise ErroRequisicao(HTTPStatus.BAD_REQUEST, f"Parâmetro {nome} deve ser inteiro.")
+    if valor < 0:
+        raise ErroRequisicao(HTTPStatus.BAD_REQUEST, f"Parâmetro {nome} não pode ser negativo.")
+    return valor
+
+
+def _decimal(parametros: Dict[str, List[str]], nome: str) -> Optional[float]:
+    valores = parametros.get(nome)
+    if not valores:
+        return None
+    try:
+        valor = float(valores[0])
+    except ValueError:
+        raise ErroRequisicao(HTTPStatus.BAD_REQUEST, f"Parâmetro {nome} deve ser numérico.")
+    if not math.isfinite(valor):
+        raise ErroRequisicao(HTTPStatus.BAD_REQUEST, f"Parâmetro {nome} deve ser um número finito.")
+    return valor
+
+
+def _data(parametros: Dict[str, List[str]], nome: str) -> Optional[datetime]:
+    valores = parametros.get(nome)
+    if not valores:
+        return None
+    try:
+        return datetime.fromisoformat(valores[0])
+    except ValueError:
+        raise ErroRequisicao(HTTPStatus.BAD_REQUEST, f"Parâmetro {nome} deve ser uma data ISO (AAAA-MM-DD).")
+
+
+def _consulta_dos_parametros(parametros: Dict[str, List[str]]) -> Consulta:
+    texto = parametros.get("texto")
+    cursor = parametros.get("cursor")
+    return Consulta(
+        categoria=_inteiro(parametros, "categoria", None),
+        inicio=_data(parametros, "de"),
+        fim=_data(parametros, "ate"),
+        valor_min=_decimal(parametros, "valor_min"),
+        valor_max=_decimal(parametros, "valor_max"),
+        texto=texto[0] if texto else None,
+        ordenar_por=parametros.get("ordem", ["id"])[0],
+        decrescente=parametros.get("desc", ["0"])[0] in ("1", "true"),
+        limite=_inteiro(parametros, "limite", LIMITE_PADRAO) or None,
+        offset=_inteiro(parametros, "offset", 0),
+        cursor=cursor[0] if cursor else None,
+    )
+
+
+class ServidorGastos:
+    """Servidor HTTP assíncrono (asyncio, só biblioteca padrão) sobre um StorageManager."""
+
+    def __init__(self, storage: StorageBase, agregador: Optional[AgregadorGastos] = None,
+                 indice: Optional[IndiceGastos] = None):
+        self.storage = storage
+        self.agregador = agregador
+        # As listagens e o PDF consultam os índices ordenados em vez de ler todos os gastos
+        self.indice = indice if indice is not None else IndiceGastos(storage)
+        # Uma thread só para o storage: leituras e escritas nunca rodam ao mesmo tempo
+        self._thread_storage = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+        self._fila_escrita: Optional[asyncio.Queue] = None
+        self._escritor: Optional[asyncio.Task] = None
+
+    # --- Storage ---
+    async def _no_storage(self, funcao, *args):
+        """Roda uma chamada ao storage na thread dele, sem bloquear o loop."""
+        return await asyncio.get_running_loop().run_in_executor(self._thread_storage, funcao, *args)
+
+    async def _alterar(self, funcao, *args):
+        """Enfileira uma alteração para a tarefa escritora e espera o resultado."""
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila_escrita.put((funcao, args, futuro))
+        return await futuro
+
+    async def _tarefa_escritora(self):
+        """Única tarefa que altera os dados: junta as alterações pendentes e grava uma vez."""
+        while True:
+            lote = [await self._fila_escrita.get()]
+            while len(lote) < LOTE_MAXIMO_ESCRITA and not self._fila_escrita.empty():
+                lote.append(self._fila_escrita.get_nowait())
+            try:
+                resultados = await self._no_storage(self._aplicar_lote, [(f, a) for f, a, _ in lote])
+            except Exception as e:
+                # A gravação do lote falhou: todas as alterações dele falham
+                resultados = [e] * len(lote)
+            for (_, _, futuro), resultado in zip(lote, resultados):
+                if futuro.cancelled():
+                    continue
+                if isinstance(resultado, Exception):
+                    futuro.set_exception(resultado)
+                else:
+                    futuro.set_result(resultado)
+
+    def _aplicar_lote(self, lote) -> List[Any]:
+        """Roda na thread do storage: aplica as alterações com uma única gravação no fim."""
+        resultados = []
+        try:
+            with self.storage.em_lote():
+                for funcao, args in lote:
+                    try:
+                        resultados.append(funcao(*args))
+                    except Exception as e:
+                        resultados.append(e)
+        except Exception:
+            # A gravação falhou e os clientes recebem o erro: as alterações do lote não
+            # podem continuar na memória para serem gravadas depois
+            self.storage.descartar_pendentes()
+            raise
+        return resultados
+
+    # --- Ciclo de vida ---
+    async def iniciar(self, host: str = "127.0.0.1", porta: int = 8080) -> asyncio.AbstractServer:
+        self._fila_escrita = asyncio.Queue()
+        self._escritor = asyncio.create_task(self._tarefa_escritora())
+        return await asyncio.start_server(self._atender, host, porta)
+
+    async def encerrar(self):
+        """Espera as alterações enfileiradas e libera a thread do storage."""
+        if self._fila_escrita is not None:
+            while not self._fila_escrita.empty():
+                await asyncio.sleep(0.01)
+        if self._escritor is not None:
+            self._escritor.cancel()
+        if self.agregador is not None:
+            await self._no_storage(self.agregador.salvar)
+        if self.indice.texto is not None:
+            await self._no_storage(self.indice.texto.salvar)
+        self._thread_storage.shutdown(wait=True)
+
+    # --- HTTP ---
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende uma conexão (HTTP/1.1 com keep-alive)."""
+        try:
+            while True:
+                requisicao = await self._ler_requisicao(reader)
+                if requisicao is None:
+                    break
+                metodo, alvo, corpo, manter_aberta = requisicao
+                try:
+                    await self._despachar(metodo, alvo, corpo, writer)
+                except ErroRequisicao as e:
+                    await self._responder_json(writer, e.status, {"erro": str(e)})
+                except Exception as e:
+                    await self._responder_json(writer, HTTPStatus.INTERNAL_SERVER_ERROR, {"erro": str(e)})
+                if not manter_aberta:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError:
+            pass  # linha maior que o limite do StreamReader: encerra a conexão
+        except ErroRequisicao as e:
+            try:
+                await self._responder_json(writer, e.status, {"erro": str(e)})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def _ler_requisicao(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, bytes, bool]]:
+        linha = await reader.readline()
+        if not linha.strip():
+            return None
+        try:
+            metodo, alvo, versao = linha.decode("latin-1").split()
+        except ValueError:
+            raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "Linha de requisição inválida.")
+        cabecalhos: Dict[str, str] = {}
+        while True:
+            linha = await reader.readline()
+            if linha in (b"\r\n", b"\n", b""):
+                break
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+        try:
+            tamanho = int(cabecalhos.get("content-length", "0"))
+        except ValueError:
+            raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "Content-Length inválido.")
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            raise ErroRequisicao(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Corpo da requisição grande demais.")
+        corpo = await reader.readexactly(tamanho) if tamanho else b""
+        conexao = cabecalhos.get("connection", "").lower()
+        manter_aberta = conexao != "close" if versao == "HTTP/1.1" else conexao == "keep-alive"
+        return metodo.upper(), alvo, corpo, manter_aberta
+
+    async def _responder(self, writer: asyncio.StreamWriter, status: HTTPStatus, corpo: bytes, tipo: str):
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {tipo}\r\nContent-Length: {len(corpo)}\r\n\r\n".encode("latin-1") + corpo
+        )
+        await writer.drain()
+
+    async def _responder_json(self, writer: asyncio.StreamWriter, status: HTTPStatus, objeto: Any):
+        corpo = json.dumps(objeto, ensure_ascii=False).encode("utf-8")
+        await self._responder(writer, status, corpo, "application/json; charset=utf-8")
+
+    async def _responder_em_partes(self, writer: asyncio.StreamWriter, tipo: str, partes):
+        """Resposta com Transfer-Encoding: chunked; `partes` é um iterável de bytes."""
+        writer.write(
+            f"HTTP/1.1 200 OK\r\nContent-Type: {tipo}\r\nTransfer-Encoding: chunked\r\n\r\n".encode("latin-1")
+        )
+        for parte in partes:
+            if parte:
+                writer.write(f"{len(parte):x}\r\n".encode("latin-1") + parte + b"\r\n")
+                await writer.drain()  # respeita o ritmo do cliente em vez de acumular em memória
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _json_do_corpo(corpo: bytes) -> Any:
+        try:
+            return json.loads(corpo)
+        except (ValueError, UnicodeDecodeError):
+            raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "Corpo da requisição não é um JSON válido.")
+
+    async def _despachar(self, metodo: str, alvo: str, corpo: bytes, writer: asyncio.StreamWriter):
+        url = urlsplit(alvo)
+        partes = [p for p in url.path.split("/") if p]
+        parametros = parse_qs(url.query)
+
+        if partes == ["gastos"] and metodo == "GET":
+            await self._listar(parametros, writer)
+        elif partes == ["gastos"] and metodo == "POST":
+            await self._adicionar(corpo, writer)
+        elif partes == ["gastos", "lote"] and metodo == "POST":
+            await self._adicionar_lote(corpo, writer)
+        elif len(partes) == 2 and partes[0] == "gastos" and metodo == "DELETE":
+            await self._deletar(partes[1], writer)
+        elif partes == ["agregados"] and metodo == "GET":
+            await self._agregados(writer)
+        elif partes == ["relatorio.pdf"] and metodo == "GET":
+            await self._relatorio_pdf(writer)
+        elif partes == ["resumo.pdf"] and metodo == "GET":
+            await self._resumo_pdf(parametros, writer)
+        else:
+            raise ErroRequisicao(HTTPStatus.NOT_FOUND, f"Rota não encontrada: {metodo} {url.path}")
+
+    # --- Rotas ---
+    async def _listar(self, parametros: Dict[str, List[str]], writer: asyncio.StreamWriter):
+        consulta = _consulta_dos_parametros(parametros)
+
+        def consultar():
+            return self.indice.contar(consulta), self.indice.consultar(consulta)
+
+        try:
+            total, resultado = await self._no_storage(consultar)
+        except ValueError as e:
+            raise ErroRequisicao(HTTPStatus.BAD_REQUEST, str(e))
+        pagina = resultado.gastos
+        proximo = json.dumps(resultado.proximo_cursor)
+
+        def partes():
+            yield f'{{"total": {total}, "offset": {consulta.offset}, "proximo_cursor": {proximo}, "gastos": ['.encode("utf-8")
+            for inicio in range(0, len(pagina), GASTOS_POR_BLOCO):
+                bloco = ", ".join(json.dumps(e.to_dict(), ensure_ascii=False) for e in pagina[inicio:inicio + GASTOS_POR_BLOCO])
+                yield ((", " if inicio else "") + bloco).encode("utf-8")
+            yield b"]}"
+
+        await self._responder_em_partes(writer, "application/json; charset=utf-8", partes())
+
+    async def _adicionar(self, corpo: bytes, writer: asyncio.StreamWriter):
+        try:
+            expense = _expense_do_json(self._json_do_corpo(corpo))
+        except ValueError as e:
+            raise ErroRequisicao(HTTPStatus.BAD_REQUEST, str(e))
+        await self._alterar(self.storage.append, expense)
+        await self._responder_json(writer, HTTPStatus.CREATED, expense.to_dict())
+
+    async def _adicionar_lote(self, corpo: bytes, writer: asyncio.StreamWriter):
+        registros = self._json_do_corpo(corpo)
+        if not isinstance(registros, list):
+            raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "O lote deve ser uma lista de gastos.")
+        rejeitados = []
+        validos = []
+        for indice, registro in enumerate(registros):
+            try:
+                validos.append(_expense_do_json(registro))
+            except ValueError as e:
+                rejeitados.append({"indice": indice, "erro": str(e)})
+        importados = await self._alterar(self.storage.extend, validos) if validos else 0
+        await self._responder_json(writer, HTTPStatus.OK, {"importados": importados, "rejeitados": rejeitados})
+
+    async def _deletar(self, id_texto: str, writer: asyncio.StreamWriter):
+        try:
+            id_int = int(id_texto)
+        except ValueError:
+            raise ErroRequisicao(HTTPStatus.BAD_REQUEST, f"ID inválido: {id_texto!r}.")
+        if not await self._alterar(self.storage.delete_by_id, id_int):
+            raise ErroRequisicao(HTTPStatus.NOT_FOUND, f"ID {id_int} não encontrado.")
+        await self._responder_json(writer, HTTPStatus.OK, {"removido": id_int})
+
+    async def _agregados(self, writer: asyncio.StreamWriter):
+        if self.agregador is None:
+            raise ErroRequisicao(HTTPStatus.NOT_FOUND, "Agregados não disponíveis neste servidor.")
+
+        def consultar():
+            return {
+                "total": _resumo_json(self.agregador.total_geral()),
+                "por_categoria": {str(c): _resumo_json(r) for c, r in self.agregador.por_categoria().items()},
+                "por_mes": {m: _resumo_json(r) for m, r in self.agregador.por_mes().items()},
+            }
+
+        await self._responder_json(writer, HTTPStatus.OK, await self._no_storage(consultar))
+
+    async def _relatorio_pdf(self, writer: asyncio.StreamWriter):
+        # Páginas do índice buscadas na thread do storage conforme o PDF é montado
+        gastos = self.indice.iterar(Consulta(), executar=lambda funcao: self._thread_storage.submit(funcao).result())
+        fd, caminho = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        try:
+            # Renderização limitada por CPU: roda fora do loop e da thread do storage
+            await asyncio.get_running_loop().run_in_executor(
+                None, PDFGenerator(filename=caminho).generate_pdf_stream, gastos
+            )
+            with open(caminho, "rb") as f:
+                await self._responder_em_partes(writer, "application/pdf", iter(lambda: f.read(64 * 1024), b""))
+        finally:
+            os.unlink(caminho)
+
+
+    async def _resumo_pdf(self, parametros: Dict[str, List[str]], writer: asyncio.StreamWriter):
+        try:
+            maiores = int(parametros.get("maiores", ["10"])[0])
+            meses = int(parametros.get("meses", ["12"])[0])
+        except ValueError:
+            raise ErroRequisicao(HTTPStatus.BAD_REQUEST, "maiores e meses devem ser inteiros.")
+        if not (0 <= maiores <= MAIORES_NO_RESUMO and 1 <= meses <= 60):
+            raise ErroRequisicao(
+                HTTPStatus.BAD_REQUEST, f"Use maiores entre 0 e {MAIORES_NO_RESUMO} e meses entre 1 e 60."
+            )
+        gastos = await self._no_storage(self.storage.load_all)
+        fd, caminho = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+
+        def gerar():
+            PDFGenerator(filename=caminho).generate_dashboard(ExpenseTable.from_expenses(gastos), maiores, meses)
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, gerar)
+            with open(caminho, "rb") as f:
+                await self._responder_em_partes(writer, "application/pdf", iter(lambda: f.read(64 * 1024), b""))
+        finally:
+            os.unlink(caminho)
+
+
+async def _servir(servidor: ServidorGastos, host: str, porta: int):
+    servidor_http = await servidor.iniciar(host, porta)
+    print(f"Servindo em http://{host}:{porta}", flush=True)
+    # SIGINT/SIGTERM encerram com as alterações pendentes gravadas
+    parar = asyncio.Event()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sinal, parar.set)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C chega como KeyboardInterrupt
+    try:
+        async with servidor_http:
+            await parar.wait()
+    finally:
+        await servidor.encerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP/JSON de gastos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--backend", choices=["json", "journal", "sqlite", "mensal"], default=None)
+    args = parser.parse_args(argv)
+
+    storage = criar_storage(args.backend)
+    servidor = ServidorGastos(storage, AgregadorGastos(storage), IndiceGastos(storage, IndiceTexto(storage)))
+    try:
+        asyncio.run(_servir(servidor, args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# sqlite_storage.py
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List
+from metricas import medido
+from models import Expense, ISO_FMT
+from storage import StorageBase, carregar_json
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gastos (
+    id INTEGER PRIMARY KEY,
+    valor REAL NOT NULL,
+    descricao TEXT NOT NULL,
+    categoria INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_gastos_categoria ON gastos (categoria);
+CREATE INDEX IF NOT EXISTS idx_gastos_data ON gastos (data);
+
+-- Contador de alterações, incrementado por triggers (inclusive por outros processos)
+CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (chave, valor) VALUES ('versao', 0);
+CREATE TRIGGER IF NOT EXISTS gastos_versao_insert AFTER INSERT ON gastos
+    BEGIN UPDATE meta SET valor = valor + 1 WHERE chave = 'versao'; END;
+CREATE TRIGGER IF NOT EXISTS gastos_versao_update AFTER UPDATE ON gastos
+    BEGIN UPDATE meta SET valor = valor + 1 WHERE chave = 'versao'; END;
+CREATE TRIGGER IF NOT EXISTS gastos_versao_delete AFTER DELETE ON gastos
+    BEGIN UPDATE meta SET valor = valor + 1 WHERE chave = 'versao'; END;
+"""
+
+# As datas ficam em texto ISO, cuja ordem lexicográfica é a cronológica,
+# então o índice em `data` atende consultas por intervalo.
+_COLUNAS = "id, valor, descricao, categoria, data"
+_SQL_INSERIR = "INSERT INTO gastos (id, valor, descricao, categoria, data) VALUES (:id, :valor, :descricao, :categoria, :data)"
+_SQL_TODOS = f"SELECT {_COLUNAS} FROM gastos ORDER BY id"
+_SQL_POR_CATEGORIA = f"SELECT {_COLUNAS} FROM gastos WHERE categoria = ? ORDER BY id"
+_SQL_POR_PERIODO = f"SELECT {_COLUNAS} FROM gastos WHERE data >= ? AND data < ? ORDER BY data, id"
+
+
+class SQLiteStorageManager(StorageBase):
+    """
+    Gerencia a persistência dos gastos em um banco SQLite (modo WAL).
+    Mesmo contrato do StorageManager, mas as consultas por categoria e por período
+    são resolvidas pelos índices do banco, sem carregar todos os gastos.
+    """
+
+    def __init__(self, path: Path):
+        self._lock = threading.RLock()
+        try:
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            raise IOError(f"Erro ao abrir banco SQLite {path}: {e}")
+        super().__init__(path)
+
+    def fechar(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _para_expense(row) -> Expense:
+        # As linhas foram gravadas a partir de Expense.to_dict: dispensam revalidação
+        return Expense.from_trusted_fields(*row)
+
+    def _consultar(self, sql: str, params=()) -> List[Expense]:
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                raise IOError(f"Erro ao consultar SQLite: {e}")
+        return [self._para_expense(row) for row in rows]
+
+    def versao_dados(self) -> str:
+        """Identificador da versão dos dados, mantido pelas triggers da tabela `meta`."""
+        with self._lock:
+            (versao,) = self._conn.execute("SELECT valor FROM meta WHERE chave = 'versao'").fetchone()
+        return f"sqlite:{versao}"
+
+    @medido("storage.save_all")
+    def _save_all(self, data: List[dict]):
+        """Substitui todo o conteúdo da tabela pelos registros informados."""
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute("DELETE FROM gastos")
+                    self._conn.executemany(_SQL_INSERIR, data)
+            except sqlite3.Error as e:
+                raise IOError(f"Erro ao salvar no SQLite: {e}")
+
+    # --- API pública ---
+    @medido("storage.load_all")
+    def load_all(self) -> List[Expense]:
+        """Carrega todos os gastos do banco como objetos Expense."""
+        return self._consultar(_SQL_TODOS)
+
+    def load_by_categoria(self, categoria: int) -> List[Expense]:
+        """Retorna os gastos de uma categoria usando o índice em `categoria`."""
+        return self._consultar(_SQL_POR_CATEGORIA, (int(categoria),))
+
+    def load_between(self, inicio: datetime, fim: datetime) -> List[Expense]:
+        """Retorna os gastos com data no intervalo [inicio, fim) usando o índice em `data`."""
+        return self._consultar(_SQL_POR_PERIODO, (inicio.strftime(ISO_FMT), fim.strftime(ISO_FMT)))
+
+    def append(self, expense: Expense):
+        """Adiciona um novo gasto; com id=None o SQLite atribui max(id) + 1."""
+        with self._lock:
+            try:
+                with self._conn:
+                    cursor = self._conn.execute(_SQL_INSERIR, expense.to_dict())
+            except sqlite3.Error as e:
+                raise IOError(f"Erro ao salvar no SQLite: {e}")
+            if expense.id is None:
+                expense.id = cursor.lastrowid
+        self._notificar("gasto_adicionado", expense)
+
+    def extend(self, expenses: Iterable[Expense], on_error=None) -> int:
+        """Adiciona vários gastos numa única transação (executemany)."""
+        novos = self._validar_lote(expenses, on_error)
+        with self._lock:
+            self._atribuir_ids(novos)
+            try:
+                with self._conn:
+                    self._conn.executemany(_SQL_INSERIR, [e.to_dict() for e in novos])
+            except sqlite3.Error as e:
+                raise IOError(f"Erro ao salvar no SQLite: {e}")
+        for expense in novos:
+            self._notificar("gasto_adicionado", expense)
+        return len(novos)
+
+    def delete_by_id(self, id: int) -> bool:
+        """Deleta um gasto pelo ID. Retorna True se algo foi removido."""
+        with self._lock:
+            removidos = []
+            if self._observadores:
+                removidos = self._consultar(f"SELECT {_COLUNAS} FROM gastos WHERE id = ?", (id,))
+            try:
+                with self._conn:
+                    cursor = self._conn.execute("DELETE FROM gastos WHERE id = ?", (id,))
+            except sqlite3.Error as e:
+                raise IOError(f"Erro ao deletar no SQLite: {e}")
+        for removido in removidos:
+            self._notificar("gasto_removido", removido)
+        return cursor.rowcount > 0
+
+    def delete_all(self) -> int:
+        """Deleta todos os gastos. Retorna o número de registros removidos."""
+        with self._lock:
+            try:
+                with self._conn:
+                    cursor = self._conn.execute("DELETE FROM gastos")
+            except sqlite3.Error as e:
+                raise IOError(f"Erro ao deletar no SQLite: {e}")
+        self._notificar("gastos_recarregados", [])
+        return cursor.rowcount
+
+    def _get_next_id(self) -> int:
+        """Retorna o próximo ID disponível (max(id) + 1, resolvido pela chave primária)."""
+        with self._lock:
+            (maior,) = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM gastos").fetchone()
+        return maior + 1
+
+
+def importar_json_para_sqlite(origem: Path, destino: Path) -> int:
+    """
+    Importa o gastos.json (array JSON) para um banco SQLite, numa única transação.
+    Cada registro é convertido via Expense (validado, se vier do formato antigo). Retorna o total importado.
+    """
+    registros = [e.to_dict() for e in carregar_json(origem)]
+    storage = SQLiteStorageManager(destino)
+    try:
+        storage._save_all(registros)
+    finally:
+        storage.fechar()
+    return len(registros)
@@ -1,65 +1,651 @@
 # storage.py
+import atexit
 import json
+import os
+import tempfile
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import List
-from models import Expense
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from metricas import contar, medido, observar
+from models import Expense, SCHEMA_VERSAO
+from validator import Validator
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
 
-class StorageManager:
-    """Gerencia a persistência dos gastos em um arquivo JSON."""
+# Quantas vezes uma escrita é refeita quando outro processo gravou o arquivo no meio dela
+TENTATIVAS_ESCRITA = 5
+
+
+class ConflitoDeVersao(IOError):
+    """O arquivo foi alterado por outro processo entre a leitura e a escrita."""
+
+
+def _travar(arquivo):
+    """Lock exclusivo (bloqueante) entre processos sobre um arquivo aberto."""
+    if fcntl is not None:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        while True:
+            try:
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK desiste após ~10s; continua esperando
+                time.sleep(0.1)
+
+
+def _destravar(arquivo):
+    if fcntl is not None:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        arquivo.seek(0)
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class TravaArquivo:
+    """
+    Lock exclusivo entre processos sobre um arquivo de lock (ex.: <dados>.lock, via
+    fcntl/msvcrt), reentrante dentro do mesmo processo. Uso: `with trava:`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._trava_threads = threading.RLock()
+        self._aberto = None
+        self._profundidade = 0
+
+    def __enter__(self):
+        self._trava_threads.acquire()
+        try:
+            if self._profundidade == 0:
+                arquivo = open(self.path, "a+b")
+                try:
+                    _travar(arquivo)
+                except BaseException:
+                    arquivo.close()
+                    raise
+                self._aberto = arquivo
+            self._profundidade += 1
+        except BaseException:
+            self._trava_threads.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self._profundidade -= 1
+            if self._profundidade == 0:
+                arquivo, self._aberto = self._aberto, None
+                try:
+                    _destravar(arquivo)
+                finally:
+                    arquivo.close()
+        finally:
+            self._trava_threads.release()
+
+
+def escrever_atomico(path: Path, conteudo: Union[str, bytes], fsync: bool = True):
+    """
+    Substitui `path` por `conteudo` (texto UTF-8 ou bytes) sem que leitores vejam um arquivo parcial:
+    grava um temporário único no mesmo diretório, faz fsync e renomeia por cima.
+    Com fsync=False a troca continua atômica, mas uma queda de energia pode perder a escrita.
+    """
+    fd, temporario = tempfile.mkstemp(dir=str(path.parent), prefix=path.name + ".", suffix=".tmp")
+    try:
+        with (os.fdopen(fd, "wb") if isinstance(conteudo, bytes) else os.fdopen(fd, "w", encoding="utf-8")) as f:
+            f.write(conteudo)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temporario, path)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+        raise
+    if fsync and os.name == "posix":
+        # Garante que o rename também chegou ao disco
+        fd_dir = os.open(str(path.parent), os.O_RDONLY)
+        try:
+            os.fsync(fd_dir)
+        finally:
+            os.close(fd_dir)
+
+
+def expenses_de_json(conteudo) -> List[Expense]:
+    """
+    Converte o conteúdo lido do gastos.json em objetos Expense.
+    - {"schema": SCHEMA_VERSAO, "gastos": [...]}: gravado pelo sistema → caminho rápido, sem revalidar;
+    - array JSON (formato antigo) ou schema desconhecido → validação completa via from_dict.
+    """
+    if isinstance(conteudo, dict):
+        registros = conteudo.get("gastos", [])
+        if conteudo.get("schema") == SCHEMA_VERSAO:
+            return [Expense.from_trusted_dict(d) for d in registros]
+        conteudo = registros
+    return [Expense.from_dict(d) for d in conteudo]
+
+
+def carregar_json(path: Path) -> List[Expense]:
+    """Lê um gastos.json (formato atual ou antigo) como lista de Expense."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            conteudo = json.load(f)
+    except Exception as e:
+        raise IOError(f"Erro ao ler {path}: {e}")
+    return expenses_de_json(conteudo)
+
+
+class StorageBase:
+    """
+    Contrato comum dos backends de armazenamento: observadores, consultas e a API de
+    escrita adiada. Aqui essa API não adia nada (cada operação grava na hora); o
+    StorageManager a implementa de fato.
+    Subclasses implementam load_all, append, extend, delete_by_id, delete_all,
+    versao_dados e _get_next_id.
+    """
 
     def __init__(self, path: Path):
         self.path = path
+        self._observadores: List = []
+
+    # --- Observadores ---
+    def registrar_observador(self, observador):
+        """
+        Registra um objeto notificado a cada mudança nos gastos. Ele deve implementar:
+        - gasto_adicionado(expense)
+        - gasto_removido(expense)
+        - gastos_recarregados(expenses): a coleção inteira mudou (recarga do disco ou delete_all).
+        """
+        self._observadores.append(observador)
+
+    def _notificar(self, evento: str, *args):
+        """
+        A operação já foi gravada quando os observadores são avisados: a falha de um deles
+        vai para o stderr (e para a métrica storage.observador.falhas), sem virar erro de
+        quem gravou nem deixar de avisar os demais.
+        """
+        for observador in self._observadores:
+            try:
+                getattr(observador, evento)(*args)
+            except Exception:
+                contar("storage.observador.falhas")
+                traceback.print_exc()
+
+    def versao_dados(self) -> str:
+        """Identificador da versão atual dos dados persistidos (muda a cada escrita)."""
+        raise NotImplementedError
+
+    # --- Escrita adiada (sem efeito: cada operação já grava na hora) ---
+    def adiar_escritas(self, max_pendentes: Optional[int] = 100, intervalo: Optional[float] = 1.0,
+                       executar_flush: Optional[Callable[[Callable[[], None]], object]] = None):
+        pass
+
+    def escrever_imediatamente(self):
+        pass
+
+    @contextmanager
+    def em_lote(self):
+        yield self
+
+    def flush(self):
+        pass
+
+    def escritas_pendentes(self) -> int:
+        """Quantas operações valem na memória mas ainda não estão no disco."""
+        return 0
+
+    def descartar_pendentes(self):
+        pass
+
+    # --- API pública ---
+    def load_all(self) -> List[Expense]:
+        raise NotImplementedError
+
+    def load_by_categoria(self, categoria: int) -> List[Expense]:
+        """Retorna os gastos de uma categoria, na ordem de inserção."""
+        return [e for e in self.load_all() if e.categoria == categoria]
+
+    def load_between(self, inicio: datetime, fim: datetime) -> List[Expense]:
+        """Retorna os gastos com data no intervalo [inicio, fim), ordenados por data."""
+        gastos = [e for e in self.load_all() if inicio <= e.data < fim]
+        gastos.sort(key=lambda e: e.data)
+        return gastos
+
+    def append(self, expense: Expense):
+        raise NotImplementedError
+
+    def extend(self, expenses: Iterable[Expense], on_error: Optional[Callable[[Expense, Exception], None]] = None) -> int:
+        raise NotImplementedError
+
+    def delete_by_id(self, id: int) -> bool:
+        raise NotImplementedError
+
+    def delete_all(self) -> int:
+        raise NotImplementedError
+
+    def _validar_lote(self, expenses: Iterable[Expense], on_error) -> List[Expense]:
+        """
+        Consome o iterável validando cada gasto (Validator). Sem on_error, o primeiro
+        inválido levanta ValueError; com on_error(expense, erro), ele é descartado.
+        Roda antes de qualquer lock: a leitura de um arquivo importado não bloqueia os outros.
+        """
+        novos = []
+        for expense in expenses:
+            try:
+                expense.valor = Validator.validate_valor(expense.valor)
+                expense.descricao = Validator.validate_descricao(expense.descricao)
+                expense.categoria = Validator.validate_categoria(expense.categoria)
+            except ValueError as e:
+                if on_error is None:
+                    raise
+                on_error(expense, e)
+                continue
+            novos.append(expense)
+        return novos
+
+    def _atribuir_ids(self, novos: List[Expense]):
+        """Atribui os IDs faltantes em sequência a partir de um único _get_next_id."""
+        proximo_id = self._get_next_id()
+        for expense in novos:
+            if expense.id is None:
+                expense.id = proximo_id
+            proximo_id = max(proximo_id, expense.id + 1)
+
+    def _get_next_id(self) -> int:
+        raise NotImplementedError
+
+
+class StorageComCache(StorageBase):
+    """
+    Backends que mantêm em memória a coleção autoritativa dos gastos, indexada por ID,
+    recarregada do arquivo só quando ele muda (mtime/tamanho/inode).
+    Subclasses implementam _carregar_do_disco e as escritas.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._gastos: Dict[int, Expense] = {}  # id -> Expense, na ordem do arquivo
+        self._assinatura: Optional[Tuple[int, int, int]] = None
+        self._proximo_id = 1
+        self._trava_threads = threading.RLock()
+
+    def versao_dados(self) -> str:
+        """A assinatura do arquivo (muda a cada escrita)."""
+        assinatura = self._assinatura_arquivo()
+        return ":".join(str(v) for v in assinatura) if assinatura else ""
+
+    # --- Cache em memória ---
+    def _assinatura_arquivo(self) -> Optional[Tuple[int, int, int]]:
+        """Identifica a versão do arquivo em disco por (mtime, tamanho, inode)."""
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _sincronizar(self) -> Dict[int, Expense]:
+        """Retorna o índice em memória, recarregando-o só se o arquivo mudou no disco."""
+        with self._trava_threads:
+            assinatura = self._assinatura_arquivo()
+            if assinatura is None:
+                self._definir_cache([])
+                self._assinatura = None
+                self._reaplicar_pendentes()
+            elif assinatura != self._assinatura:
+                self._assinatura = assinatura
+                try:
+                    self._definir_cache(self._carregar_do_disco())
+                except Exception:
+                    self._assinatura = None
+                    raise
+                self._reaplicar_pendentes()
+                self._notificar("gastos_recarregados", list(self._gastos.values()))
+            return self._gastos
+
+    def _reaplicar_pendentes(self):
+        """Chamado após cada recarga, antes de notificar os observadores (ver StorageManager)."""
+
+    def _definir_cache(self, expenses: List[Expense]):
+        self._gastos = {e.id: e for e in expenses}
+        self._proximo_id = max((e.id for e in expenses if e.id is not None), default=0) + 1
+
+    def _registrar_id(self, id: Optional[int]):
+        """Mantém o próximo ID à frente de qualquer ID já usado."""
+        if id is not None and id >= self._proximo_id:
+            self._proximo_id = id + 1
+
+    def _carregar_do_disco(self) -> List[Expense]:
+        raise NotImplementedError
+
+    # --- API pública ---
+    @medido("storage.load_all")
+    def load_all(self) -> List[Expense]:
+        """
+        Retorna todos os gastos como objetos Expense.
+        Sem I/O quando o arquivo não mudou desde a última leitura/escrita; os objetos
+        retornados são os do cache e não devem ser alterados pelo chamador.
+        """
+        return list(self._sincronizar().values())
+
+    def load_by_categoria(self, categoria: int) -> List[Expense]:
+        """Retorna os gastos de uma categoria, na ordem de inserção."""
+        return [e for e in self._sincronizar().values() if e.categoria == categoria]
+
+    def load_between(self, inicio: datetime, fim: datetime) -> List[Expense]:
+        """Retorna os gastos com data no intervalo [inicio, fim), ordenados por data."""
+        gastos = [e for e in self._sincronizar().values() if inicio <= e.data < fim]
+        gastos.sort(key=lambda e: e.data)
+        return gastos
+
+    def _get_next_id(self) -> int:
+        """Retorna o próximo ID disponível, garantindo unicidade."""
+        return self._proximo_id
+
+
+class StorageManager(StorageComCache):
+    """
+    Gerencia a persistência dos gastos em um arquivo JSON, com o cache em memória do
+    StorageComCache (recarregado só quando o arquivo muda).
+
+    Vários processos podem usar o mesmo arquivo (ex.: a GUI e o importador):
+    - cada escrita substitui o arquivo atomicamente (temporário + fsync + rename),
+      então leitores nunca veem um JSON pela metade;
+    - append/extend/delete fazem leitura-modificação-escrita sob um lock exclusivo
+      (arquivo <path>.lock, via fcntl/msvcrt);
+    - a assinatura do arquivo funciona como versão: se ela mudou entre a leitura e a
+      escrita (um escritor que não respeitou o lock), a operação é refeita sobre os
+      dados novos em vez de sobrescrevê-los.
+
+    Durabilidade configurável:
+    - padrão: cada operação grava o arquivo (com fsync) antes de retornar;
+    - `adiar_escritas(max_pendentes, intervalo)`: as operações valem na memória na hora
+      e são gravadas juntas quando acumulam `max_pendentes` ou após `intervalo` segundos
+      (group commit); `flush()` força a gravação e ela também ocorre ao sair do processo;
+    - `with storage.em_lote():` adia as escritas só dentro do bloco e grava uma vez no fim;
+    - `sincronizar_disco = False` dispensa o fsync (mais rápido, menos durável).
+    """
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self.arquivo_lock = path.with_name(path.name + ".lock")
+        self._trava_arquivo = TravaArquivo(self.arquivo_lock)
+        self.sincronizar_disco = True
+        # Escrita adiada: operações aplicadas na memória e ainda não gravadas (refeitas se
+        # outro processo gravar o arquivo antes do flush)
+        self._pendentes: List[Callable[[Dict[int, Expense]], object]] = []
+        self._max_pendentes: Optional[int] = None
+        self._intervalo: Optional[float] = None
+        self._profundidade_lote = 0
+        self._temporizador: Optional[threading.Timer] = None
+        self._executar_flush: Optional[Callable[[Callable[[], None]], object]] = None
+        self._flush_no_encerramento = False
         if not self.path.exists():
-            self._save_all([])  # Cria JSON vazio se não existir
+            with self._bloqueio():
+                if not self.path.exists():
+                    self._save_all([])  # Cria JSON vazio se não existir
 
+    # --- Concorrência entre processos ---
+    @contextmanager
+    def _bloqueio(self):
+        """Lock exclusivo entre processos; reentrante dentro do mesmo processo."""
+        with self._trava_threads, self._trava_arquivo:
+            yield
+
+    def _escrever(self, operacao: Callable[[Dict[int, Expense]], object]):
+        """
+        Executa operacao(gastos) sobre os dados mais recentes do disco, sob o lock, e
+        persiste o resultado se ele for verdadeiro. Em caso de ConflitoDeVersao o cache é
+        descartado e a operação é refeita (até TENTATIVAS_ESCRITA vezes).
+        Com a escrita adiada, a operação só é aplicada na memória e entra nas pendentes.
+        """
+        if self._adiando():
+            with self._trava_threads:
+                resultado = operacao(self._sincronizar())
+                if resultado:
+                    self._pendentes.append(operacao)
+                    self._agendar_flush()
+                return resultado
+        for _ in range(TENTATIVAS_ESCRITA):
+            with self._bloqueio():
+                resultado = operacao(self._sincronizar())
+                if not resultado:
+                    return resultado
+                try:
+                    self._persistir()
+                except ConflitoDeVersao:
+                    self._assinatura = None  # força a releitura na próxima tentativa
+                    continue
+                return resultado
+        raise ConflitoDeVersao(f"{self.path} mudou durante {TENTATIVAS_ESCRITA} tentativas de escrita.")
+
+    # --- Escrita adiada (group commit) ---
+    def adiar_escritas(self, max_pendentes: Optional[int] = 100, intervalo: Optional[float] = 1.0,
+                       executar_flush: Optional[Callable[[Callable[[], None]], object]] = None):
+        """
+        Passa a acumular as operações na memória e gravá-las em lote: ao chegar a
+        `max_pendentes` operações ou `intervalo` segundos após a primeira pendente
+        (None desliga o critério). Um flush final é registrado para a saída do processo.
+        O flush por tempo roda na thread do temporizador, ou é entregue a
+        `executar_flush(flush)` (ex.: para rodar na thread que usa os observadores, já
+        que uma recarga durante o flush os reconstrói).
+        """
+        with self._trava_threads:
+            self._max_pendentes = max_pendentes
+            self._intervalo = intervalo
+            self._executar_flush = executar_flush
+            if not self._flush_no_encerramento:
+                atexit.register(self.flush)
+                self._flush_no_encerramento = True
+
+    def escrever_imediatamente(self):
+        """Grava as pendentes e volta a gravar cada operação antes de retornar."""
+        with self._trava_threads:
+            self._max_pendentes = None
+            self._intervalo = None
+            self.flush()
+
+    @contextmanager
+    def em_lote(self):
+        """Adia as escritas dentro do bloco e grava tudo numa única escrita ao sair dele."""
+        with self._trava_threads:
+            self._profundidade_lote += 1
+        try:
+            yield self
+        finally:
+            with self._trava_threads:
+                self._profundidade_lote -= 1
+                if self._profundidade_lote == 0:
+                    self.flush()
+
+    def _adiando(self) -> bool:
+        return self._profundidade_lote > 0 or self._max_pendentes is not None or self._intervalo is not None
+
+    def _agendar_flush(self):
+        if self._profundidade_lote > 0:
+            return  # em_lote grava só no fim do bloco
+        if self._max_pendentes is not None and len(self._pendentes) >= self._max_pendentes:
+            self.flush()
+        elif self._intervalo is not None and self._temporizador is None:
+            self._temporizador = threading.Timer(self._intervalo, self._flush_por_tempo)
+            self._temporizador.daemon = True
+            self._temporizador.start()
+
+    def _flush_por_tempo(self):
+        if self._executar_flush is not None:
+            self._executar_flush(self.flush)
+        else:
+            self.flush()
+
+    def flush(self):
+        """Grava no disco, numa única escrita, todas as operações pendentes."""
+        with self._trava_threads:
+            if self._temporizador is not None:
+                if self._temporizador is not threading.current_thread():
+                    self._temporizador.cancel()
+                self._temporizador = None
+            if not self._pendentes:
+                return
+            for _ in range(TENTATIVAS_ESCRITA):
+                with self._bloqueio():
+                    # Se outro processo gravou, recarrega e reaplica as pendentes por cima
+                    self._sincronizar()
+                    try:
+                        self._persistir()
+                    except ConflitoDeVersao:
+                        self._assinatura = None
+                        continue
+                    self._pendentes.clear()
+                    return
+            raise ConflitoDeVersao(f"{self.path} mudou durante {TENTATIVAS_ESCRITA} tentativas de escrita.")
+
+    def escritas_pendentes(self) -> int:
+        """
+        Quantas operações valem na memória mas ainda não estão no disco. Enquanto houver
+        alguma, versao_dados() não descreve o estado em memória.
+        """
+        return len(self._pendentes)
+
+    def descartar_pendentes(self):
+        """
+        Desfaz na memória as operações ainda não gravadas (ex.: o flush falhou e quem as
+        pediu já recebeu o erro): o cache volta ao conteúdo do disco e os observadores
+        recebem gastos_recarregados.
+        """
+        with self._trava_threads:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+            if not self._pendentes:
+                return
+            self._pendentes.clear()
+            self._assinatura = None
+            gastos = self._sincronizar()
+            if self._assinatura is None:
+                # Sem arquivo no disco, a recarga só esvazia o cache e não avisa os observadores
+                self._notificar("gastos_recarregados", list(gastos.values()))
+
+    def _reaplicar_pendentes(self):
+        """Operações ainda não gravadas (escrita adiada) são reaplicadas sobre os dados recarregados."""
+        for operacao in self._pendentes:
+            operacao(self._gastos)
+
+    # --- Acesso ao disco ---
+    @medido("storage.save_all")
     def _save_all(self, data: List[dict]):
-        """Salva uma lista de dicionários no arquivo JSON."""
+        """
+        Salva uma lista de dicionários no arquivo JSON, marcada com SCHEMA_VERSAO.
+        json.dumps sem indentação usa o codificador em C (json.dump com indent é todo em Python).
+        Levanta ConflitoDeVersao se o arquivo mudou desde a última leitura/escrita deste processo.
+        """
+        conteudo = json.dumps({"schema": SCHEMA_VERSAO, "gastos": data}, ensure_ascii=False)
+        observar("storage.save_all.gastos", len(data))
+        if self._assinatura_arquivo() != self._assinatura:
+            raise ConflitoDeVersao(f"{self.path} foi alterado por outro processo.")
         try:
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            escrever_atomico(self.path, conteudo, fsync=self.sincronizar_disco)
         except Exception as e:
+            self._assinatura = None  # força recarga: o disco pode não refletir o cache
             raise IOError(f"Erro ao salvar JSON: {e}")
+        self._assinatura = self._assinatura_arquivo()
 
-    def load_all(self) -> List[Expense]:
-        """Carrega todos os gastos do JSON como objetos Expense."""
-        if not self.path.exists():
-            return []
+    @medido("storage.carregar_do_disco")
+    def _carregar_do_disco(self) -> List[Expense]:
+        """Lê e converte o JSON inteiro em objetos Expense."""
         try:
             with open(self.path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return [Expense.from_dict(d) for d in data]
+                conteudo = json.load(f)
+            return expenses_de_json(conteudo)
         except json.JSONDecodeError:
-            # JSON corrompido → reseta
-            self._save_all([])
-            return []
+            # JSON corrompido → guarda uma cópia para recuperação e recomeça vazio.
+            # (Escritas atômicas impedem que um arquivo pela metade chegue até aqui.)
+            with self._bloqueio():
+                if self._assinatura_arquivo() == self._assinatura:
+                    os.replace(self.path, self.path.with_name(self.path.name + f".corrompido-{int(time.time())}"))
+                    self._assinatura = None
+                    self._save_all([])
+                    return []
+            # Outro processo já substituiu o arquivo: lê a versão nova
+            self._assinatura = self._assinatura_arquivo()
+            return self._carregar_do_disco()
         except Exception as e:
             raise IOError(f"Erro ao carregar JSON: {e}")
 
+    def _persistir(self):
+        """Grava no disco o estado atual do cache."""
+        self._save_all([e.to_dict() for e in self._gastos.values()])
+
+    # --- API pública ---
     def append(self, expense: Expense):
         """Adiciona um novo gasto, atribuindo ID automaticamente se necessário."""
-        expenses = self.load_all()
-        if expense.id is None:
-            expense.id = self._get_next_id(expenses)
-        expenses.append(expense)
-        self._save_all([e.to_dict() for e in expenses])
+        id_original = expense.id
+
+        def operacao(gastos):
+            expense.id = id_original if id_original is not None else self._get_next_id()
+            gastos[expense.id] = expense
+            self._registrar_id(expense.id)
+            return True
+
+        self._escrever(operacao)
+        self._notificar("gasto_adicionado", expense)
+
+    def extend(self, expenses: Iterable[Expense], on_error: Optional[Callable[[Expense, Exception], None]] = None) -> int:
+        """
+        Adiciona vários gastos com uma única escrita no disco. Retorna quantos foram adicionados.
+        - Cada gasto é validado (Validator) à medida que o iterável é consumido, antes de
+          tomar o lock entre processos.
+        - IDs faltantes são atribuídos em sequência a partir de um único _get_next_id.
+        - Sem on_error, o primeiro gasto inválido aborta o lote sem gravar nada;
+          com on_error(expense, erro), o gasto inválido é descartado e o lote continua.
+        """
+        # Validação (e leitura do iterável) fora do lock; sob ele ficam só a numeração,
+        # a junção com os dados do disco e a escrita
+        novos = self._validar_lote(expenses, on_error)
+        ids_originais = [e.id for e in novos]
+
+        def operacao(gastos):
+            # Renumera a cada aplicação: nova tentativa após conflito ou recarga com escrita adiada
+            for expense, id_original in zip(novos, ids_originais):
+                expense.id = id_original
+            self._atribuir_ids(novos)
+            for expense in novos:
+                gastos[expense.id] = expense
+                self._registrar_id(expense.id)
+            return len(novos)
+
+        if novos:
+            self._escrever(operacao)
+        for expense in novos:
+            self._notificar("gasto_adicionado", expense)
+        return len(novos)
 
     def delete_by_id(self, id: int) -> bool:
         """Deleta um gasto pelo ID. Retorna True se algo foi removido."""
-        expenses = self.load_all()
-        new_expenses = [e for e in expenses if e.id != id]
-        removed = len(new_expenses) != len(expenses)
-        self._save_all([e.to_dict() for e in new_expenses])
-        return removed
+        removido = self._escrever(lambda gastos: gastos.pop(id, None))
+        if removido is None:
+            return False
+        self._notificar("gasto_removido", removido)
+        return True
 
     def delete_all(self) -> int:
         """Deleta todos os gastos. Retorna o número de registros removidos."""
-        count = len(self.load_all())
-        self._save_all([])
-        return count
+        def operacao(gastos):
+            count = len(gastos)
+            gastos.clear()
+            return count
 
-    def _get_next_id(self, expenses: List[Expense]) -> int:
-        """Retorna o próximo ID disponível, garantindo unicidade."""
-        if not expenses:
-            return 1
-        return max(e.id for e in expenses if e.id is not None) + 1
+        count = self._escrever(operacao)
+        self._notificar("gastos_recarregados", [])
+        return count
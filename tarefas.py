@@ -0,0 +1,127 @@
+# tarefas.py
+import queue
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+class TarefaCancelada(Exception):
+    """Levantada dentro de uma tarefa quando o usuário pede o cancelamento."""
+
+
+class Tarefa:
+    """
+    Um trabalho demorado (exportação de PDF, relatórios por categoria) na fila de tarefas.
+    A função da tarefa recebe `tarefa.informar` como callback de progresso; é nele que
+    o cancelamento é verificado, então a tarefa para no próximo passo que reportar.
+    """
+
+    def __init__(self, nome: str, funcao: Callable[["Tarefa"], object], ao_concluir=None, ao_falhar=None, ao_progresso=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.ao_progresso = ao_progresso
+        self._cancelada = threading.Event()
+        self._fila: Optional["FilaTarefas"] = None
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelada.is_set()
+
+    def cancelar(self):
+        self._cancelada.set()
+
+    def informar(self, feito: int, total: int, texto: str = ""):
+        """Reporta o progresso (roda na thread da tarefa) e interrompe a tarefa se foi cancelada."""
+        if self.cancelada:
+            raise TarefaCancelada(f"Tarefa '{self.nome}' cancelada.")
+        if self.ao_progresso is not None and self._fila is not None:
+            self._fila._eventos.put((self.ao_progresso, (feito, total, texto)))
+
+
+class FilaTarefas:
+    """
+    Executa tarefas demoradas numa thread própria, uma de cada vez, sem travar a interface.
+    - Cliques repetidos se juntam: se já existe uma tarefa com o mesmo nome esperando na
+      fila, `submeter` devolve essa tarefa em vez de enfileirar outra (no máximo uma
+      pendente por nome, além da que estiver rodando).
+    - Callbacks de progresso, conclusão e falha não rodam na thread da tarefa: ficam numa
+      fila de eventos que a interface esvazia com `processar_eventos` (no Tk, via root.after).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pendentes: "deque[Tarefa]" = deque()
+        self._por_nome: Dict[str, Tarefa] = {}
+        self._atual: Optional[Tarefa] = None
+        self._eventos = queue.Queue()
+        self._sinal = threading.Condition(self._lock)
+        self._encerrada = False
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+
+    def submeter(self, nome: str, funcao: Callable[[Tarefa], object], ao_concluir=None, ao_falhar=None, ao_progresso=None) -> Tarefa:
+        """Enfileira `funcao(tarefa)`, ou devolve a tarefa pendente de mesmo nome."""
+        with self._lock:
+            pendente = self._por_nome.get(nome)
+            if pendente is not None and not pendente.cancelada:
+                return pendente
+            tarefa = Tarefa(nome, funcao, ao_concluir, ao_falhar, ao_progresso)
+            tarefa._fila = self
+            self._pendentes.append(tarefa)
+            self._por_nome[nome] = tarefa
+            self._sinal.notify()
+            return tarefa
+
+    def cancelar(self, nome: Optional[str] = None):
+        """Cancela a tarefa em execução e as pendentes (só as de `nome`, se informado)."""
+        with self._lock:
+            for tarefa in [self._atual, *self._pendentes]:
+                if tarefa is not None and (nome is None or tarefa.nome == nome):
+                    tarefa.cancelar()
+
+    def ocupada(self) -> bool:
+        with self._lock:
+            return self._atual is not None or bool(self._pendentes)
+
+    def encerrar(self, timeout: float = 5.0):
+        """Cancela tudo e para a thread."""
+        self.cancelar()
+        with self._lock:
+            self._encerrada = True
+            self._sinal.notify()
+        self._thread.join(timeout)
+
+    def processar_eventos(self):
+        """Roda os callbacks pendentes; deve ser chamado pela thread da interface."""
+        try:
+            while True:
+                callback, argumentos = self._eventos.get_nowait()
+                callback(*argumentos)
+        except queue.Empty:
+            pass
+
+    def _executar(self):
+        while True:
+            with self._lock:
+                while not self._pendentes and not self._encerrada:
+                    self._sinal.wait()
+                if self._encerrada:
+                    return
+                tarefa = self._pendentes.popleft()
+                if self._por_nome.get(tarefa.nome) is tarefa:
+                    del self._por_nome[tarefa.nome]
+                self._atual = tarefa
+            try:
+                if tarefa.cancelada:
+                    raise TarefaCancelada(f"Tarefa '{tarefa.nome}' cancelada.")
+                evento = (tarefa.ao_concluir, (tarefa.funcao(tarefa),))
+            except Exception as e:
+                evento = (tarefa.ao_falhar, (e,))
+            # A tarefa deixa de ser a atual antes do evento entrar na fila: o callback já vê
+            # a fila livre (ocupada() falso, sem cancelar uma tarefa que terminou)
+            with self._lock:
+                self._atual = None
+            if evento[0] is not None:
+                self._eventos.put(evento)
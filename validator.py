@@ -1,26 +1,32 @@
 # validator.py
+import math
 from typing import Union
+from metricas import medido
 from models import Category
 
 class Validator:
     """Classe responsável por validar dados antes de criar ou manipular gastos."""
 
     @staticmethod
+    @medido("validator.validate_valor")
     def validate_valor(valor: Union[str, float, int]) -> float:
         """
         Valida e converte o valor do gasto.
-        - Deve ser numérico e positivo.
+        - Deve ser numérico, finito e positivo.
         - Retorna float válido.
         """
         try:
             v = float(valor)
         except (ValueError, TypeError):
             raise ValueError(f"Valor inválido: {valor}. Deve ser um número.")
+        if not math.isfinite(v):
+            raise ValueError(f"Valor inválido: {valor}. Deve ser um número finito.")
         if v < 0:
             raise ValueError(f"Valor negativo não permitido: {v}.")
         return v
 
     @staticmethod
+    @medido("validator.validate_descricao")
     def validate_descricao(descricao: str) -> str:
         """
         Valida a descrição do gasto.
@@ -35,6 +41,7 @@ class Validator:
         return desc
 
     @staticmethod
+    @medido("validator.validate_categoria")
     def validate_categoria(categoria: Union[str, int]) -> int:
         """
         Valida a categoria do gasto.